@@ -0,0 +1,115 @@
+"""
+Maintenance command for the result cache.
+
+Usage (from the repository root):
+    python -m base_scraper.cache stat [--cache-dir DIR] [--ttl-seconds N] [--json]
+    python -m base_scraper.cache prune [--cache-dir DIR] [--ttl-seconds N] [--max-bytes N]
+    python -m base_scraper.cache compact [--cache-dir DIR]
+    python -m base_scraper.cache migrate [--cache-dir DIR] [--sqlite-path PATH] [--delete-json]
+
+stat, prune and compact work on the configured backend (`--backend json|sqlite` to override);
+migrate copies the JSON cache into the SQLite database. Defaults come from the scraper
+configuration (CACHE_BACKEND, CACHE_DIR, CACHE_SQLITE_PATH, CACHE_TTL_SECONDS, CACHE_MAX_DISK_BYTES).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Optional, List
+
+from .src.config import ScraperConfig
+from .src.caching import create_cache_backend, migrate_json_cache
+from .src.sqlite_cache import SqliteCacheBackend
+
+
+def _format_time(timestamp: Optional[float]) -> str:
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp)) if timestamp is not None else "-"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config = ScraperConfig()
+    parser = argparse.ArgumentParser(prog="python -m base_scraper.cache", description="Inspect and clean up the result cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("stat", "Summarise the cache."), ("prune", "Delete expired and unreadable entries and enforce the size cap."),
+                            ("compact", "Rewrite entries compactly in the current format and remove leftover temp files."),
+                            ("migrate", "Copy the JSON cache into the SQLite database.")):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--cache-dir", default=config.cache_dir, help=f"Cache directory (default: {config.cache_dir}).")
+        subparser.add_argument("--sqlite-path", default=config.cache_sqlite_path, help=f"SQLite database (default: {config.cache_sqlite_path}).")
+        if name != "migrate":
+            subparser.add_argument("--backend", choices=("json", "sqlite"), default=config.cache_backend, help=f"Cache backend (default: {config.cache_backend}).")
+        else:
+            subparser.add_argument("--delete-json", action="store_true", help="Delete JSON files once their entries are in the database.")
+        if name in ("stat", "prune"):
+            subparser.add_argument("--ttl-seconds", type=int, default=config.cache_ttl_seconds, help=f"Entry lifetime, 0 for none (default: {config.cache_ttl_seconds}).")
+        if name == "prune":
+            subparser.add_argument("--max-bytes", type=int, default=config.cache_max_disk_bytes, help=f"Size cap, 0 for none (default: {config.cache_max_disk_bytes}).")
+        if name == "stat":
+            subparser.add_argument("--json", action="store_true", help="Print the statistics as JSON.")
+    args = parser.parse_args(argv)
+
+    if getattr(args, "backend", "json") == "json" and not os.path.isdir(args.cache_dir):
+        print(f"Cache directory {args.cache_dir} does not exist.", file=sys.stderr)
+        return 1
+    if getattr(args, "backend", None) == "sqlite" and not os.path.exists(args.sqlite_path):
+        print(f"Cache database {args.sqlite_path} does not exist.", file=sys.stderr)
+        return 1
+
+    if args.command == "migrate":
+        backend = SqliteCacheBackend(args.sqlite_path, batch_size=config.cache_sqlite_batch_size)
+        try:
+            result = migrate_json_cache(args.cache_dir, backend, delete_json=args.delete_json)
+            entries = backend.stats()["entries"]
+        finally:
+            backend.close()
+        print(f"Migrated {result['migrated']} entries from {args.cache_dir} to {args.sqlite_path} (now {entries} entries); "
+              f"skipped {result['skipped_corrupt']} unreadable entries.")
+        return 0
+
+    config.cache_backend, config.cache_dir, config.cache_sqlite_path = args.backend, args.cache_dir, args.sqlite_path
+    backend = create_cache_backend(config)
+    try:
+        return _run(args, backend)
+    finally:
+        backend.close()
+
+
+def _run(args: argparse.Namespace, backend) -> int:
+    if args.command == "stat":
+        stats = backend.stats(args.ttl_seconds)
+        if args.json:
+            print(json.dumps(stats))
+        else:
+            print(f"Cache:             {args.sqlite_path if args.backend == 'sqlite' else args.cache_dir}")
+            print(f"Entries:           {stats['entries']} ({stats['bytes'] / (1024 * 1024):.1f} MiB)")
+            print(f"Expired:           {stats['expired']}" + (f" (TTL {args.ttl_seconds}s)" if args.ttl_seconds > 0 else " (no TTL)"))
+            print(f"Old format:        {stats['legacy_entries']}")
+            print(f"Unreadable:        {stats['corrupt_entries']}")
+            print(f"Temp files:        {stats['temp_files']}")
+            if "pages" in stats:
+                print(f"Page texts:        {stats['pages']} (database {stats['database_bytes'] / (1024 * 1024):.1f} MiB)")
+            print(f"Oldest / newest:   {_format_time(stats['oldest_saved_at'])} / {_format_time(stats['newest_saved_at'])}")
+    elif args.command == "prune":
+        result = backend.prune(args.ttl_seconds, args.max_bytes)
+        if result.get("error"):
+            print(f"Could not prune the cache: {result['error']}", file=sys.stderr)
+            return 1
+        print(f"Removed {result['removed_expired']} expired, {result['removed_corrupt']} unreadable and "
+              f"{result['removed_for_size']} least recently used entries; {result['remaining_entries']} entries "
+              f"({result['remaining_bytes'] / (1024 * 1024):.1f} MiB) remain.")
+    else:
+        result = backend.compact()
+        print(f"Rewrote {result['rewritten']} entries, removed {result['removed_corrupt']} unreadable entries and "
+              f"{result['removed_temp_files']} temp files; {result['bytes_before'] / (1024 * 1024):.1f} MiB -> "
+              f"{result['bytes_after'] / (1024 * 1024):.1f} MiB.")
+    return 0
+
+
+if __name__ == "__main__":
+    # Ensure .env is loaded if it exists in the project root
+    dotenv_path = os.path.join(os.path.dirname(__file__), '..', '.env')
+    if os.path.exists(dotenv_path):
+        from dotenv import load_dotenv
+        load_dotenv(dotenv_path)
+    sys.exit(main())
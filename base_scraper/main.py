@@ -5,7 +5,10 @@ import time
 from pprint import pprint
 
 from src.config import ScraperConfig
-from src.scraper import scrape_website
+from src.scraper import scrape_website, wait_for_revalidations
+from src.http_client import close_shared_http_client
+from src.captcha_solver import get_captcha_detection_stats
+from src.caching import get_scrape_cache
 
 # Setup basic logging for the test script
 logging.basicConfig(
@@ -74,9 +77,16 @@ async def main():
             logger.warning("No data was scraped. The function returned an empty list.")
         
         print("--------------------------\n")
+        if config.captcha_solver_enabled:
+            logger.info(f"CAPTCHA detection stats: {get_captcha_detection_stats()}")
+        if config.caching_enabled:
+            logger.info(f"Result cache stats: {get_scrape_cache(config).stats()}")
 
     except Exception as e:
         logger.error(f"An error occurred during the scrape_website call: {e}", exc_info=True)
+    finally:
+        await wait_for_revalidations()
+        await close_shared_http_client()
 
 if __name__ == "__main__":
     # Ensure .env is loaded if it exists in the project root
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import os
+from contextlib import AsyncExitStack
+from collections import deque
+from typing import Optional, List, Dict, Any, Iterable, AsyncIterator, Deque, Tuple
+
+import httpx
+
+from .config import ScraperConfig
+from .browser_pool import BrowserPool
+from .http_client import get_shared_http_client
+from .scraper import scrape_website, wait_for_revalidations
+from .caching import get_scrape_cache
+from .host_limiter import get_host_limiter, host_key
+
+logger = logging.getLogger(__name__)
+
+# Rows parked per worker while their host is busy, before workers stop reading further rows.
+_MAX_PARKED_ROWS_PER_WORKER = 100
+
+
+async def iter_scrape_many(
+    rows: Iterable[Dict[str, Any]],
+    config: ScraperConfig,
+    output_dir_for_run: str,
+    browser_pool: Optional[BrowserPool] = None,
+    http_client: Optional[httpx.AsyncClient] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Scrapes many companies concurrently and yields one result per row as soon as it finishes.
+
+    Each row is a mapping with `given_url`, `company_name_or_id` and an optional `input_row_id`
+    (the arguments of `scrape_website`). At most `scraper_max_concurrent_companies` companies run
+    at once and at most `scraper_max_concurrent_per_host` of them share a host; rows for a busy
+    host are set aside while workers go on with other hosts. All companies share one
+    BrowserPool, created here unless passed in, and one HTTP client (by default the process-wide
+    pooled client).
+
+    Yields dicts with `input_row_id`, `company_name_or_id`, `given_url`, `results` (the
+    `scrape_website` return value) and `error` (None unless scraping raised).
+    """
+    row_iterator = enumerate(rows)
+    completed: asyncio.Queue = asyncio.Queue()
+    host_limiter = get_host_limiter(config)
+    worker_count = max(1, config.scraper_max_concurrent_companies)
+    # Rows whose host was at its limit when they came up, per host, and hosts that have freed a
+    # slot since. Workers take other rows meanwhile instead of waiting on a busy host.
+    parked: Dict[str, Deque[Tuple[int, Dict[str, Any]]]] = {}
+    parked_count = 0
+    freed_hosts: Deque[str] = deque()
+    rows_exhausted = False
+    slot_freed = asyncio.Event()
+
+    def _on_release(host: str):
+        if host in parked:
+            freed_hosts.append(host)
+        slot_freed.set()
+
+    def _next_row() -> Optional[Tuple[int, Dict[str, Any], str]]:
+        """Returns the next row whose host has a free slot, with that slot taken, or None."""
+        nonlocal parked_count, rows_exhausted
+        while freed_hosts:
+            host = freed_hosts.popleft()
+            if host in parked and host_limiter.try_acquire(host):
+                row_index, row = parked[host].popleft()
+                if not parked[host]:
+                    del parked[host]
+                parked_count -= 1
+                return row_index, row, host
+        # Parking is capped, so a long run of rows for one host is not read into memory at once.
+        while not rows_exhausted and parked_count < worker_count * _MAX_PARKED_ROWS_PER_WORKER:
+            next_row = next(row_iterator, None)
+            if next_row is None:
+                rows_exhausted = True
+                break
+            row_index, row = next_row
+            host = host_key(row.get("given_url"))
+            if host not in parked and host_limiter.try_acquire(host):
+                return row_index, row, host
+            parked.setdefault(host, deque()).append((row_index, row))
+            parked_count += 1
+        return None
+
+    async with AsyncExitStack() as exit_stack:
+        if browser_pool is None:
+            browser_pool = await exit_stack.enter_async_context(BrowserPool(config))
+        if http_client is None:
+            http_client = get_shared_http_client(config)
+
+        async def _batch_worker():
+            while True:
+                slot_freed.clear()
+                claimed = _next_row()
+                if claimed is None:
+                    if rows_exhausted and not parked:
+                        return
+                    await slot_freed.wait()
+                    continue
+                row_index, row, host = claimed
+                given_url = row.get("given_url")
+                company_name_or_id = row.get("company_name_or_id") or str(given_url)
+                input_row_id = row.get("input_row_id", row_index)
+                item: Dict[str, Any] = {
+                    "input_row_id": input_row_id,
+                    "company_name_or_id": company_name_or_id,
+                    "given_url": given_url,
+                    "results": [],
+                    "error": None
+                }
+                try:
+                    item["results"] = await scrape_website(
+                        given_url, config, output_dir_for_run, company_name_or_id, input_row_id,
+                        browser_pool=browser_pool, http_client=http_client
+                    )
+                except Exception as e:
+                    logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Batch scrape failed: {e}", exc_info=True)
+                    item["error"] = f"{type(e).__name__}: {e}"
+                finally:
+                    host_limiter.release(host)
+                await completed.put(item)
+
+        host_limiter.add_release_listener(_on_release)
+        exit_stack.callback(host_limiter.remove_release_listener, _on_release)
+        # A fixed set of workers shares the row iterator, which bounds concurrency without
+        # materialising a task per row.
+        workers = [asyncio.create_task(_batch_worker()) for _ in range(worker_count)]
+        all_workers_done = asyncio.gather(*workers)
+        try:
+            while True:
+                get_next = asyncio.ensure_future(completed.get())
+                await asyncio.wait({get_next, all_workers_done}, return_when=asyncio.FIRST_COMPLETED)
+                if get_next.done():
+                    yield get_next.result()
+                    continue
+                get_next.cancel()
+                all_workers_done.result()  # Re-raises a worker failure, e.g. an invalid row.
+                while not completed.empty():
+                    yield completed.get_nowait()
+                break
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # Stale cache entries served above are refreshed with the shared pool and client.
+            await wait_for_revalidations()
+            if config.caching_enabled:
+                get_scrape_cache(config).flush()
+
+
+async def scrape_many(
+    rows: Iterable[Dict[str, Any]],
+    config: ScraperConfig,
+    output_dir_for_run: str,
+    results_path: Optional[str] = None,
+    browser_pool: Optional[BrowserPool] = None,
+    http_client: Optional[httpx.AsyncClient] = None
+) -> List[Dict[str, Any]]:
+    """
+    Runs `iter_scrape_many` to completion, appending each finished company as one JSON line
+    to `results_path` (default: `<output_dir_for_run>/batch_results.jsonl`) as soon as it completes.
+    Returns all batch items in completion order.
+    """
+    os.makedirs(output_dir_for_run, exist_ok=True)
+    if results_path is None:
+        results_path = os.path.join(output_dir_for_run, "batch_results.jsonl")
+
+    batch_items: List[Dict[str, Any]] = []
+    with open(results_path, 'a', encoding='utf-8') as results_file:
+        async for item in iter_scrape_many(rows, config, output_dir_for_run, browser_pool, http_client):
+            batch_items.append(item)
+            results_file.write(json.dumps(item, default=str) + "\n")
+            results_file.flush()
+    logger.info(f"Batch finished: {len(batch_items)} companies scraped, results written to {results_path}.")
+    return batch_items
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from .config import ScraperConfig
+from .dns_cache import get_dns_cache
+
+logger = logging.getLogger(__name__)
+
+
+class _BrowserSlot:
+    """
+    Bookkeeping for a single warm browser owned by the pool.
+    """
+    def __init__(self, index: int, browser: Browser, resolver_rules_expire_at: Optional[float] = None):
+        self.index = index
+        self.browser = browser
+        # Monotonic time the browser's --host-resolver-rules go stale, if it was launched with any.
+        self.resolver_rules_expire_at = resolver_rules_expire_at
+        self.active_contexts = 0
+        self.contexts_served = 0
+        self.retiring = False
+        self.recycling = False
+
+
+def _read_process_rss_mb(pid: int) -> Optional[float]:
+    """
+    Reads the resident set size of a process from /proc. Returns None where /proc is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/statm", 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class BrowserPool:
+    """
+    A long-lived pool of warm Chromium browsers that hands out a fresh BrowserContext per company.
+
+    Browsers are launched once when the pool is entered and recycled after serving
+    `browser_pool_max_contexts_per_browser` contexts or exceeding `browser_pool_max_memory_mb`
+    of resident memory, or once the DNS resolver rules it was launched with go stale. A retiring
+    browser stops receiving new contexts and is relaunched as soon as its last active context is closed.
+
+    Usage:
+        async with BrowserPool(config) as pool:
+            async with pool.context(user_agent=...) as context:
+                ...
+    """
+    def __init__(self, config: ScraperConfig, size: Optional[int] = None):
+        self.config = config
+        self.size = max(1, size if size is not None else config.browser_pool_size)
+        self._playwright_manager = None
+        self._playwright: Optional[Playwright] = None
+        self._slots: List[_BrowserSlot] = []
+        self._next_slot_index = 0
+        self._context_slots: Dict[BrowserContext, _BrowserSlot] = {}
+        self._lock = asyncio.Lock()
+        self._closed = True
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """
+        Starts Playwright and launches the pool's browsers.
+        """
+        if not self._closed:
+            return
+        self._playwright_manager = async_playwright()
+        self._playwright = await self._playwright_manager.start()
+        self._closed = False
+        try:
+            for _ in range(self.size):
+                self._slots.append(await self._new_slot())
+        except Exception:
+            await self.close()
+            raise
+        logger.info(f"BrowserPool started with {self.size} browser(s).")
+
+    async def close(self):
+        """
+        Closes every browser in the pool and stops Playwright.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for slot in self._slots:
+            try:
+                await slot.browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing pooled browser #{slot.index}: {e}")
+        self._slots = []
+        self._context_slots = {}
+        if self._playwright_manager:
+            await self._playwright_manager.__aexit__(None, None, None)
+        self._playwright_manager = None
+        self._playwright = None
+        logger.info("BrowserPool closed.")
+
+    async def _launch_browser(self) -> Tuple[Browser, Optional[float]]:
+        """
+        Launches a browser. Also returns when its DNS resolver rules go stale (None without rules).
+        """
+        if not self._playwright:
+            raise RuntimeError("BrowserPool has not been started.")
+        launch_args: List[str] = []
+        rules_expire_at: Optional[float] = None
+        if self.config.dns_cache_enabled and self.config.dns_cache_chromium_resolver_rules:
+            # Chromium only reads resolver rules at launch, so each (re)launched browser gets the hosts cached so far.
+            resolver_rules, rules_expire_at = get_dns_cache(self.config).chromium_host_resolver_rules()
+            if resolver_rules:
+                launch_args.append(f"--host-resolver-rules={resolver_rules}")
+        browser = await self._playwright.chromium.launch(headless=self.config.headless_mode, args=launch_args)
+        return browser, rules_expire_at
+
+    async def _new_slot(self) -> _BrowserSlot:
+        slot = _BrowserSlot(self._next_slot_index, *await self._launch_browser())
+        self._next_slot_index += 1
+        return slot
+
+    async def new_context(self, **context_options: Any) -> BrowserContext:
+        """
+        Creates a fresh BrowserContext on the least-loaded healthy browser.
+        The context must be handed back through `release_context` once the caller is done with it.
+        """
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("BrowserPool is closed.")
+            now = time.monotonic()
+            stale_slots = [s for s in self._slots if not s.retiring and s.resolver_rules_expire_at is not None and s.resolver_rules_expire_at <= now]
+            for stale_slot in stale_slots:
+                logger.info(f"DNS resolver rules of pooled browser #{stale_slot.index} are stale; marking for recycle.")
+                stale_slot.retiring = True
+            candidates = [s for s in self._slots if not s.retiring and s.browser.is_connected()]
+            if not candidates:
+                # Every browser is retiring or has crashed; launch a replacement rather than waiting.
+                slot = await self._new_slot()
+                self._slots.append(slot)
+                candidates = [slot]
+            slot = min(candidates, key=lambda s: (s.active_contexts, s.contexts_served))
+            slot.active_contexts += 1
+            slot.contexts_served += 1
+            if self.config.browser_pool_max_contexts_per_browser > 0 and \
+               slot.contexts_served >= self.config.browser_pool_max_contexts_per_browser:
+                logger.info(f"Pooled browser #{slot.index} served {slot.contexts_served} contexts; marking for recycle.")
+                slot.retiring = True
+        try:
+            context = await slot.browser.new_context(**context_options)
+        except Exception:
+            async with self._lock:
+                slot.active_contexts -= 1
+            await self._recycle_if_idle(slot)
+            raise
+        finally:
+            for stale_slot in stale_slots:
+                # Idle browsers get no release_context call that would recycle them.
+                await self._recycle_if_idle(stale_slot)
+        self._context_slots[context] = slot
+        return context
+
+    async def release_context(self, context: BrowserContext):
+        """
+        Closes a context obtained from `new_context` and recycles its browser if it is due.
+        """
+        slot = self._context_slots.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled context: {e}")
+        if slot is None:
+            return
+        async with self._lock:
+            slot.active_contexts -= 1
+        if not slot.retiring and self.config.browser_pool_max_memory_mb > 0:
+            rss_mb = await self._browser_rss_mb(slot.browser)
+            if rss_mb is not None and rss_mb > self.config.browser_pool_max_memory_mb:
+                logger.info(f"Pooled browser #{slot.index} uses {rss_mb:.0f} MB (limit {self.config.browser_pool_max_memory_mb} MB); marking for recycle.")
+                slot.retiring = True
+        await self._recycle_if_idle(slot)
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[BrowserContext]:
+        """
+        Async context manager wrapper around `new_context` / `release_context`.
+        """
+        context = await self.new_context(**context_options)
+        try:
+            yield context
+        finally:
+            await self.release_context(context)
+
+    async def _recycle_if_idle(self, slot: _BrowserSlot):
+        async with self._lock:
+            if self._closed or not slot.retiring or slot.recycling or slot.active_contexts > 0 or slot not in self._slots:
+                return
+            # The slot stays marked as retiring while relaunching, so no new context is placed on it.
+            slot.recycling = True
+            # Surplus browsers launched while every slot was retiring are shrunk back to the configured size.
+            shrink = len(self._slots) > self.size
+            if shrink:
+                self._slots.remove(slot)
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            logger.debug(f"Error closing retired browser #{slot.index}: {e}")
+        if shrink:
+            logger.info(f"Surplus pooled browser #{slot.index} closed.")
+            return
+        try:
+            new_browser, rules_expire_at = await self._launch_browser()
+        except Exception as e:
+            logger.error(f"Failed to relaunch pooled browser #{slot.index}: {e}", exc_info=True)
+            async with self._lock:
+                if slot in self._slots:
+                    self._slots.remove(slot)
+            return
+        async with self._lock:
+            if self._closed:
+                await new_browser.close()
+                return
+            slot.browser = new_browser
+            slot.resolver_rules_expire_at = rules_expire_at
+            slot.contexts_served = 0
+            slot.retiring = False
+            slot.recycling = False
+        logger.info(f"Pooled browser #{slot.index} recycled.")
+
+    async def _browser_rss_mb(self, browser: Browser) -> Optional[float]:
+        """
+        Sums the resident memory of all processes belonging to a browser.
+        Returns None if the process list or their memory usage cannot be determined.
+        """
+        try:
+            session = await browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+        except Exception as e:
+            logger.debug(f"Could not query browser process info: {e}")
+            return None
+        total_mb = 0.0
+        for process in info.get("processInfo", []):
+            rss_mb = _read_process_rss_mb(process.get("id", -1))
+            if rss_mb is None:
+                return None
+            total_mb += rss_mb
+        return total_mb
@@ -1,11 +1,21 @@
 import os
 import json
+import time
+import atexit
 import hashlib
 import logging
-from typing import Optional, List, Dict, Any
+import sqlite3
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple, Set, Iterable
+
+from .config import ScraperConfig
+from .sqlite_cache import SqliteCacheBackend
 
 logger = logging.getLogger(__name__)
 
+# Cache files hold {"saved_at": <unix time>, "results": [...]}. Files written before entries had
+# timestamps hold the bare results list; their modification time stands in for `saved_at`.
+
 def generate_cache_key(url: str) -> str:
     """
     Generates a safe and unique filename key for a given URL.
@@ -14,20 +24,61 @@ def generate_cache_key(url: str) -> str:
     normalized_url = url.strip().lower()
     return hashlib.sha256(normalized_url.encode('utf-8')).hexdigest()
 
-def load_from_cache(key: str, cache_dir: str) -> Optional[List[Dict[str, Any]]]:
+def _cache_path(key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{key}.json")
+
+def _parse_cache_text(text: str, cache_path: str) -> Tuple[List[Dict[str, Any]], float]:
+    document = json.loads(text)
+    if isinstance(document, list):
+        return document, os.path.getmtime(cache_path)
+    return document["results"], float(document["saved_at"])
+
+def _read_cache_file(key: str, cache_dir: str) -> Tuple[Optional[List[Dict[str, Any]]], float, int]:
     """
-    Loads scraping results from a cache file if it exists.
+    Returns the results stored under `key`, when they were saved and the size of their file,
+    or (None, 0, 0).
     """
-    cache_path = os.path.join(cache_dir, f"{key}.json")
-    if os.path.exists(cache_path):
+    cache_path = _cache_path(key, cache_dir)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        data, saved_at = _parse_cache_text(text, cache_path)
+        logger.info(f"Cache hit. Loading results from {cache_path}")
+        return data, saved_at, len(text)
+    except FileNotFoundError:
+        return None, 0, 0
+    except (IOError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Error loading from cache file {cache_path}: {e}")
+        return None, 0, 0
+
+def _write_cache_file(key: str, data: List[Dict[str, Any]], cache_dir: str, saved_at: Optional[float] = None, indent: Optional[int] = 4) -> int:
+    """
+    Writes results to their cache file. Returns the size of the file, or 0 if it could not be written.
+    The file is replaced atomically, so concurrent readers never see a partial entry.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = _cache_path(key, cache_dir)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    text = json.dumps({"saved_at": time.time() if saved_at is None else saved_at, "results": data}, indent=indent)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, cache_path)
+        logger.info(f"Saved results to cache: {cache_path}")
+        return len(text)
+    except IOError as e:
+        logger.error(f"Error saving to cache file {cache_path}: {e}")
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                logger.info(f"Cache hit. Loading results from {cache_path}")
-                return json.load(f)
-        except (IOError, json.JSONDecodeError) as e:
-            logger.error(f"Error loading from cache file {cache_path}: {e}")
-            return None
-    return None
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return 0
+
+def load_from_cache(key: str, cache_dir: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Loads scraping results from a cache file if it exists, regardless of their age.
+    """
+    return _read_cache_file(key, cache_dir)[0]
 
 def save_to_cache(key: str, data: List[Dict[str, Any]], cache_dir: str):
     """
@@ -35,12 +86,378 @@ def save_to_cache(key: str, data: List[Dict[str, Any]], cache_dir: str):
     """
     if not data:
         return # Do not save empty results
+    _write_cache_file(key, data, cache_dir)
 
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_path = os.path.join(cache_dir, f"{key}.json")
+
+def _scan_cache_dir(cache_dir: str) -> List[os.DirEntry]:
     try:
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
-            logger.info(f"Saved results to cache: {cache_path}")
-    except IOError as e:
-        logger.error(f"Error saving to cache file {cache_path}: {e}")
\ No newline at end of file
+        return [entry for entry in os.scandir(cache_dir) if entry.is_file() and entry.name.endswith('.json')]
+    except FileNotFoundError:
+        return []
+
+def cache_stats(cache_dir: str, ttl_seconds: float = 0, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Reads every entry in `cache_dir` and summarises the cache: entry count and size, how many
+    entries are expired under `ttl_seconds`, still in the old untimestamped format, or unreadable,
+    and the oldest and newest save times.
+    """
+    now = time.time() if now is None else now
+    stats: Dict[str, Any] = {
+        "entries": 0, "bytes": 0, "expired": 0, "legacy_entries": 0, "corrupt_entries": 0,
+        "temp_files": 0, "oldest_saved_at": None, "newest_saved_at": None,
+    }
+    try:
+        stats["temp_files"] = sum(1 for entry in os.scandir(cache_dir) if entry.name.endswith('.tmp'))
+    except FileNotFoundError:
+        return stats
+    for entry in _scan_cache_dir(cache_dir):
+        stats["entries"] += 1
+        stats["bytes"] += entry.stat().st_size
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            if text.lstrip().startswith('['):
+                stats["legacy_entries"] += 1
+            _, saved_at = _parse_cache_text(text, entry.path)
+        except (IOError, ValueError, KeyError, TypeError):
+            stats["corrupt_entries"] += 1
+            continue
+        if ttl_seconds > 0 and saved_at + ttl_seconds < now:
+            stats["expired"] += 1
+        stats["oldest_saved_at"] = saved_at if stats["oldest_saved_at"] is None else min(stats["oldest_saved_at"], saved_at)
+        stats["newest_saved_at"] = saved_at if stats["newest_saved_at"] is None else max(stats["newest_saved_at"], saved_at)
+    return stats
+
+def prune_cache(cache_dir: str, ttl_seconds: float = 0, max_bytes: int = 0, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    With `ttl_seconds` > 0, deletes entries saved longer ago than that and unreadable entries.
+    Then deletes the least recently used entries (by modification time, which lookups refresh)
+    until the cache takes at most `max_bytes` (if > 0). Returns counts of what was removed and
+    what remains, and the keys of the removed entries.
+    """
+    now = time.time() if now is None else now
+    removed_keys: Set[str] = set()
+    result = {"removed_expired": 0, "removed_corrupt": 0, "removed_for_size": 0}
+    entries = []
+    for entry in _scan_cache_dir(cache_dir):
+        key = entry.name[:-len('.json')]
+        stat = entry.stat()
+        if ttl_seconds > 0:
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    _, saved_at = _parse_cache_text(f.read(), entry.path)
+            except FileNotFoundError:
+                continue
+            except (IOError, ValueError, KeyError, TypeError):
+                reason = "removed_corrupt"
+            else:
+                reason = "removed_expired" if saved_at + ttl_seconds < now else None
+            if reason is not None:
+                if _remove_file(entry.path):
+                    result[reason] += 1
+                    removed_keys.add(key)
+                continue
+        entries.append((stat.st_mtime, stat.st_size, key, entry.path))
+
+    total_bytes = sum(size for _, size, _, _ in entries)
+    remaining_entries = len(entries)
+    if max_bytes > 0 and total_bytes > max_bytes:
+        for _, size, key, path in sorted(entries):
+            if total_bytes <= max_bytes:
+                break
+            if _remove_file(path):
+                total_bytes -= size
+                remaining_entries -= 1
+                result["removed_for_size"] += 1
+                removed_keys.add(key)
+    result.update(remaining_entries=remaining_entries, remaining_bytes=total_bytes, removed_keys=removed_keys)
+    return result
+
+def compact_cache(cache_dir: str) -> Dict[str, int]:
+    """
+    Rewrites every entry without indentation, converting old untimestamped entries to the current
+    format (keeping their modification time as save time), and deletes unreadable entries and
+    temporary files left by interrupted writes. Returns counts and the sizes before and after.
+    """
+    result = {"rewritten": 0, "removed_corrupt": 0, "removed_temp_files": 0, "bytes_before": 0, "bytes_after": 0}
+    try:
+        temp_files = [entry.path for entry in os.scandir(cache_dir) if entry.name.endswith('.tmp')]
+    except FileNotFoundError:
+        return result
+    for path in temp_files:
+        if _remove_file(path):
+            result["removed_temp_files"] += 1
+    for entry in _scan_cache_dir(cache_dir):
+        key = entry.name[:-len('.json')]
+        stat = entry.stat()
+        result["bytes_before"] += stat.st_size
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                data, saved_at = _parse_cache_text(f.read(), entry.path)
+        except FileNotFoundError:
+            continue
+        except (IOError, ValueError, KeyError, TypeError):
+            if _remove_file(entry.path):
+                result["removed_corrupt"] += 1
+            continue
+        size = _write_cache_file(key, data, cache_dir, saved_at=saved_at, indent=None)
+        if size:
+            # Keep the last-used order that size-based pruning relies on.
+            os.utime(entry.path, (stat.st_atime, stat.st_mtime))
+            result["rewritten"] += 1
+            result["bytes_after"] += size
+        else:
+            result["bytes_after"] += stat.st_size
+    return result
+
+def _remove_file(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.error(f"Could not remove cache file {path}: {e}")
+        return False
+
+
+class JsonCacheBackend:
+    """
+    The default cache store: one JSON file per entry in `cache_dir`. The modification time of a
+    file records when its entry was last used.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self._total_bytes: Optional[int] = None
+
+    def read(self, key: str) -> Tuple[Optional[List[Dict[str, Any]]], float, int]:
+        return _read_cache_file(key, self.cache_dir)
+
+    def write(self, key: str, data: List[Dict[str, Any]], saved_at: float, url: Optional[str] = None) -> int:
+        previous_size = 0
+        if self._total_bytes is not None:
+            try:
+                previous_size = os.path.getsize(_cache_path(key, self.cache_dir))
+            except OSError:
+                pass
+        size = _write_cache_file(key, data, self.cache_dir, saved_at=saved_at)
+        if size and self._total_bytes is not None:
+            self._total_bytes += size - previous_size
+        return size
+
+    def touch(self, keys: Iterable[str]):
+        for key in keys:
+            try:
+                os.utime(_cache_path(key, self.cache_dir))
+            except OSError:
+                pass
+
+    def total_bytes(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(entry.stat().st_size for entry in _scan_cache_dir(self.cache_dir))
+        return self._total_bytes
+
+    def prune(self, ttl_seconds: float = 0, max_bytes: int = 0, now: Optional[float] = None) -> Dict[str, Any]:
+        result = prune_cache(self.cache_dir, ttl_seconds, max_bytes, now)
+        self._total_bytes = result["remaining_bytes"]
+        return result
+
+    def stats(self, ttl_seconds: float = 0, now: Optional[float] = None) -> Dict[str, Any]:
+        return cache_stats(self.cache_dir, ttl_seconds, now)
+
+    def compact(self) -> Dict[str, int]:
+        self._total_bytes = None
+        return compact_cache(self.cache_dir)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_cache_backend(config: ScraperConfig):
+    """
+    Returns the cache store selected by `config.cache_backend`: 'json' (files in `cache_dir`)
+    or 'sqlite' (the database at `cache_sqlite_path`).
+    """
+    if config.cache_backend == 'sqlite':
+        return SqliteCacheBackend(config.cache_sqlite_path, batch_size=config.cache_sqlite_batch_size)
+    if config.cache_backend != 'json':
+        logger.warning(f"Unknown cache backend: '{config.cache_backend}'. Defaulting to json.")
+    return JsonCacheBackend(config.cache_dir)
+
+
+def migrate_json_cache(cache_dir: str, backend, delete_json: bool = False) -> Dict[str, int]:
+    """
+    Copies every readable entry of the JSON cache in `cache_dir` into `backend`, keeping its save
+    time. JSON entries only know their key, so the URL stored for an entry is that of its first
+    result. With `delete_json`, migrated files are deleted. Returns counts of migrated and
+    unreadable entries.
+    """
+    result = {"migrated": 0, "skipped_corrupt": 0}
+    for entry in _scan_cache_dir(cache_dir):
+        key = entry.name[:-len('.json')]
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                data, saved_at = _parse_cache_text(f.read(), entry.path)
+        except FileNotFoundError:
+            continue
+        except (IOError, ValueError, KeyError, TypeError):
+            result["skipped_corrupt"] += 1
+            continue
+        first_url = data[0].get("url") if data and isinstance(data[0], dict) else None
+        if backend.write(key, data, saved_at, first_url):
+            result["migrated"] += 1
+            if delete_json:
+                backend.flush()
+                _remove_file(entry.path)
+    backend.flush()
+    return result
+
+
+class ScrapeCache:
+    """
+    Scraping results cached in memory in front of a persistent store, by default the JSON files
+    in `cache_dir` (see `create_cache_backend` for the SQLite store).
+
+    The memory tier is an LRU bounded by `max_entries` and by `max_bytes` (the size of the entries'
+    serialized results). Lookups that miss it read the store and promote the entry. Callers get
+    copies of the result rows, so changing them does not change the cache.
+
+    Entries older than `ttl_seconds` (if > 0) are stale: `get` treats them as misses, `lookup`
+    returns them flagged as stale so callers can serve them while refreshing. With `max_disk_bytes`
+    (if > 0), writes that take the store past that size delete the least recently used entries
+    down to 90% of it.
+    """
+    def __init__(self, cache_dir: str, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: float = 0, max_disk_bytes: int = 0, backend=None):
+        self.cache_dir = cache_dir
+        self.backend = backend if backend is not None else JsonCacheBackend(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, Tuple[List[Dict[str, Any]], int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    @staticmethod
+    def _copy(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [dict(row) if isinstance(row, dict) else row for row in data]
+
+    def _is_stale(self, saved_at: float) -> bool:
+        return self.ttl_seconds > 0 and saved_at + self.ttl_seconds < time.time()
+
+    def lookup(self, key: str) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """Returns the cached results for `key` (or None) and whether they are stale."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            data, _, saved_at = entry
+        else:
+            data, saved_at, size = self.backend.read(key)
+            if data is None:
+                self.misses += 1
+                return None, False
+            self.disk_hits += 1
+            # The last use orders entries for size-based pruning.
+            self.backend.touch([key])
+            self._remember(key, data, size, saved_at)
+        stale = self._is_stale(saved_at)
+        if stale:
+            self.stale_hits += 1
+        return self._copy(data), stale
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Returns the cached results for `key`, or None if there are none or they are stale."""
+        data, stale = self.lookup(key)
+        return None if stale else data
+
+    def put(self, key: str, data: List[Dict[str, Any]], url: Optional[str] = None):
+        """Stores results (scraped from `url`) in the store and in memory. Empty results are not cached."""
+        if not data:
+            return
+        saved_at = time.time()
+        try:
+            size = self.backend.write(key, data, saved_at, url)
+            if not size:
+                return
+            self._remember(key, self._copy(data), size, saved_at)
+            if self.max_disk_bytes > 0 and self.backend.total_bytes() > self.max_disk_bytes:
+                self._evict_from_disk()
+        except sqlite3.Error as e:
+            # A locked or unreadable database must not turn a finished scrape into an error.
+            logger.error(f"Error saving results for cache key {key}: {e}")
+
+    def _evict_from_disk(self):
+        # Memory hits do not reach the store, so the entries held in memory (the recently used
+        # ones) are marked as used before pruning by last use.
+        self.backend.touch(list(self._entries))
+        # Pruning below the cap leaves room for many writes before the next pruning pass.
+        pruned = self.backend.prune(max_bytes=int(self.max_disk_bytes * 0.9))
+        if pruned.get("error"):
+            return
+        self.disk_evictions += pruned["removed_for_size"]
+        for key in pruned["removed_keys"]:
+            self._forget(key)
+        logger.info(f"Result cache exceeded {self.max_disk_bytes} bytes; removed {pruned['removed_for_size']} least recently used entries.")
+
+    def flush(self):
+        """Writes results the store still buffers."""
+        self.backend.flush()
+
+    def _forget(self, key: str):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+
+    def _remember(self, key: str, data: List[Dict[str, Any]], size: int, saved_at: float):
+        self._forget(key)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        self._entries[key] = (data, size, saved_at)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+            "stale_hits": self.stale_hits, "evictions": self.evictions, "disk_evictions": self.disk_evictions,
+            "entries": len(self._entries), "bytes": self._bytes,
+        }
+
+
+_scrape_cache: Optional[Tuple[Tuple[str, str, str], ScrapeCache]] = None
+
+
+def get_scrape_cache(config: ScraperConfig) -> ScrapeCache:
+    """
+    Returns the process-wide ScrapeCache for the configured backend and location, created on
+    first use. Results a SQLite store still buffers are written when the process exits.
+    """
+    global _scrape_cache
+    settings = (config.cache_backend, config.cache_dir, config.cache_sqlite_path)
+    if _scrape_cache is None or _scrape_cache[0] != settings:
+        if _scrape_cache is not None:
+            _scrape_cache[1].backend.close()
+        backend = create_cache_backend(config)
+        atexit.register(backend.close)
+        _scrape_cache = (settings, ScrapeCache(
+            config.cache_dir,
+            max_entries=config.cache_memory_max_entries,
+            max_bytes=config.cache_memory_max_bytes,
+            ttl_seconds=config.cache_ttl_seconds,
+            max_disk_bytes=config.cache_max_disk_bytes,
+            backend=backend,
+        ))
+    return _scrape_cache[1]
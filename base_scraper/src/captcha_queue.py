@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .config import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+
+class CaptchaSolveError(Exception):
+    """Raised by a provider when it rejects a challenge or cannot solve it."""
+
+
+class CaptchaSolveQueue:
+    """
+    Hands CAPTCHA challenges to a solving provider and waits for the tokens without blocking the crawl.
+
+    Each solve runs as its own task that submits the challenge and polls the provider every
+    `poll_interval_seconds`, so other pages keep loading while a page waits for its token. At most
+    `max_concurrent_solves` challenges are with the provider at a time; further ones wait for a slot.
+    Pages that hit the same challenge (kind, site key and host) share one solve, and its token is
+    reused for `token_ttl_seconds`.
+
+    The provider is the solver passed to `solve`, which implements
+    `submit_challenge(client, challenge, page_url) -> task id` and
+    `get_result(client, task_id) -> token or None while not ready`.
+    """
+    def __init__(self, max_concurrent_solves: int = 4, poll_interval_seconds: float = 5.0,
+                 solve_timeout_seconds: float = 180.0, token_ttl_seconds: float = 110.0):
+        self.poll_interval_seconds = poll_interval_seconds
+        self.solve_timeout_seconds = solve_timeout_seconds
+        self.token_ttl_seconds = token_ttl_seconds
+        self._slots = asyncio.Semaphore(max(1, max_concurrent_solves))
+        self._tokens: Dict[Tuple[str, Optional[str], str], Tuple[str, float]] = {}
+        self._in_flight: Dict[Tuple[str, Optional[str], str], "asyncio.Future[Optional[str]]"] = {}
+        self.submitted = 0
+        self.solved = 0
+        self.failed = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def challenge_key(challenge: Dict[str, Any], page_url: str) -> Tuple[str, Optional[str], str]:
+        return (challenge["kind"], challenge.get("sitekey"), (urlsplit(page_url).hostname or '').lower())
+
+    async def solve(self, solver: Any, client: httpx.AsyncClient, challenge: Dict[str, Any], page_url: str) -> Optional[str]:
+        """Returns a token for the challenge, or None if it could not be solved in time."""
+        key = self.challenge_key(challenge, page_url)
+        cached = self._tokens.get(key)
+        if cached is not None:
+            token, expires_at = cached
+            if expires_at > time.monotonic():
+                self.cache_hits += 1
+                logger.debug(f"Reusing solved {key[0]} token for {key[2]}.")
+                return token
+            del self._tokens[key]
+
+        solve = self._in_flight.get(key)
+        if solve is None:
+            solve = asyncio.ensure_future(self._solve(solver, client, challenge, page_url, key))
+            self._in_flight[key] = solve
+            solve.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(solve)
+
+    async def _solve(self, solver: Any, client: httpx.AsyncClient, challenge: Dict[str, Any], page_url: str, key: Tuple[str, Optional[str], str]) -> Optional[str]:
+        queued_at = time.monotonic()
+        async with self._slots:
+            started = time.monotonic()
+            if started - queued_at > 0.01:
+                logger.debug(f"{key[0]} challenge for {key[2]} waited {started - queued_at:.1f}s for a solver slot.")
+            try:
+                task_id = await solver.submit_challenge(client, challenge, page_url)
+                self.submitted += 1
+                logger.info(f"Submitted {key[0]} challenge for {key[2]} (task {task_id}).")
+                deadline = started + self.solve_timeout_seconds
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(self.poll_interval_seconds)
+                    token = await solver.get_result(client, task_id)
+                    if token is not None:
+                        self.solved += 1
+                        self._tokens[key] = (token, time.monotonic() + self.token_ttl_seconds)
+                        logger.info(f"Solved {key[0]} challenge for {key[2]} in {time.monotonic() - started:.1f}s.")
+                        return token
+                logger.error(f"Timed out after {self.solve_timeout_seconds}s waiting for the {key[0]} solution for {key[2]} (task {task_id}).")
+            except CaptchaSolveError as e:
+                logger.error(f"CAPTCHA provider could not solve the {key[0]} challenge for {key[2]}: {e}")
+            except httpx.HTTPError as e:
+                logger.error(f"HTTP error talking to the CAPTCHA provider for {key[2]}: {e}")
+            except (ValueError, KeyError) as e:
+                # A body that is not JSON, or JSON without the expected fields.
+                logger.error(f"Unexpected response from the CAPTCHA provider for {key[2]}: {type(e).__name__}: {e}")
+            self.failed += 1
+            return None
+
+
+_solve_queue: Optional[Tuple[asyncio.AbstractEventLoop, CaptchaSolveQueue]] = None
+
+
+def get_captcha_queue(config: ScraperConfig) -> CaptchaSolveQueue:
+    """
+    Returns the process-wide CAPTCHA solve queue of the running event loop, created on first use.
+    """
+    global _solve_queue
+    loop = asyncio.get_running_loop()
+    if _solve_queue is not None and _solve_queue[0] is loop:
+        return _solve_queue[1]
+    queue = CaptchaSolveQueue(
+        max_concurrent_solves=config.captcha_max_concurrent_solves,
+        poll_interval_seconds=config.captcha_poll_interval_seconds,
+        solve_timeout_seconds=config.captcha_solve_timeout_seconds,
+        token_ttl_seconds=config.captcha_token_ttl_seconds,
+    )
+    _solve_queue = (loop, queue)
+    return queue
@@ -1,74 +1,255 @@
 import logging
-import asyncio
+import time
 import httpx
 from abc import ABC, abstractmethod
-from typing import Optional
-from playwright.async_api import Page
+from typing import Optional, Dict, Any, Mapping
+from weakref import WeakKeyDictionary
+from playwright.async_api import Page, Error as PlaywrightError
 from .config import ScraperConfig
+from .captcha_queue import CaptchaSolveError, get_captcha_queue
+from .http_client import get_shared_http_client
 
 logger = logging.getLogger(__name__)
 
+# (challenge kind, CSS selector) pairs; the first visible element matching any of them is reported.
+_CHALLENGE_SELECTORS = [
+    ("recaptcha", 'iframe[src*="/recaptcha/"]'),
+    ("recaptcha", ".g-recaptcha"),
+    ("hcaptcha", 'iframe[src*="hcaptcha.com"]'),
+    ("hcaptcha", ".h-captcha"),
+    ("turnstile", 'iframe[src*="challenges.cloudflare.com"]'),
+    ("turnstile", ".cf-turnstile"),
+    ("cloudflare_challenge", "#challenge-form"),
+    ("cloudflare_challenge", "#challenge-running"),
+    ("datadome", 'iframe[src*="captcha-delivery.com"]'),
+    ("perimeterx", "#px-captcha"),
+]
+
+# Response headers that mark a challenge page, as (header, value substring or None for any value).
+_CHALLENGE_HEADERS = [
+    ("cf-mitigated", "challenge"),
+    ("x-amzn-waf-action", "captcha"),
+]
+
+# Runs all selectors as one querySelectorAll. Invisible reCAPTCHA (v3 badges, size=invisible) is on
+# many ordinary pages and does not block them, so it is skipped.
+_DETECT_CHALLENGE_JS = """
+(pairs) => {
+    const elements = document.querySelectorAll(pairs.map(pair => pair[1]).join(','));
+    for (const el of elements) {
+        const src = el.getAttribute('src') || '';
+        if (src.includes('size=invisible') || el.getAttribute('data-size') === 'invisible' || el.closest('.grecaptcha-badge')) continue;
+        const rect = el.getBoundingClientRect();
+        if (el.tagName === 'IFRAME' && (!rect.width || !rect.height)) continue;
+        const kind = pairs.find(pair => el.matches(pair[1]))[0];
+        let sitekey = el.getAttribute('data-sitekey');
+        if (!sitekey && src) {
+            try {
+                const params = new URL(src, location.href).searchParams;
+                sitekey = params.get('k') || params.get('sitekey');
+            } catch (e) {}
+        }
+        return {kind: kind, sitekey: sitekey || null, source: 'dom'};
+    }
+    return null;
+}
+"""
+
+# Puts a solved token where the widget would have (its response fields) and calls the
+# widget's data-callback, which is how most pages submit or unlock after a solve.
+_INJECT_TOKEN_JS = """
+({kind, token}) => {
+    const fields = {
+        recaptcha: ['g-recaptcha-response'],
+        hcaptcha: ['h-captcha-response', 'g-recaptcha-response'],
+        turnstile: ['cf-turnstile-response'],
+    }[kind] || [];
+    let filled = 0;
+    for (const name of fields) {
+        for (const el of document.querySelectorAll(`[name="${name}"], #${name}`)) {
+            el.value = token;
+            filled++;
+        }
+    }
+    const widget = document.querySelector('[data-callback]');
+    const callback = widget ? window[widget.getAttribute('data-callback')] : null;
+    if (typeof callback === 'function') callback(token);
+    return filled;
+}
+"""
+
+_detection_stats: Dict[str, float] = {"checks": 0, "detections": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+
+def get_captcha_detection_stats() -> Dict[str, Any]:
+    """
+    Returns the number of CAPTCHA checks and detections of this process and the time spent checking.
+    """
+    checks = _detection_stats["checks"]
+    return {
+        "checks": checks,
+        "detections": _detection_stats["detections"],
+        "total_ms": round(_detection_stats["total_ms"], 2),
+        "avg_ms": round(_detection_stats["total_ms"] / checks, 2) if checks else 0.0,
+        "max_ms": round(_detection_stats["max_ms"], 2),
+    }
+
+
+def reset_captcha_detection_stats():
+    _detection_stats.update(checks=0, detections=0, total_ms=0.0, max_ms=0.0)
+
+
+def _challenge_from_headers(headers: Optional[Mapping[str, str]]) -> Optional[Dict[str, Any]]:
+    if not headers:
+        return None
+    lowered = {name.lower(): value.lower() for name, value in headers.items()}
+    for header, marker in _CHALLENGE_HEADERS:
+        value = lowered.get(header)
+        if value is not None and (marker is None or marker in value):
+            return {"kind": header, "sitekey": None, "source": "header"}
+    return None
+
+
 class BaseCaptchaSolver(ABC):
     """
     Abstract base class for a CAPTCHA solver.
     Defines the standard interface for detecting and solving CAPTCHAs.
+
+    One solver is shared by all pages of a browser context (see `get_captcha_solver`), so
+    methods take the page to work on; `page` is only the default.
     """
-    def __init__(self, page: Page, config: ScraperConfig):
+    def __init__(self, page: Optional[Page], config: ScraperConfig):
         self.page = page
         self.config = config
         if not self.config.captcha_api_key:
             raise ValueError("CAPTCHA solver requires an API key, but none was provided.")
 
-    @abstractmethod
-    async def detect_captcha(self) -> bool:
-        pass
+    async def detect_challenge(self, page: Optional[Page] = None, response_headers: Optional[Mapping[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the challenge shown on a page as a dict with its `kind`, the `sitekey` if the page
+        exposes one and the `source` of the detection ('header' or 'dom'), or None.
+
+        Checks the response headers first and otherwise makes a single DOM query; nothing waits
+        for a timeout, so pages without a CAPTCHA pay one round trip.
+        """
+        page = page or self.page
+        started = time.perf_counter()
+        challenge = _challenge_from_headers(response_headers)
+        if challenge is None:
+            try:
+                challenge = await page.evaluate(_DETECT_CHALLENGE_JS, _CHALLENGE_SELECTORS)
+            except PlaywrightError as e:
+                logger.debug(f"CAPTCHA detection failed on {page.url}: {e}")
+                challenge = None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _detection_stats["checks"] += 1
+        _detection_stats["total_ms"] += elapsed_ms
+        _detection_stats["max_ms"] = max(_detection_stats["max_ms"], elapsed_ms)
+        if challenge is not None:
+            _detection_stats["detections"] += 1
+            logger.info(f"{challenge['kind']} challenge detected on {page.url} (from {challenge['source']}, {elapsed_ms:.1f}ms).")
+        else:
+            logger.debug(f"No CAPTCHA detected on {page.url} ({elapsed_ms:.1f}ms).")
+        return challenge
+
+    async def detect_captcha(self, page: Optional[Page] = None, response_headers: Optional[Mapping[str, str]] = None) -> bool:
+        return await self.detect_challenge(page, response_headers) is not None
 
     @abstractmethod
-    async def solve_captcha(self) -> bool:
+    async def solve_captcha(self, page: Optional[Page] = None, challenge: Optional[Dict[str, Any]] = None) -> bool:
         pass
 
 class TwoCaptchaSolver(BaseCaptchaSolver):
     """
     A CAPTCHA solver for the 2Captcha service.
+
+    Challenges are submitted to `in.php` and their results polled from `res.php` through the
+    shared solve queue, so waiting for a token does not hold up other pages.
     """
-    def __init__(self, page: Page, config: ScraperConfig):
+    # Challenge kind -> (2Captcha method, name of the site key parameter)
+    _METHODS = {
+        "recaptcha": ("userrecaptcha", "googlekey"),
+        "hcaptcha": ("hcaptcha", "sitekey"),
+        "turnstile": ("turnstile", "sitekey"),
+    }
+
+    def __init__(self, page: Optional[Page], config: ScraperConfig):
         super().__init__(page, config)
-        self.api_url_in = "http://2captcha.com/in.php"
-        self.api_url_res = "http://2captcha.com/res.php"
+        base_url = config.captcha_api_base_url.rstrip('/')
+        self.api_url_in = f"{base_url}/in.php"
+        self.api_url_res = f"{base_url}/res.php"
+
+    def can_solve(self, challenge: Optional[Dict[str, Any]]) -> bool:
+        return challenge is not None and challenge["kind"] in self._METHODS and bool(challenge.get("sitekey"))
+
+    async def submit_challenge(self, client: httpx.AsyncClient, challenge: Dict[str, Any], page_url: str) -> str:
+        method, sitekey_param = self._METHODS[challenge["kind"]]
+        response = await client.post(self.api_url_in, data={
+            "key": self.config.captcha_api_key,
+            "method": method,
+            sitekey_param: challenge["sitekey"],
+            "pageurl": page_url,
+            "json": 1,
+        })
+        response.raise_for_status()
+        result = response.json()
+        if result.get("status") != 1:
+            raise CaptchaSolveError(result.get("request", "unknown error"))
+        return str(result["request"])
 
-    async def detect_captcha(self) -> bool:
-        # This is a placeholder. Real detection is highly site-specific.
-        # For now, we'll assume a CAPTCHA is detected if a known iframe is visible.
+    async def get_result(self, client: httpx.AsyncClient, task_id: str) -> Optional[str]:
+        response = await client.get(self.api_url_res, params={"key": self.config.captcha_api_key, "action": "get", "id": task_id, "json": 1})
+        response.raise_for_status()
+        result = response.json()
+        if result.get("status") == 1:
+            return result["request"]
+        if result.get("request") == "CAPCHA_NOT_READY":
+            return None
+        raise CaptchaSolveError(result.get("request", "unknown error"))
+
+    async def solve_captcha(self, page: Optional[Page] = None, challenge: Optional[Dict[str, Any]] = None) -> bool:
+        page = page or self.page
+        challenge = challenge or await self.detect_challenge(page)
+        if not self.can_solve(challenge):
+            logger.warning(f"Cannot solve {challenge['kind'] if challenge else 'unknown'} challenge on {page.url} with 2Captcha (unsupported kind or no site key).")
+            return False
+        token = await get_captcha_queue(self.config).solve(self, get_shared_http_client(self.config), challenge, page.url)
+        if token is None:
+            return False
         try:
-            iframe = self.page.frame_locator('iframe[src*="hcaptcha.com"], iframe[src*="recaptcha.google.com"]')
-            await iframe.locator('body').wait_for(timeout=1000)
-            logger.info("hCaptcha or reCAPTCHA iframe detected.")
-            return True
-        except Exception:
-            logger.debug("No standard CAPTCHA iframe detected.")
+            filled = await page.evaluate(_INJECT_TOKEN_JS, {"kind": challenge["kind"], "token": token})
+        except PlaywrightError as e:
+            logger.error(f"Could not hand the CAPTCHA token to {page.url}: {e}")
             return False
-
-    async def solve_captcha(self) -> bool:
-        # Placeholder implementation
-        logger.warning("solve_captcha called, but it's a placeholder and will not solve a real CAPTCHA.")
-        logger.info("Simulating CAPTCHA solve process...")
-        await asyncio.sleep(2) # Simulate work
-        logger.info("Simulated CAPTCHA 'solved'.")
+        logger.info(f"Injected {challenge['kind']} token into {filled} field(s) on {page.url}.")
         return True
 
 
+_context_solvers: "WeakKeyDictionary[Any, BaseCaptchaSolver]" = WeakKeyDictionary()
+
+
 def get_captcha_solver(page: Page, config: ScraperConfig) -> Optional[BaseCaptchaSolver]:
     """
     Factory function to get the correct CAPTCHA solver based on configuration.
+    The solver is created once per browser context and reused for all of its pages.
+    It is built without a page: a page holds its context, so a cached solver holding one
+    would keep its own weak key alive and the context would never be released.
     """
     if not config.captcha_solver_enabled:
         return None
 
+    context = page.context
+    solver = _context_solvers.get(context)
+    if solver is not None:
+        return solver
+
     provider = config.captcha_provider.lower()
     
     if provider == '2captcha':
         logger.debug("Instantiating 2Captcha solver.")
-        return TwoCaptchaSolver(page, config)
+        solver = TwoCaptchaSolver(None, config)
     else:
         logger.warning(f"Unknown CAPTCHA provider: '{provider}'. No solver will be used.")
-        return None
\ No newline at end of file
+        return None
+    _context_solvers[context] = solver
+    return solver
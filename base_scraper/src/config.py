@@ -34,6 +34,52 @@ class ScraperConfig:
         self.scrape_retry_delay_seconds: int = int(os.getenv('SCRAPER_RETRY_DELAY_SECONDS', '5'))
         self.max_depth_internal_links: int = int(os.getenv('MAX_DEPTH_INTERNAL_LINKS', '1'))
         self.scraper_networkidle_timeout_ms: int = int(os.getenv('SCRAPER_NETWORKIDLE_TIMEOUT_MS', '3000'))
+        self.scraper_wait_strategy: str = os.getenv('SCRAPER_WAIT_STRATEGY', 'content_stable').strip().lower() # 'content_stable' or 'networkidle'
+        self.scraper_content_stable_quiet_ms: int = int(os.getenv('SCRAPER_CONTENT_STABLE_QUIET_MS', '500'))
+        self.scraper_content_stable_poll_ms: int = int(os.getenv('SCRAPER_CONTENT_STABLE_POLL_MS', '100'))
+        self.scraper_pages_concurrency: int = int(os.getenv('SCRAPER_PAGES_CONCURRENCY', '3'))
+        self.html_parser: str = os.getenv('SCRAPER_HTML_PARSER', 'html.parser').strip().lower() # 'html.parser', 'lxml', 'selectolax'
+        self.in_browser_extraction: bool = os.getenv('SCRAPER_IN_BROWSER_EXTRACTION', 'False').lower() == 'true'
+
+        # --- Resource Blocking ---
+        self.scraper_resource_blocking_enabled: bool = os.getenv('SCRAPER_RESOURCE_BLOCKING_ENABLED', 'True').lower() == 'true'
+        block_resource_types_str: str = os.getenv('SCRAPER_BLOCK_RESOURCE_TYPES', 'image,media,font')
+        self.scraper_block_resource_types: List[str] = [t.strip().lower() for t in block_resource_types_str.split(',') if t.strip()]
+        block_domains_str: str = os.getenv('SCRAPER_BLOCK_DOMAINS', 'google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,googleadservices.com,adservice.google.com,connect.facebook.net,hotjar.com,clarity.ms,bat.bing.com,ads.linkedin.com,snap.licdn.com,criteo.com,taboola.com,outbrain.com,adnxs.com,scorecardresearch.com,quantserve.com,matomo.cloud,mouseflow.com')
+        self.scraper_block_domains: List[str] = [d.strip().lower() for d in block_domains_str.split(',') if d.strip()]
+
+        # --- HTTP-First Fetching ---
+        self.scraper_fetch_mode: str = os.getenv('SCRAPER_FETCH_MODE', 'browser').strip().lower() # 'browser' or 'http_first'
+        self.http_fetch_timeout_seconds: float = float(os.getenv('HTTP_FETCH_TIMEOUT_SECONDS', '15'))
+        self.http_fetch_max_bytes: int = int(os.getenv('HTTP_FETCH_MAX_BYTES', '5000000'))
+        self.http_fetch_min_text_chars: int = int(os.getenv('HTTP_FETCH_MIN_TEXT_CHARS', '500'))
+        http_fetch_js_shell_markers_str: str = os.getenv('HTTP_FETCH_JS_SHELL_MARKERS', 'enable javascript,javascript is required,javascript is disabled,<div id="root"></div>,<div id="app"></div>,<div id="__next"></div>,<app-root></app-root>')
+        self.http_fetch_js_shell_markers: List[str] = [m.strip().lower() for m in http_fetch_js_shell_markers_str.split(',') if m.strip()]
+        http_fetch_captcha_markers_str: str = os.getenv('HTTP_FETCH_CAPTCHA_MARKERS', 'g-recaptcha,h-captcha,cf-turnstile,challenge-platform,cf_chl_,captcha-delivery,px-captcha,/cdn-cgi/challenge')
+        self.http_fetch_captcha_markers: List[str] = [m.strip().lower() for m in http_fetch_captcha_markers_str.split(',') if m.strip()]
+
+        # --- Browser Pool ---
+        self.browser_pool_size: int = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+        self.browser_pool_max_contexts_per_browser: int = int(os.getenv('BROWSER_POOL_MAX_CONTEXTS_PER_BROWSER', '100'))
+        self.browser_pool_max_memory_mb: int = int(os.getenv('BROWSER_POOL_MAX_MEMORY_MB', '1500'))
+
+        # --- DNS Cache ---
+        self.dns_cache_enabled: bool = os.getenv('DNS_CACHE_ENABLED', 'True').lower() == 'true'
+        self.dns_cache_ttl_seconds: int = int(os.getenv('DNS_CACHE_TTL_SECONDS', '300'))
+        self.dns_cache_negative_ttl_seconds: int = int(os.getenv('DNS_CACHE_NEGATIVE_TTL_SECONDS', '60'))
+        self.dns_cache_max_entries: int = int(os.getenv('DNS_CACHE_MAX_ENTRIES', '10000'))
+        # Defaults to the TLD probing timeout, so a probe and the cached lookup behind it give up together.
+        self.dns_cache_lookup_timeout_seconds: float = float(os.getenv('DNS_CACHE_LOOKUP_TIMEOUT_SECONDS', os.getenv('URL_PROBING_DNS_TIMEOUT_SECONDS', '5')))
+        self.dns_cache_chromium_resolver_rules: bool = os.getenv('DNS_CACHE_CHROMIUM_RESOLVER_RULES', 'False').lower() == 'true'
+
+        # --- Shared HTTP Client ---
+        self.http_client_max_connections: int = int(os.getenv('HTTP_CLIENT_MAX_CONNECTIONS', '100'))
+        self.http_client_max_keepalive_connections: int = int(os.getenv('HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS', '20'))
+        self.http_client_keepalive_expiry_seconds: float = float(os.getenv('HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS', '30'))
+
+        # --- Batch Scraping ---
+        self.scraper_max_concurrent_companies: int = int(os.getenv('SCRAPER_MAX_CONCURRENT_COMPANIES', '4'))
+        self.scraper_max_concurrent_per_host: int = int(os.getenv('SCRAPER_MAX_CONCURRENT_PER_HOST', '1'))
 
         # --- Link Prioritization and Filtering ---
         target_link_keywords_str: str = os.getenv('TARGET_LINK_KEYWORDS', 'about,company,services,products,solutions,team,mission,contact,imprint,datenschutz,impressum,ueber-uns,ueber_uns,kontakt')
@@ -69,10 +115,15 @@ class ScraperConfig:
         # --- Robots.txt Handling ---
         self.respect_robots_txt: bool = os.getenv('RESPECT_ROBOTS_TXT', 'True').lower() == 'true'
         self.robots_txt_user_agent: str = os.getenv('ROBOTS_TXT_USER_AGENT', '*')
+        self.robots_cache_ttl_seconds: int = int(os.getenv('ROBOTS_CACHE_TTL_SECONDS', '86400'))
+        self.robots_cache_path: str = os.getenv('ROBOTS_CACHE_PATH', '')
+        self.robots_cache_max_entries: int = int(os.getenv('ROBOTS_CACHE_MAX_ENTRIES', '10000'))
+        self.robots_max_crawl_delay_seconds: float = float(os.getenv('ROBOTS_MAX_CRAWL_DELAY_SECONDS', '10'))
 
         # --- URL Probing and Fallbacks ---
         url_probing_tlds_str: str = os.getenv('URL_PROBING_TLDS', 'de,com,at,ch')
         self.url_probing_tlds: List[str] = [tld.strip().lower() for tld in url_probing_tlds_str.split(',') if tld.strip()]
+        self.url_probing_dns_timeout_seconds: float = float(os.getenv('URL_PROBING_DNS_TIMEOUT_SECONDS', '5'))
         self.enable_dns_error_fallbacks: bool = os.getenv('ENABLE_DNS_ERROR_FALLBACKS', 'True').lower() == 'true'
 
         # --- Page Type Classification ---
@@ -85,12 +136,30 @@ class ScraperConfig:
 # --- Caching ---
         self.caching_enabled: bool = os.getenv('CACHING_ENABLED', 'True').lower() == 'true'
         self.cache_dir: str = os.getenv('CACHE_DIR', 'cache')
+        self.cache_backend: str = os.getenv('CACHE_BACKEND', 'json').lower() # 'json' or 'sqlite'
+        self.cache_sqlite_path: str = os.getenv('CACHE_SQLITE_PATH', os.path.join(self.cache_dir, 'cache.sqlite3'))
+        self.cache_sqlite_batch_size: int = int(os.getenv('CACHE_SQLITE_BATCH_SIZE', '20'))
+        self.cache_ttl_seconds: int = int(os.getenv('CACHE_TTL_SECONDS', '2592000')) # 0 never expires
+        self.cache_stale_while_revalidate: bool = os.getenv('CACHE_STALE_WHILE_REVALIDATE', 'False').lower() == 'true'
+        self.cache_max_disk_bytes: int = int(os.getenv('CACHE_MAX_DISK_BYTES', str(2 * 1024 * 1024 * 1024))) # 0 is unbounded
+        self.cache_memory_max_entries: int = int(os.getenv('CACHE_MEMORY_MAX_ENTRIES', '1024'))
+        self.cache_memory_max_bytes: int = int(os.getenv('CACHE_MEMORY_MAX_BYTES', str(64 * 1024 * 1024)))
+
+        # --- Consent State ---
+        self.consent_state_enabled: bool = os.getenv('CONSENT_STATE_ENABLED', 'True').lower() == 'true'
+        self.consent_state_dir: str = os.getenv('CONSENT_STATE_DIR', os.path.join(self.cache_dir, 'consent_state')) # '' keeps states in memory only
+        self.consent_state_ttl_seconds: int = int(os.getenv('CONSENT_STATE_TTL_SECONDS', '604800'))
+
         # --- Proxy Management ---
         self.proxy_enabled: bool = os.getenv('PROXY_ENABLED', 'False').lower() == 'true'
         self.proxy_list: List[str] = [p.strip() for p in os.getenv('PROXY_LIST', '').split(',') if p.strip()]
-        self.proxy_rotation_strategy: str = os.getenv('PROXY_ROTATION_STRATEGY', 'random') # 'random', 'sequential', 'rotate_on_failure'
+        self.proxy_rotation_strategy: str = os.getenv('PROXY_ROTATION_STRATEGY', 'random') # 'random', 'sequential', 'weighted', 'power_of_two'
         self.proxy_health_check_enabled: bool = os.getenv('PROXY_HEALTH_CHECK_ENABLED', 'True').lower() == 'true'
         self.proxy_cooldown_seconds: int = int(os.getenv('PROXY_COOLDOWN_SECONDS', '300'))
+        self.proxy_max_cooldown_seconds: int = int(os.getenv('PROXY_MAX_COOLDOWN_SECONDS', '3600'))
+        self.proxy_ewma_alpha: float = float(os.getenv('PROXY_EWMA_ALPHA', '0.3'))
+        self.proxy_page_retries: int = int(os.getenv('PROXY_PAGE_RETRIES', '2'))
+        self.proxy_health_db_path: str = os.getenv('PROXY_HEALTH_DB_PATH', os.path.join(self.cache_dir, 'proxy_health.sqlite3')) # '' keeps health per process
 
         # --- Interaction Handling ---
         self.interaction_handler_enabled: bool = os.getenv('INTERACTION_HANDLER_ENABLED', 'True').lower() == 'true'
@@ -99,8 +168,15 @@ class ScraperConfig:
         interaction_text_queries_str: str = os.getenv('INTERACTION_TEXT_QUERIES', 'Accept all,Agree,Consent,I agree')
         self.interaction_text_queries: List[str] = [q.strip() for q in interaction_text_queries_str.split(',') if q.strip()]
         self.interaction_handler_timeout_seconds: int = int(os.getenv('INTERACTION_HANDLER_TIMEOUT_SECONDS', '5'))
+        self.interaction_handler_fast_scan: bool = os.getenv('INTERACTION_HANDLER_FAST_SCAN', 'True').lower() == 'true'
+        self.interaction_memo_ttl_seconds: int = int(os.getenv('INTERACTION_MEMO_TTL_SECONDS', '3600'))
 
         # --- CAPTCHA Solving ---
         self.captcha_solver_enabled: bool = os.getenv('CAPTCHA_SOLVER_ENABLED', 'False').lower() == 'true'
         self.captcha_provider: str = os.getenv('CAPTCHA_PROVIDER', '2captcha')
-        self.captcha_api_key: Optional[str] = os.getenv('CAPTCHA_API_KEY')
\ No newline at end of file
+        self.captcha_api_key: Optional[str] = os.getenv('CAPTCHA_API_KEY')
+        self.captcha_api_base_url: str = os.getenv('CAPTCHA_API_BASE_URL', 'https://2captcha.com')
+        self.captcha_max_concurrent_solves: int = int(os.getenv('CAPTCHA_MAX_CONCURRENT_SOLVES', '4'))
+        self.captcha_poll_interval_seconds: float = float(os.getenv('CAPTCHA_POLL_INTERVAL_SECONDS', '5'))
+        self.captcha_solve_timeout_seconds: float = float(os.getenv('CAPTCHA_SOLVE_TIMEOUT_SECONDS', '180'))
+        self.captcha_token_ttl_seconds: float = float(os.getenv('CAPTCHA_TOKEN_TTL_SECONDS', '110'))
\ No newline at end of file
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import re
+import time
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Error as PlaywrightError
+
+from .config import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+
+def consent_host(url: str) -> Optional[str]:
+    """Returns the host consent state is stored under (lowercased, without a leading 'www.')."""
+    host = (urlsplit(url).hostname or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return host or None
+
+
+def _belongs_to_host(domain: str, host: str) -> bool:
+    domain = domain.lower().lstrip('.')
+    return domain == host or domain.endswith('.' + host) or host.endswith('.' + domain)
+
+
+def filter_storage_state(storage_state: Dict[str, Any], host: str) -> Dict[str, Any]:
+    """Keeps only the cookies and localStorage origins of a host (and its subdomains)."""
+    return {
+        "cookies": [cookie for cookie in storage_state.get("cookies", []) if _belongs_to_host(cookie.get("domain", ""), host)],
+        "origins": [origin for origin in storage_state.get("origins", []) if _belongs_to_host(urlsplit(origin.get("origin", "")).hostname or "", host)],
+    }
+
+
+class ConsentStateStore:
+    """
+    Storage state (cookies and localStorage) of hosts whose consent banner has been accepted.
+
+    States are kept in memory and, with `directory`, as one JSON file per host, so new browser
+    contexts of this and later runs can be created with the banner already accepted. States
+    older than `ttl_seconds` are ignored.
+    """
+    def __init__(self, directory: Optional[str] = None, ttl_seconds: float = 7 * 86400):
+        self.directory = directory or None
+        self.ttl_seconds = ttl_seconds
+        self._states: Dict[str, Dict[str, Any]] = {}
+
+    def _path_for(self, host: str) -> str:
+        return os.path.join(self.directory, re.sub(r'[^a-z0-9.-]', '_', host) + ".json")
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored storage state for a URL's host, in the form `new_context(storage_state=...)` takes."""
+        host = consent_host(url)
+        if host is None:
+            return None
+        record = self._states.get(host)
+        if record is None and self.directory:
+            try:
+                with open(self._path_for(host), 'r', encoding='utf-8') as state_file:
+                    record = json.load(state_file)
+                self._states[host] = record
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read consent state for {host}: {e}")
+                return None
+        if record is None or record.get("saved_at", 0) + self.ttl_seconds < time.time():
+            return None
+        return record["storage_state"]
+
+    async def save(self, context: BrowserContext, url: str) -> bool:
+        """Stores the context's current storage state for a URL's host. Returns whether it was stored."""
+        host = consent_host(url)
+        if host is None:
+            return False
+        try:
+            storage_state = filter_storage_state(await context.storage_state(), host)
+        except PlaywrightError as e:
+            logger.warning(f"Could not read storage state of the browser context for {host}: {e}")
+            return False
+        if not storage_state["cookies"] and not storage_state["origins"]:
+            logger.debug(f"Consent on {host} left no cookies or localStorage. Nothing to store.")
+            return False
+
+        record = {"host": host, "saved_at": time.time(), "storage_state": storage_state}
+        self._states[host] = record
+        logger.info(f"Stored consent state for {host} ({len(storage_state['cookies'])} cookies, {len(storage_state['origins'])} origins).")
+        if self.directory:
+            path = self._path_for(host)
+            temp_path = f"{path}.tmp"
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(temp_path, 'w', encoding='utf-8') as state_file:
+                    json.dump(record, state_file)
+                os.replace(temp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write consent state for {host} to {path}: {e}")
+        return True
+
+
+_consent_state_store: Optional[ConsentStateStore] = None
+
+
+def get_consent_state_store(config: Optional[ScraperConfig] = None) -> ConsentStateStore:
+    """
+    Returns the process-wide consent state store, creating it from `config` (or the defaults) on first use.
+    """
+    global _consent_state_store
+    if _consent_state_store is None:
+        config = config or ScraperConfig()
+        _consent_state_store = ConsentStateStore(config.consent_state_dir, config.consent_state_ttl_seconds)
+    return _consent_state_store
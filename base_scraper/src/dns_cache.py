@@ -0,0 +1,345 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+import urllib.request
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+import httpcore
+import httpx
+
+from .config import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+
+class _DNSEntry:
+    __slots__ = ('addresses', 'error', 'expires_at')
+
+    def __init__(self, addresses: List[str], error: Optional[str], expires_at: float):
+        self.addresses = addresses
+        self.error = error
+        self.expires_at = expires_at
+
+
+# getaddrinfo errors meaning the host has no address. Other errors (EAI_AGAIN, EAI_FAIL, ...) may be transient.
+_NOT_FOUND_ERRNOS = frozenset(getattr(socket, name) for name in ('EAI_NONAME', 'EAI_NODATA') if hasattr(socket, name))
+
+
+def host_not_found(error: BaseException) -> bool:
+    """
+    True if a `resolve` error means the host does not exist, rather than a transient resolver failure.
+    """
+    return isinstance(error, socket.gaierror) and error.errno in _NOT_FOUND_ERRNOS
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return True
+    except ValueError:
+        return False
+
+
+class AsyncDNSCache:
+    """
+    Process-wide hostname cache in front of the event loop's resolver.
+
+    Successful lookups are kept for `ttl_seconds`, lookups of hosts that do not exist for
+    `negative_ttl_seconds`, so dead domains fail immediately on repeated attempts. Timeouts and
+    transient resolver errors are not cached, so a stalled resolver does not stick to a host.
+    The system resolver does not report
+    record TTLs, which is why the lifetimes are fixed. Concurrent lookups of the same host share
+    one `getaddrinfo` call, and the least recently used entries are dropped beyond `max_entries`.
+    """
+    def __init__(self, ttl_seconds: float = 300, negative_ttl_seconds: float = 60, max_entries: int = 10000, lookup_timeout_seconds: float = 10):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.lookup_timeout_seconds = lookup_timeout_seconds
+        self._entries: "OrderedDict[str, _DNSEntry]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Future[_DNSEntry]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, host: str) -> List[str]:
+        """
+        Returns the IP addresses of a host, IPv4 first. Raises socket.gaierror if it does not resolve
+        (see `host_not_found`) and asyncio.TimeoutError if the lookup took over `lookup_timeout_seconds`.
+        """
+        host = host.lower().rstrip('.')
+        if _is_ip_address(host):
+            return [host.strip('[]')]
+
+        entry = self._get_fresh_entry(host)
+        if entry is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            lookup = self._in_flight.get(host)
+            if lookup is None:
+                lookup = asyncio.ensure_future(self._lookup(host))
+                self._in_flight[host] = lookup
+                lookup.add_done_callback(lambda done: self._lookup_done(host, done))
+            entry = await asyncio.shield(lookup)
+
+        if entry.error is not None:
+            raise socket.gaierror(socket.EAI_NONAME, entry.error)
+        return list(entry.addresses)
+
+    def _lookup_done(self, host: str, lookup: "asyncio.Future[_DNSEntry]"):
+        self._in_flight.pop(host, None)
+        if not lookup.cancelled():
+            # Marks the error as retrieved even if every caller gave up waiting.
+            lookup.exception()
+
+    def clear(self):
+        self._entries.clear()
+
+    def fresh_entries(self) -> Dict[str, List[str]]:
+        """Returns all unexpired entries as host -> addresses (empty for cached failures)."""
+        now = time.monotonic()
+        return {host: list(entry.addresses) for host, entry in self._entries.items() if entry.expires_at > now}
+
+    def _get_fresh_entry(self, host: str) -> Optional[_DNSEntry]:
+        entry = self._entries.get(host)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[host]
+            return None
+        self._entries.move_to_end(host)
+        return entry
+
+    async def _lookup(self, host: str) -> _DNSEntry:
+        try:
+            infos = await asyncio.wait_for(
+                asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM),
+                timeout=self.lookup_timeout_seconds
+            )
+            addresses: List[str] = []
+            # IPv4 first: scraping hosts rarely have working IPv6 connectivity.
+            for family in (socket.AF_INET, socket.AF_INET6):
+                for info in infos:
+                    address = info[4][0]
+                    if info[0] == family and address not in addresses:
+                        addresses.append(address)
+            if not addresses:
+                raise socket.gaierror(socket.EAI_NONAME, f"No addresses for {host}")
+            entry = _DNSEntry(addresses, None, time.monotonic() + self.ttl_seconds)
+            logger.debug(f"DNS cache: resolved '{host}' to {addresses}.")
+        except asyncio.TimeoutError:
+            logger.debug(f"DNS cache: lookup for '{host}' timed out after {self.lookup_timeout_seconds}s; not caching it.")
+            raise
+        except (OSError, UnicodeError) as e:
+            error = str(e) or type(e).__name__
+            # A name that cannot be encoded (UnicodeError) does not exist either.
+            if isinstance(e, OSError) and not host_not_found(e):
+                logger.debug(f"DNS cache: lookup for '{host}' failed ({error}); not caching a possibly transient error.")
+                raise
+            entry = _DNSEntry([], error, time.monotonic() + self.negative_ttl_seconds)
+            logger.debug(f"DNS cache: '{host}' does not resolve ({error}); caching the failure.")
+        self._entries[host] = entry
+        self._entries.move_to_end(host)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def chromium_host_resolver_rules(self, max_rules: int = 500) -> Tuple[str, Optional[float]]:
+        """
+        Builds a value for Chromium's `--host-resolver-rules` switch from resolved hosts with at
+        least half their TTL left, each mapped to its first address (IPv4 first; Chromium has no
+        fallback to the others). Failed lookups are left out, so Chromium resolves those hosts itself.
+
+        Chromium keeps the rules for the life of the browser, so the monotonic time the first
+        included entry expires is returned as well (None without rules); the browser should be
+        relaunched by then.
+        """
+        min_expires_at = time.monotonic() + self.ttl_seconds / 2
+        rules: List[str] = []
+        expires_at: Optional[float] = None
+        for host, entry in reversed(self._entries.items()):
+            if len(rules) >= max_rules:
+                break
+            if not entry.addresses or entry.expires_at < min_expires_at:
+                continue
+            address = entry.addresses[0]
+            rules.append(f"MAP {host} [{address}]" if ':' in address else f"MAP {host} {address}")
+            expires_at = entry.expires_at if expires_at is None else min(expires_at, entry.expires_at)
+        return ", ".join(rules), expires_at
+
+
+class CachedDNSNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    httpcore network backend that resolves hostnames through an AsyncDNSCache and then connects
+    to the resolved addresses with the wrapped backend. TLS still uses the original hostname.
+    """
+    def __init__(self, dns_cache: AsyncDNSCache, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self._dns_cache = dns_cache
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self._dns_cache.resolve(host)
+        except asyncio.TimeoutError as e:
+            raise httpcore.ConnectTimeout(f"DNS lookup for '{host}' timed out") from e
+        except OSError as e:
+            raise httpcore.ConnectError(f"DNS lookup for '{host}' failed: {e}") from e
+
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout=timeout, local_address=local_address, socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        assert last_error is not None
+        raise last_error
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None, socket_options: Optional[Iterable[Any]] = None) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+_dns_cache: Optional[AsyncDNSCache] = None
+
+
+def get_dns_cache(config: Optional[ScraperConfig] = None) -> AsyncDNSCache:
+    """
+    Returns the process-wide DNS cache, creating it from `config` (or the defaults) on first use.
+    """
+    global _dns_cache
+    if _dns_cache is None:
+        config = config or ScraperConfig()
+        _dns_cache = AsyncDNSCache(
+            ttl_seconds=config.dns_cache_ttl_seconds,
+            negative_ttl_seconds=config.dns_cache_negative_ttl_seconds,
+            max_entries=config.dns_cache_max_entries,
+            lookup_timeout_seconds=config.dns_cache_lookup_timeout_seconds,
+        )
+    return _dns_cache
+
+
+async def resolve_host(hostname: str) -> List[str]:
+    """
+    Resolves a hostname through the shared cache without blocking the event loop.
+    Raises socket.gaierror if the host does not resolve.
+    """
+    return await get_dns_cache().resolve(hostname)
+
+
+# httpcore errors and the httpx errors raised for them, most specific first.
+_HTTPCORE_ERRORS = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+@contextmanager
+def _httpx_errors(request: Optional[httpx.Request] = None):
+    try:
+        yield
+    except Exception as e:
+        for httpcore_error, httpx_error in _HTTPCORE_ERRORS:
+            if isinstance(e, httpcore_error):
+                raise httpx_error(str(e), request=request) from e
+        raise
+
+
+class _CachedDNSResponseStream(httpx.AsyncByteStream):
+    def __init__(self, httpcore_stream: Any, request: httpx.Request):
+        self._httpcore_stream = httpcore_stream
+        self._request = request
+
+    async def __aiter__(self):
+        with _httpx_errors(self._request):
+            async for chunk in self._httpcore_stream:
+                yield chunk
+
+    async def aclose(self):
+        if hasattr(self._httpcore_stream, "aclose"):
+            await self._httpcore_stream.aclose()
+
+
+class CachedDNSTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport over an httpcore connection pool whose network backend resolves hosts through
+    the shared DNS cache. Only direct connections are made: environment proxies are not applied.
+    """
+    def __init__(self, dns_cache: AsyncDNSCache, verify: bool = True, limits: httpx.Limits = httpx.Limits()):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(verify=verify),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=CachedDNSNetworkBackend(dns_cache),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors(request):
+            core_response = await self._pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=core_response.status,
+            headers=core_response.headers,
+            stream=_CachedDNSResponseStream(core_response.stream, request),
+            extensions=core_response.extensions,
+        )
+
+    async def aclose(self):
+        await self._pool.aclose()
+
+
+def _environment_proxies() -> List[str]:
+    return [scheme for scheme in urllib.request.getproxies() if scheme in ("http", "https", "all")]
+
+
+def cached_http_transport(
+    config: ScraperConfig, verify: bool = True, limits: httpx.Limits = httpx.Limits()
+) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Returns an httpx transport that resolves hosts through the shared DNS cache, or None (httpx's
+    default transport) if the cache is disabled or an HTTP(S)_PROXY/ALL_PROXY environment variable
+    is set. A proxy resolves hosts itself, and an explicit transport would stop httpx applying it.
+    """
+    if not config.dns_cache_enabled:
+        return None
+    proxy_schemes = _environment_proxies()
+    if proxy_schemes:
+        logger.info(f"Proxy environment variables set ({', '.join(proxy_schemes)}); HTTP requests do not use the DNS cache.")
+        return None
+    return CachedDNSTransport(get_dns_cache(config), verify=verify, limits=limits)
@@ -0,0 +1,102 @@
+import asyncio
+from collections import deque
+from typing import Optional, Dict, Tuple, Deque, List, Callable, Any
+
+from .config import ScraperConfig
+
+
+class HostLimiter:
+    """
+    Per-host politeness limit. Counts and waiters are kept per host only while a host has
+    running or waiting users, so memory stays bounded on long batches.
+
+    `acquire` waits for a slot; `try_acquire` takes one only if it is free, for callers that
+    would rather do other work. Release listeners are called with the host whenever a slot
+    becomes free (not when it passes straight to a waiter).
+    """
+    def __init__(self, max_concurrent_per_host: int):
+        self.max_concurrent_per_host = max(1, max_concurrent_per_host)
+        self._running: Dict[str, int] = {}
+        self._waiters: Dict[str, Deque["asyncio.Future[None]"]] = {}
+        self._release_listeners: List[Callable[[str], Any]] = []
+
+    def try_acquire(self, host: str) -> bool:
+        if self._running.get(host, 0) >= self.max_concurrent_per_host or host in self._waiters:
+            return False
+        self._running[host] = self._running.get(host, 0) + 1
+        return True
+
+    async def acquire(self, host: str):
+        if self.try_acquire(host):
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(host, deque()).append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation.
+                self.release(host)
+            else:
+                self._remove_waiter(host, waiter)
+            raise
+
+    def release(self, host: str):
+        waiters = self._waiters.get(host)
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiters:
+                del self._waiters[host]
+            if not waiter.done():
+                # The slot passes to the waiter, so the running count stays.
+                waiter.set_result(None)
+                return
+            waiters = self._waiters.get(host)
+        self._running[host] -= 1
+        if self._running[host] == 0:
+            del self._running[host]
+        for listener in list(self._release_listeners):
+            listener(host)
+
+    def _remove_waiter(self, host: str, waiter: "asyncio.Future[None]"):
+        waiters = self._waiters.get(host)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[host]
+
+    def add_release_listener(self, listener: Callable[[str], Any]):
+        self._release_listeners.append(listener)
+
+    def remove_release_listener(self, listener: Callable[[str], Any]):
+        self._release_listeners.remove(listener)
+
+
+def host_key(given_url: Optional[str]) -> str:
+    """
+    Returns the lower-cased host of an input URL (schemeless inputs allowed), without a leading 'www.'.
+    """
+    if not given_url or not isinstance(given_url, str):
+        return ""
+    url = given_url.strip().lower()
+    if "://" in url:
+        url = url.split("://", 1)[1]
+    host = url.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0].replace(" ", "")
+    return host[4:] if host.startswith("www.") else host
+
+
+_host_limiter: Optional[Tuple[asyncio.AbstractEventLoop, HostLimiter]] = None
+
+
+def get_host_limiter(config: ScraperConfig) -> HostLimiter:
+    """
+    Returns the per-host limiter of the running event loop, created on first use. Batch workers
+    and background cache refreshes share it, so together they respect `scraper_max_concurrent_per_host`.
+    """
+    global _host_limiter
+    loop = asyncio.get_running_loop()
+    if _host_limiter is not None and _host_limiter[0] is loop:
+        return _host_limiter[1]
+    limiter = HostLimiter(config.scraper_max_concurrent_per_host)
+    _host_limiter = (loop, limiter)
+    return limiter
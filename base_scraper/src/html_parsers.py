@@ -0,0 +1,239 @@
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import List, Tuple, Optional, Dict, Any
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SKIPPED_TEXT_TAGS = ('script', 'style')
+
+
+def _clean_text(text: str) -> str:
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def _empty_document() -> Dict[str, Any]:
+    return {"text": "", "anchors": [], "title": None, "meta_description": None, "canonical_href": None, "language": None}
+
+
+class BaseHTMLParser(ABC):
+    """
+    Abstract base class for an HTML parser backend.
+
+    A backend turns raw HTML into the pieces the crawler needs: the visible text, the
+    (href, link text) pairs of all anchors, and a few metadata fields. Link scoring and URL
+    normalisation are backend independent and live in `utils`.
+    """
+    name: str = ""
+
+    @abstractmethod
+    def parse_document(self, html_content: str, include_anchors: bool = True, include_text: bool = True) -> Dict[str, Any]:
+        """
+        Returns a dict with `text`, `anchors` (list of (href, link text) tuples), `title`,
+        `meta_description`, `canonical_href` (as written in the page) and `language`.
+        """
+        pass
+
+    def extract_text(self, html_content: str) -> str:
+        return self.parse_document(html_content, include_anchors=False)["text"]
+
+    def collect_anchors(self, html_content: str) -> List[Tuple[str, str]]:
+        return self.parse_document(html_content, include_text=False)["anchors"]
+
+
+class HtmlParserBackend(BaseHTMLParser):
+    """
+    BeautifulSoup with Python's built-in html.parser. Slowest, but has no extra dependencies
+    and is the reference implementation the other backends are checked against.
+    """
+    name = 'html.parser'
+
+    def parse_document(self, html_content: str, include_anchors: bool = True, include_text: bool = True) -> Dict[str, Any]:
+        document = _empty_document()
+        if not html_content: return document
+        soup = BeautifulSoup(html_content, 'html.parser')
+        # Anchors and metadata are read before text extraction, which strips script/style from the tree.
+        if include_anchors:
+            document["anchors"] = self._collect_anchors_from_soup(soup)
+        document.update(self._extract_metadata_from_soup(soup))
+        if include_text:
+            for script_or_style in soup(list(_SKIPPED_TEXT_TAGS)):
+                script_or_style.decompose()
+            document["text"] = _clean_text(soup.get_text(separator=' ', strip=True))
+        return document
+
+    @staticmethod
+    def _collect_anchors_from_soup(soup: BeautifulSoup) -> List[Tuple[str, str]]:
+        anchors: List[Tuple[str, str]] = []
+        for link_tag in soup.find_all('a', href=True):
+            if not isinstance(link_tag, Tag): continue
+            href_attr = link_tag.get('href')
+            current_href: Optional[str] = None
+            if isinstance(href_attr, str): current_href = href_attr.strip()
+            elif isinstance(href_attr, list) and href_attr and isinstance(href_attr[0], str): current_href = href_attr[0].strip()
+            if not current_href: continue
+            anchors.append((current_href, link_tag.get_text()))
+        return anchors
+
+    @staticmethod
+    def _extract_metadata_from_soup(soup: BeautifulSoup) -> Dict[str, Optional[str]]:
+        title: Optional[str] = None
+        if soup.title and soup.title.string:
+            title = _clean_text(soup.title.string) or None
+
+        meta_description: Optional[str] = None
+        for meta_tag in soup.find_all('meta'):
+            name = meta_tag.get('name')
+            if isinstance(name, str) and name.lower() == 'description' and isinstance(meta_tag.get('content'), str):
+                meta_description = meta_tag['content'].strip() or None
+                break
+
+        canonical_href: Optional[str] = None
+        for link_tag in soup.find_all('link', href=True):
+            rel = link_tag.get('rel') or []
+            if isinstance(rel, str): rel = rel.split()
+            if any(r.lower() == 'canonical' for r in rel) and isinstance(link_tag.get('href'), str):
+                canonical_href = link_tag['href'].strip() or None
+                break
+
+        language: Optional[str] = None
+        html_tag = soup.find('html')
+        if isinstance(html_tag, Tag) and isinstance(html_tag.get('lang'), str):
+            language = html_tag['lang'].strip() or None
+
+        return {"title": title, "meta_description": meta_description, "canonical_href": canonical_href, "language": language}
+
+
+class LxmlParserBackend(BaseHTMLParser):
+    """
+    Native lxml (libxml2) backend. Requires the optional `lxml` package.
+    """
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.etree
+        import lxml.html
+        self._etree = lxml.etree
+        self._html = lxml.html
+
+    def parse_document(self, html_content: str, include_anchors: bool = True, include_text: bool = True) -> Dict[str, Any]:
+        document = _empty_document()
+        if not html_content: return document
+        try:
+            # Parsing bytes avoids lxml rejecting str input that carries an XML encoding declaration.
+            root = self._html.document_fromstring(
+                html_content.encode('utf-8', 'replace'), parser=self._html.HTMLParser(encoding='utf-8')
+            )
+        except (self._etree.ParserError, ValueError):
+            return document
+
+        if include_anchors:
+            anchors: List[Tuple[str, str]] = []
+            for link_tag in root.iter('a'):
+                href = (link_tag.get('href') or '').strip()
+                if href:
+                    anchors.append((href, link_tag.text_content()))
+            document["anchors"] = anchors
+
+        title_tag = root.find('.//title')
+        if title_tag is not None:
+            document["title"] = _clean_text(title_tag.text_content()) or None
+        for meta_tag in root.iter('meta'):
+            if (meta_tag.get('name') or '').lower() == 'description' and meta_tag.get('content') is not None:
+                document["meta_description"] = meta_tag.get('content').strip() or None
+                break
+        for link_tag in root.iter('link'):
+            rel = (link_tag.get('rel') or '').lower().split()
+            if 'canonical' in rel and link_tag.get('href'):
+                document["canonical_href"] = link_tag.get('href').strip() or None
+                break
+        if root.get('lang'):
+            document["language"] = root.get('lang').strip() or None
+
+        if include_text:
+            self._etree.strip_elements(root, *_SKIPPED_TEXT_TAGS, self._etree.Comment, with_tail=False)
+            document["text"] = _clean_text(' '.join(t.strip() for t in root.itertext() if t.strip()))
+        return document
+
+
+class SelectolaxParserBackend(BaseHTMLParser):
+    """
+    Native selectolax (lexbor) backend. Requires the optional `selectolax` package.
+    """
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser_cls = LexborHTMLParser
+
+    def parse_document(self, html_content: str, include_anchors: bool = True, include_text: bool = True) -> Dict[str, Any]:
+        document = _empty_document()
+        if not html_content: return document
+        tree = self._parser_cls(html_content)
+        if tree.root is None: return document
+
+        if include_anchors:
+            anchors: List[Tuple[str, str]] = []
+            for link_tag in tree.css('a[href]'):
+                href = (link_tag.attributes.get('href') or '').strip()
+                if href:
+                    anchors.append((href, link_tag.text(deep=True)))
+            document["anchors"] = anchors
+
+        title_tag = tree.css_first('title')
+        if title_tag is not None:
+            document["title"] = _clean_text(title_tag.text(deep=True)) or None
+        for meta_tag in tree.css('meta'):
+            if (meta_tag.attributes.get('name') or '').lower() == 'description' and meta_tag.attributes.get('content') is not None:
+                document["meta_description"] = meta_tag.attributes.get('content').strip() or None
+                break
+        for link_tag in tree.css('link[href]'):
+            rel = (link_tag.attributes.get('rel') or '').lower().split()
+            if 'canonical' in rel:
+                document["canonical_href"] = (link_tag.attributes.get('href') or '').strip() or None
+                break
+        html_tag = tree.css_first('html')
+        if html_tag is not None and html_tag.attributes.get('lang'):
+            document["language"] = html_tag.attributes.get('lang').strip() or None
+
+        if include_text:
+            tree.strip_tags(list(_SKIPPED_TEXT_TAGS))
+            document["text"] = _clean_text(tree.root.text(separator=' ', strip=True))
+        return document
+
+
+_PARSER_BACKENDS = {
+    HtmlParserBackend.name: HtmlParserBackend,
+    LxmlParserBackend.name: LxmlParserBackend,
+    SelectolaxParserBackend.name: SelectolaxParserBackend,
+}
+_parser_instances: Dict[str, BaseHTMLParser] = {}
+
+
+def get_html_parser(name: Optional[str] = None) -> BaseHTMLParser:
+    """
+    Factory function returning the (shared) parser backend for a name from `SCRAPER_HTML_PARSER`.
+    Falls back to 'html.parser' if the name is unknown or its optional dependency is not installed.
+    """
+    name = (name or HtmlParserBackend.name).lower()
+    parser = _parser_instances.get(name)
+    if parser is not None:
+        return parser
+
+    backend_cls = _PARSER_BACKENDS.get(name)
+    if backend_cls is None:
+        logger.warning(f"Unknown HTML parser backend: '{name}'. Falling back to 'html.parser'.")
+        parser = get_html_parser(HtmlParserBackend.name)
+    else:
+        try:
+            parser = backend_cls()
+            logger.debug(f"Instantiated HTML parser backend '{name}'.")
+        except ImportError as e:
+            logger.warning(f"HTML parser backend '{name}' is not available ({e}). Falling back to 'html.parser'.")
+            parser = get_html_parser(HtmlParserBackend.name)
+    _parser_instances[name] = parser
+    return parser
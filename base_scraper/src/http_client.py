@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+import httpx
+
+from .config import ScraperConfig
+from .dns_cache import cached_http_transport
+
+logger = logging.getLogger(__name__)
+
+_shared_client: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = None
+
+
+def create_http_client(config: ScraperConfig) -> httpx.AsyncClient:
+    """
+    Creates the pooled keep-alive client used for robots.txt and link validation requests.
+    """
+    limits = httpx.Limits(
+        max_connections=config.http_client_max_connections,
+        max_keepalive_connections=config.http_client_max_keepalive_connections,
+        keepalive_expiry=config.http_client_keepalive_expiry_seconds,
+    )
+    transport = cached_http_transport(config, verify=False, limits=limits)
+    return httpx.AsyncClient(follow_redirects=True, verify=False, limits=limits, transport=transport)
+
+
+def get_shared_http_client(config: ScraperConfig) -> httpx.AsyncClient:
+    """
+    Returns the process-wide HTTP client, created on first use. Connections are bound to an
+    event loop, so a new client is created if the previous one belongs to another loop or was closed.
+    Call `close_shared_http_client` before the event loop shuts down.
+    """
+    global _shared_client
+    loop = asyncio.get_running_loop()
+    if _shared_client is not None:
+        client_loop, client = _shared_client
+        if client_loop is loop and not client.is_closed:
+            return client
+    client = create_http_client(config)
+    _shared_client = (loop, client)
+    logger.debug("Created shared HTTP client.")
+    return client
+
+
+async def close_shared_http_client():
+    """
+    Closes the process-wide HTTP client if it was created on the running event loop.
+    """
+    global _shared_client
+    if _shared_client is None:
+        return
+    client_loop, client = _shared_client
+    _shared_client = None
+    if client_loop is asyncio.get_running_loop():
+        await client.aclose()
@@ -1,33 +1,189 @@
 import logging
 import time
-from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 from .config import ScraperConfig
 
 logger = logging.getLogger(__name__)
 
+_MARKER_ATTRIBUTE = "data-scraper-interaction"
+
+# Finds the first visible element matching the configured selectors (in order) or whose whole text
+# equals one of the text queries (like Playwright's `text-is`), in one round trip. The match is tagged
+# with a marker attribute so it can be clicked through a locator. Selectors the browser's
+# querySelectorAll does not understand (Playwright-specific syntax) are returned as `unsupported`.
+_SCAN_JS = """
+({selectors, texts, marker}) => {
+    for (const el of document.querySelectorAll(`[${marker}]`)) el.removeAttribute(marker);
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect();
+        if (!rect.width || !rect.height) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    const found = (el, kind, query) => {
+        el.setAttribute(marker, '');
+        return {kind: kind, query: query};
+    };
+    const unsupported = [];
+    for (const selector of selectors) {
+        let elements;
+        try {
+            elements = document.querySelectorAll(selector);
+        } catch (e) {
+            unsupported.push(selector);
+            continue;
+        }
+        for (const el of elements) {
+            if (isVisible(el)) return {match: found(el, 'selector', selector), unsupported: unsupported};
+        }
+    }
+    if (texts.length) {
+        const wanted = new Set(texts);
+        const maxLength = Math.max(...texts.map(text => text.length));
+        const root = document.body || document.documentElement;
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            for (let el = node.parentElement; el; el = el.parentElement) {
+                const text = (el.textContent || '').replace(/\\s+/g, ' ').trim();
+                if (text.length > maxLength) break;
+                if (wanted.has(text) && isVisible(el)) return {match: found(el, 'text', text), unsupported: unsupported};
+            }
+        }
+    }
+    return {match: null, unsupported: unsupported};
+}
+"""
+
+_MAX_MEMO_HOSTS = 10000
+# A host is taken to have no overlay only after this many of its pages were scanned without one,
+# so a banner that loads late or is missing from an error page does not hide it for the host.
+_NO_OVERLAY_PAGES = 3
+# Per host, (the interaction that dismissed its overlay or None, when that was recorded, how many
+# pages in a row had no overlay).
+_interaction_memo: "OrderedDict[str, Tuple[Optional[Tuple[str, str]], float, int]]" = OrderedDict()
+
+
+def _remember_interaction(host: str, interaction: Optional[Tuple[str, str]]):
+    if interaction is None:
+        previous = _interaction_memo.get(host)
+        pages_without_overlay = previous[2] + 1 if previous is not None and previous[0] is None else 1
+    else:
+        pages_without_overlay = 0
+    _interaction_memo[host] = (interaction, time.time(), pages_without_overlay)
+    _interaction_memo.move_to_end(host)
+    while len(_interaction_memo) > _MAX_MEMO_HOSTS:
+        _interaction_memo.popitem(last=False)
+
+
+def _memoised_interaction(host: str, ttl_seconds: float) -> Tuple[bool, Optional[Tuple[str, str]]]:
+    """
+    Returns whether the outcome for `host` is known and, if so, the interaction to use (None for
+    no overlay). Outcomes older than `ttl_seconds` (if > 0) are dropped.
+    """
+    entry = _interaction_memo.get(host)
+    if entry is None:
+        return False, None
+    interaction, recorded_at, pages_without_overlay = entry
+    if ttl_seconds > 0 and recorded_at + ttl_seconds < time.time():
+        del _interaction_memo[host]
+        return False, None
+    _interaction_memo.move_to_end(host)
+    if interaction is None and pages_without_overlay < _NO_OVERLAY_PAGES:
+        return False, None
+    return True, interaction
+
+
+def clear_interaction_memo():
+    _interaction_memo.clear()
+
+
 class InteractionHandler:
     def __init__(self, page: Page, config: ScraperConfig):
         self.page = page
         self.config = config
 
-    async def handle_interactions(self):
+    async def handle_interactions(self) -> Optional[Tuple[str, str]]:
         """
         Repeatedly scans for and closes modal dialogs, cookie banners, etc.,
-        based on configured selectors and text queries.
+        based on configured selectors and text queries. Returns the first interaction
+        clicked on this page as a (type, query) pair, or None.
+
+        With `interaction_handler_fast_scan`, each scan is a single in-page script, and the outcome
+        per host is remembered for `interaction_memo_ttl_seconds`: once an element has dismissed an
+        overlay, later pages of the host only look for that element, and once `_NO_OVERLAY_PAGES`
+        pages in a row had no overlay, later pages skip the scan.
         """
         if not self.config.interaction_handler_enabled:
             logger.debug("Interaction handler is disabled in the configuration.")
-            return
+            return None
 
         start_time = time.time()
         timeout = self.config.interaction_handler_timeout_seconds
-        
+        interactions = [("selector", s) for s in self.config.interaction_selectors] + \
+                       [("text", t) for t in self.config.interaction_text_queries]
+        if not self.config.interaction_handler_fast_scan:
+            return await self._handle_with_locators(interactions, start_time, timeout)
+
+        host = (urlsplit(self.page.url).hostname or '').lower()
+        remembered, known_interaction = _memoised_interaction(host, self.config.interaction_memo_ttl_seconds)
+        if remembered:
+            if known_interaction is None:
+                logger.debug(f"No overlay was found on earlier pages of {host}. Skipping interaction scan.")
+                return None
+            interactions = [known_interaction]
+
+        handled, conclusive = await self._handle_with_scan(interactions, start_time, timeout)
+        if host and not remembered and conclusive:
+            _remember_interaction(host, handled)
+        return handled
+
+    async def _handle_with_scan(self, interactions: List[Tuple[str, str]], start_time: float, timeout: float) -> Tuple[Optional[Tuple[str, str]], bool]:
+        """
+        Clicks matches of the in-page scan until none is left. Returns the first interaction that was
+        handled (or None) and whether the outcome is reliable enough to remember for the host.
+        """
+        selectors = [query for kind, query in interactions if kind == "selector"]
+        texts = [query for kind, query in interactions if kind == "text"]
+        first_handled = None
+        while time.time() - start_time < timeout:
+            try:
+                result = await self.page.evaluate(_SCAN_JS, {"selectors": selectors, "texts": texts, "marker": _MARKER_ATTRIBUTE})
+            except PlaywrightError as e:
+                logger.debug(f"In-page interaction scan failed: {e}. Falling back to locators.")
+                return first_handled or await self._handle_with_locators(interactions, start_time, timeout), False
+
+            match = result["match"]
+            if match is None:
+                if result["unsupported"]:
+                    handled = await self._handle_with_locators([("selector", s) for s in result["unsupported"]], start_time, timeout)
+                    first_handled = first_handled or handled
+                else:
+                    logger.debug("No more interactive elements found in a full pass. Exiting handler.")
+                return first_handled, True
+
+            logger.info(f"Found and clicking element by {match['kind']}: '{match['query']}'")
+            try:
+                await self.page.locator(f"[{_MARKER_ATTRIBUTE}]").first.click(timeout=1000)
+            except (PlaywrightTimeoutError, PlaywrightError) as e:
+                # Scanning again would find the same element, so give up on this page.
+                logger.warning(f"Error handling {match['kind']} '{match['query']}': {e}")
+                return first_handled, False
+            first_handled = first_handled or (match["kind"], match["query"])
+            await self.page.wait_for_timeout(500) # wait for UI to settle
+
+        logger.warning(f"Interaction handler timed out after {timeout} seconds.")
+        return first_handled, True
+
+    async def _handle_with_locators(self, interactions: List[Tuple[str, str]], start_time: float, timeout: float) -> Optional[Tuple[str, str]]:
+        """
+        Scans with one Playwright locator per query. Returns the first interaction that was handled.
+        """
+        first_handled = None
         while time.time() - start_time < timeout:
             handled_in_pass = False
-            
-            # Combine selectors and text queries for a single pass
-            interactions = [("selector", s) for s in self.config.interaction_selectors] + \
-                           [("text", t) for t in self.config.interaction_text_queries]
 
             for type, query in interactions:
                 try:
@@ -36,11 +192,12 @@ class InteractionHandler:
                         element = self.page.locator(query).first
                     else: # text
                         element = self.page.locator(f"*:visible:text-is('{query}')").first
-                    
+
                     if await element.is_visible(timeout=2000):
                         logger.info(f"Found and clicking element by {type}: '{query}'")
                         await element.click(timeout=1000)
                         handled_in_pass = True
+                        first_handled = first_handled or (type, query)
                         # Once an interaction is handled, restart the scan
                         await self.page.wait_for_timeout(500) # wait for UI to settle
                         break # break from the for loop
@@ -49,12 +206,13 @@ class InteractionHandler:
                     logger.debug(f"Element not visible or timed out for {type} '{query}'.")
                 except Exception as e:
                     logger.warning(f"Error handling {type} '{query}': {e}")
-            
+
             if handled_in_pass:
                 continue # Restart the while-loop to scan again
             else:
                 # If a full pass completes with no interactions handled, we can exit.
                 logger.debug("No more interactive elements found in a full pass. Exiting handler.")
-                return
+                return first_handled
 
-        logger.warning(f"Interaction handler timed out after {timeout} seconds.")
\ No newline at end of file
+        logger.warning(f"Interaction handler timed out after {timeout} seconds.")
+        return first_handled
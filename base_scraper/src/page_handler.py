@@ -1,47 +1,104 @@
 import logging
-from typing import Optional, Tuple, Any
+import time
+from typing import Optional, Tuple, Any, Dict, Callable, Awaitable
+import httpx
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 
 from .config import ScraperConfig
 from .interaction_handler import InteractionHandler
 from .captcha_solver import get_captcha_solver
+from .consent_state import get_consent_state_store
+from .html_parsers import get_html_parser
+from .resource_blocker import ResourceBlocker
+from .page_settle import wait_for_page_settle
 
 logger = logging.getLogger(__name__)
 
+# Collects what the crawler needs from the rendered DOM, so the full HTML never crosses the Playwright pipe.
+# Hrefs are returned as written (not resolved) so link scoring matches the Python parsers.
+_IN_BROWSER_EXTRACTION_JS = """
+() => {
+    const root = document.body || document.documentElement;
+    const links = [];
+    for (const a of document.querySelectorAll('a[href]')) {
+        const href = (a.getAttribute('href') || '').trim();
+        if (href) links.push([href, a.textContent || '']);
+    }
+    const meta = document.querySelector('meta[name="description" i]');
+    let canonical = null;
+    for (const link of document.querySelectorAll('link[rel][href]')) {
+        if (link.getAttribute('rel').toLowerCase().split(/\\s+/).includes('canonical')) {
+            canonical = link.getAttribute('href').trim() || null;
+            break;
+        }
+    }
+    return {
+        text: root ? root.innerText || '' : '',
+        anchors: links,
+        title: document.title || null,
+        meta_description: meta ? (meta.getAttribute('content') || '').trim() || null : null,
+        canonical_href: canonical,
+        language: (document.documentElement.getAttribute('lang') || '').trim() || null
+    };
+}
+"""
+
 async def fetch_page_content(page: Page, url: str, config: ScraperConfig, input_row_id: Any, company_name_or_id: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Navigates to a URL and returns the rendered HTML and the HTTP status (or a negative error code).
+    """
+    page_data, status = await fetch_page_data(page, url, config, input_row_id, company_name_or_id)
+    return (page_data["html"] if page_data else None), status
+
+async def fetch_page_data(page: Page, url: str, config: ScraperConfig, input_row_id: Any, company_name_or_id: str, extract_in_browser: bool = False) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+    """
+    Navigates to a URL and returns the page data and the HTTP status (or a negative error code).
+
+    After DOMContentLoaded the page is given time to load its content (see `wait_for_page_settle`);
+    the time waited is returned as `wait_ms`. The time from starting the navigation to the
+    response is returned as `proxy_latency_ms`; it leaves out interactions, CAPTCHA solving and
+    the settle wait, which do not depend on the proxy. The page data is a dict with the landed `url` and
+    either the rendered `html` or, if
+    `extract_in_browser` is set, an `extraction` dict produced by a script in the page
+    (`text`, `anchors` as (href, link text) pairs, `title`, `meta_description`,
+    `canonical_href`, `language`) instead of the HTML.
+    """
     logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Navigating to URL: {url}")
     try:
+        navigation_started = time.monotonic()
         response = await page.goto(url, timeout=config.default_navigation_timeout, wait_until='domcontentloaded')
+        proxy_latency_ms = round((time.monotonic() - navigation_started) * 1000)
         if response:
             logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Navigation to {url} successful. Status: {response.status}")
             if response.ok:
                 # --- Pre-Scrape Checks ---
                 # 1. Handle interactions (cookie banners, etc.)
                 interaction_handler = InteractionHandler(page, config)
-                await interaction_handler.handle_interactions()
+                if await interaction_handler.handle_interactions() and config.consent_state_enabled:
+                    # Later contexts for this host start with the banner already accepted.
+                    await get_consent_state_store(config).save(page.context, page.url)
 
                 # 2. Handle CAPTCHAs
                 captcha_solver = get_captcha_solver(page, config)
                 if captcha_solver:
-                    if await captcha_solver.detect_captcha():
+                    challenge = await captcha_solver.detect_challenge(page, response.headers)
+                    if challenge is not None:
                         logger.info(f"[RowID: {input_row_id}] CAPTCHA detected on {url}. Invoking solver.")
-                        solved = await captcha_solver.solve_captcha()
+                        solved = await captcha_solver.solve_captcha(page, challenge)
                         if not solved:
                             logger.error(f"[RowID: {input_row_id}] CAPTCHA solver failed for {url}. Aborting page scrape.")
                             return None, -7 # Custom status code for CAPTCHA failure
                 
                 # --- Proceed with scraping ---
-                if config.scraper_networkidle_timeout_ms > 0:
-                    logger.debug(f"[RowID: {input_row_id}] Waiting for networkidle on {url} (timeout: {config.scraper_networkidle_timeout_ms}ms)...")
-                    try:
-                        await page.wait_for_load_state('networkidle', timeout=config.scraper_networkidle_timeout_ms)
-                        logger.debug(f"[RowID: {input_row_id}] Networkidle achieved for {url}.")
-                    except PlaywrightTimeoutError:
-                        logger.info(f"[RowID: {input_row_id}] Timeout waiting for networkidle on {url}. Proceeding.")
+                settle = await wait_for_page_settle(page, config, f"[RowID: {input_row_id}]")
                 
+                if extract_in_browser:
+                    extraction = await page.evaluate(_IN_BROWSER_EXTRACTION_JS)
+                    logger.debug(f"[RowID: {input_row_id}] Extracted {len(extraction['anchors'])} links and {len(extraction['text'])} chars of text in-browser for {url}.")
+                    return {"url": page.url, "html": None, "extraction": extraction, "wait_ms": settle["wait_ms"], "proxy_latency_ms": proxy_latency_ms}, response.status
                 content = await page.content()
                 logger.debug(f"[RowID: {input_row_id}] Content fetched successfully for {url}.")
-                return content, response.status
+                return {"url": page.url, "html": content, "extraction": None, "wait_ms": settle["wait_ms"], "proxy_latency_ms": proxy_latency_ms}, response.status
             else:
                 logger.warning(f"[RowID: {input_row_id}] HTTP error for {url}: Status {response.status}. No content fetched.")
                 return None, response.status
@@ -59,7 +116,116 @@ async def fetch_page_content(page: Page, url: str, config: ScraperConfig, input_
         if "net::ERR_NAME_NOT_RESOLVED" in error_message: return None, -2
         elif "net::ERR_CONNECTION_REFUSED" in error_message: return None, -3
         elif "net::ERR_ABORTED" in error_message: return None, -6
+        elif "net::ERR_PROXY_CONNECTION_FAILED" in error_message or "net::ERR_TUNNEL_CONNECTION_FAILED" in error_message: return None, -8
         return None, -4
     except Exception as e:
         logger.error(f"[RowID: {input_row_id}] Unexpected error fetching page {url}: {e}", exc_info=True)
-        return None, -5
\ No newline at end of file
+        return None, -5
+
+def _insufficient_http_content_reason(html_content: str, document: Dict[str, Any], config: ScraperConfig) -> Optional[str]:
+    """
+    Returns why a plain HTTP response cannot stand in for a rendered page, or None if it can.
+    """
+    html_lower = html_content.lower()
+    for marker in config.http_fetch_captcha_markers:
+        if marker in html_lower:
+            return f"CAPTCHA marker '{marker}'"
+    for marker in config.http_fetch_js_shell_markers:
+        if marker in html_lower:
+            return f"JavaScript shell marker '{marker}'"
+    if len(document["text"]) < config.http_fetch_min_text_chars:
+        return f"only {len(document['text'])} chars of text"
+    return None
+
+async def fetch_page_http(url: str, config: ScraperConfig, http_client: httpx.AsyncClient, input_row_id: Any, company_name_or_id: str, user_agent: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+    """
+    Fetches a URL with a plain HTTP GET and returns page data like `fetch_page_data`, or None
+    if the response is not sufficient content (error status, not HTML, too small, a JavaScript
+    shell or a CAPTCHA page) and the page should be rendered in the browser instead.
+
+    `user_agent` should be the one of the browser context a fallback would render in, so a site
+    sees one client per crawl; it defaults to `config.user_agent`.
+
+    The HTML is parsed here to judge it, so the page data carries that parse as its `extraction`.
+    """
+    # Accept-Encoding is left to httpx, which only advertises encodings it can decode.
+    headers = {k: v for k, v in config.default_headers.items() if k.lower() != 'accept-encoding'}
+    headers['User-Agent'] = user_agent or config.user_agent
+    try:
+        # Streamed, so oversized bodies are abandoned once they pass `http_fetch_max_bytes` instead of being downloaded.
+        async with http_client.stream('GET', url, headers=headers, timeout=config.http_fetch_timeout_seconds) as response:
+            content_type = response.headers.get('content-type', '').lower()
+            if not response.is_success:
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP fetch of {url} returned status {response.status_code}. Falling back to browser.")
+                return None, response.status_code
+            if 'html' not in content_type:
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP fetch of {url} returned '{content_type}', not HTML. Falling back to browser.")
+                return None, response.status_code
+            content_length = response.headers.get('content-length', '')
+            # Content-Length counts encoded bytes, which are never more than the decoded ones.
+            if content_length.isdigit() and int(content_length) > config.http_fetch_max_bytes:
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP response for {url} announces {content_length} bytes, over {config.http_fetch_max_bytes}. Falling back to browser.")
+                return None, response.status_code
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > config.http_fetch_max_bytes:
+                    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP response for {url} exceeds {config.http_fetch_max_bytes} bytes. Falling back to browser.")
+                    return None, response.status_code
+    except httpx.HTTPError as e:
+        logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP fetch of {url} failed ({type(e).__name__}: {e}). Falling back to browser.")
+        return None, None
+
+    html_content = bytes(body).decode(response.encoding or 'utf-8', errors='replace')
+    document = get_html_parser(config.html_parser).parse_document(html_content)
+    reason = _insufficient_http_content_reason(html_content, document, config)
+    if reason:
+        logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP response for {url} is not sufficient ({reason}). Falling back to browser.")
+        return None, response.status_code
+
+    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Fetched {url} over plain HTTP. Status: {response.status_code}")
+    return {"url": str(response.url), "html": html_content, "extraction": document, "fetch_method": "http", "blocked_requests": 0, "wait_ms": 0}, response.status_code
+
+async def fetch_page_hybrid(
+    get_page: Callable[[], Awaitable[Page]],
+    url: str,
+    config: ScraperConfig,
+    input_row_id: Any,
+    company_name_or_id: str,
+    http_client: Optional[httpx.AsyncClient] = None,
+    extract_in_browser: bool = False,
+    resource_blocker: Optional[ResourceBlocker] = None,
+    user_agent: Optional[str] = None
+) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+    """
+    Fetches a page according to `config.scraper_fetch_mode`.
+
+    In 'http_first' mode (and with an `http_client`) the page is first fetched with
+    `fetch_page_http`; only if that response is not sufficient is a browser page obtained from
+    `get_page` and the URL rendered with `fetch_page_data`. In 'browser' mode every page is
+    rendered. The returned page data records the path that served it as `fetch_method`
+    ('http' or 'browser') and, if a `resource_blocker` is routing the browser context, the
+    number of requests it aborted for the page as `blocked_requests`. `user_agent` is sent on the
+    HTTP path and should match the browser context's.
+    """
+    if config.scraper_fetch_mode == 'http_first' and http_client is not None:
+        page_data, status = await fetch_page_http(url, config, http_client, input_row_id, company_name_or_id, user_agent=user_agent)
+        if page_data is not None:
+            return page_data, status
+
+    page = await get_page()
+    if resource_blocker is not None:
+        # Tabs are reused, so counters left from the previous URL are dropped before navigating.
+        resource_blocker.reset_page_stats(page)
+    page_data, status = await fetch_page_data(page, url, config, input_row_id, company_name_or_id, extract_in_browser=extract_in_browser)
+    blocking_stats = resource_blocker.take_page_stats(page) if resource_blocker is not None else None
+    if blocking_stats is not None and blocking_stats["blocked_requests"]:
+        logger.debug(
+            f"[RowID: {input_row_id}, Company: {company_name_or_id}] Blocked {blocking_stats['blocked_requests']} of "
+            f"{blocking_stats['blocked_requests'] + blocking_stats['allowed_requests']} requests on {url} "
+            f"(by type: {blocking_stats['blocked_by_type']}, by domain: {blocking_stats['blocked_by_domain']})."
+        )
+    if page_data is not None:
+        page_data["fetch_method"] = "browser"
+        page_data["blocked_requests"] = blocking_stats["blocked_requests"] if blocking_stats is not None else 0
+    return page_data, status
@@ -0,0 +1,143 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
+
+from .config import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+# Content is not declared stable before this fraction of the host's typical settle time has passed,
+# so a short pause while a slow SPA is still fetching data does not end the wait early.
+_MIN_WAIT_FRACTION_OF_TYPICAL = 0.5
+
+# Runs in the page as one evaluate call: polls the text length and counts nodes added or removed
+# (attribute and text-node changes of carousels and tickers are ignored) and resolves once both have
+# been unchanged for `quietMs`, or after `maxMs`. `settled_at_ms` is when the content last changed.
+_CONTENT_STABLE_JS = """
+async ({quietMs, pollMs, minWaitMs, maxMs}) => {
+    const start = performance.now();
+    let mutations = 0;
+    const observer = new MutationObserver(records => {
+        for (const record of records) mutations += record.addedNodes.length + record.removedNodes.length;
+    });
+    observer.observe(document, {childList: true, subtree: true});
+    const textLength = () => {
+        const root = document.body || document.documentElement;
+        return root ? (root.textContent || '').length : 0;
+    };
+    let lastLength = textLength();
+    let lastMutations = 0;
+    let changedAt = start;
+    try {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, pollMs));
+            const now = performance.now();
+            const length = textLength();
+            if (length !== lastLength || mutations !== lastMutations) {
+                lastLength = length;
+                lastMutations = mutations;
+                changedAt = now;
+            }
+            const elapsed = now - start;
+            const settled = elapsed >= minWaitMs && now - changedAt >= quietMs;
+            if (settled || elapsed >= maxMs) {
+                return {settled: settled, waited_ms: Math.round(elapsed), settled_at_ms: Math.round(changedAt - start), text_length: length};
+            }
+        }
+    } finally {
+        observer.disconnect();
+    }
+}
+"""
+
+
+class SettleTimeTracker:
+    """
+    Learns how long pages of each host take until their content stops changing.
+
+    Keeps an exponentially weighted moving average of the observed settle times per host
+    (weight `alpha` for the newest sample), for at most `max_hosts` hosts.
+    """
+    def __init__(self, alpha: float = 0.3, max_hosts: int = 10000):
+        self.alpha = alpha
+        self.max_hosts = max(1, max_hosts)
+        self._typical_ms: "OrderedDict[str, float]" = OrderedDict()
+
+    def typical_settle_ms(self, host: str) -> Optional[float]:
+        typical = self._typical_ms.get(host)
+        if typical is not None:
+            self._typical_ms.move_to_end(host)
+        return typical
+
+    def record(self, host: str, settle_ms: float):
+        previous = self._typical_ms.pop(host, None)
+        self._typical_ms[host] = settle_ms if previous is None else previous + self.alpha * (settle_ms - previous)
+        while len(self._typical_ms) > self.max_hosts:
+            self._typical_ms.popitem(last=False)
+
+
+_settle_tracker: Optional[SettleTimeTracker] = None
+
+
+def get_settle_tracker() -> SettleTimeTracker:
+    """Returns the process-wide settle time tracker."""
+    global _settle_tracker
+    if _settle_tracker is None:
+        _settle_tracker = SettleTimeTracker()
+    return _settle_tracker
+
+
+async def wait_for_page_settle(page: Page, config: ScraperConfig, log_prefix: str = "") -> Dict[str, Any]:
+    """
+    Waits after DOMContentLoaded until the page's content has loaded, at most
+    `config.scraper_networkidle_timeout_ms`.
+
+    With the 'content_stable' strategy the wait ends once the text length and DOM structure
+    have not changed for `config.scraper_content_stable_quiet_ms`; the 'networkidle' strategy
+    waits for Playwright's networkidle state instead. Returns the `strategy` used, the time
+    waited as `wait_ms` and whether the page `settled` before the timeout.
+    """
+    max_wait_ms = config.scraper_networkidle_timeout_ms
+    strategy = config.scraper_wait_strategy
+    if max_wait_ms <= 0:
+        return {"strategy": "none", "wait_ms": 0, "settled": True}
+
+    started = time.monotonic()
+    if strategy == 'networkidle':
+        settled = True
+        try:
+            await page.wait_for_load_state('networkidle', timeout=max_wait_ms)
+            logger.debug(f"{log_prefix} Networkidle achieved for {page.url}.")
+        except PlaywrightTimeoutError:
+            settled = False
+            logger.info(f"{log_prefix} Timeout waiting for networkidle on {page.url}. Proceeding.")
+        return {"strategy": strategy, "wait_ms": round((time.monotonic() - started) * 1000), "settled": settled}
+
+    host = (urlsplit(page.url).hostname or '').lower()
+    tracker = get_settle_tracker()
+    typical_ms = tracker.typical_settle_ms(host) if host else None
+    min_wait_ms = min(typical_ms * _MIN_WAIT_FRACTION_OF_TYPICAL, max_wait_ms) if typical_ms is not None else 0
+    try:
+        result = await page.evaluate(_CONTENT_STABLE_JS, {
+            "quietMs": config.scraper_content_stable_quiet_ms,
+            "pollMs": config.scraper_content_stable_poll_ms,
+            "minWaitMs": min_wait_ms,
+            "maxMs": max_wait_ms,
+        })
+    except PlaywrightError as e:
+        # The page navigated (e.g. a script redirect) while the check was running.
+        logger.debug(f"{log_prefix} Content stability check interrupted on {page.url}: {e}. Proceeding.")
+        return {"strategy": strategy, "wait_ms": round((time.monotonic() - started) * 1000), "settled": False}
+
+    if host:
+        # A page that never settled still tells us its host is slow, so the cap is recorded as well.
+        tracker.record(host, result["settled_at_ms"] if result["settled"] else max_wait_ms)
+    if result["settled"]:
+        logger.debug(f"{log_prefix} Content of {page.url} stable after {result['waited_ms']}ms (last change at {result['settled_at_ms']}ms).")
+    else:
+        logger.info(f"{log_prefix} Content of {page.url} still changing after {result['waited_ms']}ms. Proceeding.")
+    return {"strategy": strategy, "wait_ms": result["waited_ms"], "settled": result["settled"]}
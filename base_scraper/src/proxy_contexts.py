@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Set, Callable, Awaitable, Tuple
+
+from playwright.async_api import BrowserContext, Page
+
+from .browser_pool import BrowserPool
+from .proxy_manager import ProxyManager
+
+logger = logging.getLogger(__name__)
+
+
+class ProxyContextSet:
+    """
+    The browser contexts of one crawl, one per proxy it has used.
+
+    Pages are opened on the context of the current proxy. When a proxy fails, `switch_proxy`
+    reports it to the ProxyManager (so later selections in this crawl and in other crawls avoid
+    it) and moves the crawl to a new context on another healthy proxy. Contexts are borrowed
+    from `browser_pool` and handed back by `close`.
+    """
+    def __init__(self, browser_pool: Optional[BrowserPool], context_options: Dict[str, Any],
+                 proxy_manager: Optional[ProxyManager] = None,
+                 on_new_context: Optional[Callable[[BrowserContext], Awaitable[Any]]] = None,
+                 log_prefix: str = ""):
+        self.browser_pool = browser_pool
+        self.context_options = context_options
+        self.proxy_manager = proxy_manager
+        self.on_new_context = on_new_context
+        self.log_prefix = log_prefix
+        self.current_context: Optional[BrowserContext] = None
+        self.current_proxy: Optional[str] = None
+        self.failed_proxies: Set[str] = set()
+        self._contexts: Dict[Optional[str], BrowserContext] = {}
+        self._switch_lock = asyncio.Lock()
+
+    @classmethod
+    def fixed(cls, context: BrowserContext, proxy: Optional[str] = None, proxy_manager: Optional[ProxyManager] = None) -> "ProxyContextSet":
+        """Wraps an existing context; proxy failures are still reported, but the crawl cannot switch proxies."""
+        contexts = cls(None, {}, proxy_manager)
+        contexts.current_context = context
+        contexts.current_proxy = proxy
+        return contexts
+
+    async def start(self) -> Optional[str]:
+        """Opens the first context, on a proxy from the ProxyManager if there is one. Returns the proxy."""
+        proxy = self.proxy_manager.get_proxy() if self.proxy_manager else None
+        if self.proxy_manager and proxy is None:
+            logger.warning(f"{self.log_prefix} Proxy is enabled, but no healthy proxy could be obtained. Proceeding without proxy.")
+        await self._use(proxy)
+        return proxy
+
+    async def new_page(self) -> Tuple[Page, Optional[str]]:
+        """Opens a page on the current context. Returns it with the proxy it goes through."""
+        return await self.current_context.new_page(), self.current_proxy
+
+    async def switch_proxy(self, failed_proxy: str, find_replacement: bool = True) -> Optional[str]:
+        """
+        Reports `failed_proxy` and, if it is still the current proxy, switches the crawl to another
+        healthy one. Returns the proxy now current, or None if the crawl cannot continue on another proxy.
+        """
+        async with self._switch_lock:
+            if failed_proxy not in self.failed_proxies:
+                self.failed_proxies.add(failed_proxy)
+                if self.proxy_manager:
+                    self.proxy_manager.report_failure(failed_proxy)
+            if not find_replacement or self.browser_pool is None or self.proxy_manager is None:
+                return None
+            if self.current_proxy != failed_proxy:
+                # Another worker already moved the crawl on.
+                return self.current_proxy
+            replacement = self.proxy_manager.get_proxy(exclude=self.failed_proxies)
+            if replacement is None:
+                logger.warning(f"{self.log_prefix} Proxy {failed_proxy} failed and no other healthy proxy is available.")
+                return None
+            logger.info(f"{self.log_prefix} Proxy {failed_proxy} failed; continuing the crawl on {replacement}.")
+            await self._use(replacement)
+            return replacement
+
+    async def _use(self, proxy: Optional[str]):
+        context = self._contexts.get(proxy)
+        if context is None:
+            options = dict(self.context_options)
+            if proxy:
+                logger.info(f"{self.log_prefix} Using proxy: {proxy}")
+                options['proxy'] = {'server': proxy}
+            context = await self.browser_pool.new_context(**options)
+            self._contexts[proxy] = context
+            if self.on_new_context is not None:
+                await self.on_new_context(context)
+        self.current_context = context
+        self.current_proxy = proxy
+
+    async def close(self):
+        """Hands all contexts opened by `start` and `switch_proxy` back to the pool."""
+        contexts, self._contexts = list(self._contexts.values()), {}
+        for context in contexts:
+            await self.browser_pool.release_context(context)
@@ -0,0 +1,118 @@
+import logging
+import os
+import sqlite3
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Health fields shared between processes; the column order of the table.
+HEALTH_FIELDS = (
+    'status', 'last_fail_time', 'cooldown_until', 'consecutive_failures',
+    'latency_ewma', 'success_ewma', 'bytes', 'requests', 'failures',
+)
+
+
+class ProxyHealthStore:
+    """
+    Proxy health kept in a SQLite database that several worker processes share.
+
+    Updates run as read-modify-write inside one `BEGIN IMMEDIATE` transaction, so concurrent
+    reports from different processes do not overwrite each other. The database runs in WAL mode,
+    so readers never wait for a writer. `changed()` uses `PRAGMA data_version` to tell whether
+    another connection has committed since it was last called, so managers reload only then.
+    Every write stamps the row with the next store-wide `version`, so `load_since` reads only the
+    rows changed since a given version through an index.
+    """
+    def __init__(self, path: str, timeout_seconds: float = 5.0):
+        self.path = path
+        self.timeout_seconds = timeout_seconds
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._data_version: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not be used across fork(), so each process opens its own.
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=self.timeout_seconds, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS proxy_health (proxy TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "last_fail_time REAL NOT NULL, cooldown_until REAL NOT NULL, consecutive_failures INTEGER NOT NULL, "
+            "latency_ewma REAL, success_ewma REAL NOT NULL, bytes INTEGER NOT NULL, requests INTEGER NOT NULL, "
+            "failures INTEGER NOT NULL, version INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(proxy_health)")}
+        if 'version' not in columns:
+            # Databases created before rows were versioned.
+            connection.execute("ALTER TABLE proxy_health ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        connection.execute("CREATE INDEX IF NOT EXISTS proxy_health_version ON proxy_health (version)")
+        self._connection, self._pid, self._data_version = connection, os.getpid(), None
+        return connection
+
+    def load(self, proxies: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Returns the stored health of those of `proxies` that have a record."""
+        connection = self._connect()
+        wanted = set(proxies)
+        records = {}
+        for row in connection.execute(f"SELECT proxy, {', '.join(HEALTH_FIELDS)} FROM proxy_health"):
+            if row[0] in wanted:
+                records[row[0]] = dict(zip(HEALTH_FIELDS, row[1:]))
+        return records
+
+    def load_since(self, version: int) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """
+        Returns the stored health of every proxy written after `version`, and the latest version
+        in the store, which the caller passes to the next call.
+        """
+        connection = self._connect()
+        records = {}
+        latest = version
+        for row in connection.execute(f"SELECT proxy, version, {', '.join(HEALTH_FIELDS)} FROM proxy_health WHERE version > ?", (version,)):
+            records[row[0]] = dict(zip(HEALTH_FIELDS, row[2:]))
+            latest = max(latest, row[1])
+        return records, latest
+
+    def changed(self) -> bool:
+        """Whether another connection has written to the store since the last call."""
+        data_version = self._connect().execute("PRAGMA data_version").fetchone()[0]
+        changed, self._data_version = data_version != self._data_version, data_version
+        return changed
+
+    def update(self, proxy: str, default: Dict[str, Any], apply: Callable[[Dict[str, Any]], Any]) -> Dict[str, Any]:
+        """
+        Atomically applies `apply` to the stored health of `proxy` (or to a copy of `default` if
+        there is none yet) and stores the result. Returns the health as stored.
+        """
+        return self.update_many({proxy: (default, apply)})[proxy]
+
+    def update_many(self, updates: Dict[str, Tuple[Dict[str, Any], Callable[[Dict[str, Any]], Any]]]) -> Dict[str, Dict[str, Any]]:
+        """Like `update` for several proxies, as `{proxy: (default, apply)}`, in one transaction."""
+        connection = self._connect()
+        stored = {}
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = connection.execute("SELECT COALESCE(MAX(version), 0) FROM proxy_health").fetchone()[0]
+            for proxy, (default, apply) in updates.items():
+                row = connection.execute(f"SELECT {', '.join(HEALTH_FIELDS)} FROM proxy_health WHERE proxy = ?", (proxy,)).fetchone()
+                health = dict(zip(HEALTH_FIELDS, row)) if row is not None else {field: default[field] for field in HEALTH_FIELDS}
+                apply(health)
+                version += 1
+                connection.execute(
+                    f"INSERT OR REPLACE INTO proxy_health (proxy, {', '.join(HEALTH_FIELDS)}, version) VALUES ({', '.join('?' * (len(HEALTH_FIELDS) + 2))})",
+                    (proxy, *(health[field] for field in HEALTH_FIELDS), version),
+                )
+                stored[proxy] = health
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return stored
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
@@ -1,77 +1,364 @@
+import atexit
+import heapq
 import logging
 import random
+import sqlite3
 import time
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterable, Tuple, Any, Callable
 
 from .config import ScraperConfig
+from .proxy_health_store import ProxyHealthStore
 
 logger = logging.getLogger(__name__)
 
+# Latency assumed for proxies without samples yet, so new proxies get tried.
+_DEFAULT_LATENCY_SECONDS = 1.0
+# Latencies below this are clamped, so one very fast sample cannot take all the traffic.
+_MIN_LATENCY_SECONDS = 0.05
+# Health of a proxy without reports.
+_INITIAL_HEALTH: Dict[str, Any] = {
+    'status': 'healthy', 'last_fail_time': 0, 'cooldown_until': 0, 'consecutive_failures': 0,
+    'latency_ewma': None, 'success_ewma': 1.0, 'bytes': 0, 'requests': 0, 'failures': 0,
+}
+# With a shared health store, successes are written in batches: after this many reports or
+# this many seconds, whichever comes first. Failures are written at once.
+_SUCCESS_FLUSH_REPORTS = 20
+_SUCCESS_FLUSH_SECONDS = 1.0
+# Timeouts and refused connections are as likely the site's fault as the proxy's; the proxy is
+# blamed once they happened on this many different hosts without a success in between.
+_AMBIGUOUS_FAILURE_HOSTS = 2
+
+
+class _FenwickTree:
+    """Prefix sums over per-proxy weights with O(log n) update and weighted sampling."""
+    def __init__(self, size: int):
+        self._tree = [0.0] * (size + 1)
+        self._values = [0.0] * size
+
+    def set(self, index: int, value: float):
+        delta = value - self._values[index]
+        if delta == 0:
+            return
+        self._values[index] = value
+        position = index + 1
+        while position < len(self._tree):
+            self._tree[position] += delta
+            position += position & -position
+
+    def get(self, index: int) -> float:
+        return self._values[index]
+
+    def total(self) -> float:
+        total = 0.0
+        position = len(self._tree) - 1
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def find(self, target: float) -> int:
+        """Returns the index whose cumulative range contains `target` (0 <= target < total)."""
+        position = 0
+        step = 1 << (len(self._values).bit_length())
+        while step:
+            next_position = position + step
+            if next_position < len(self._tree) and self._tree[next_position] <= target:
+                position = next_position
+                target -= self._tree[next_position]
+            step >>= 1
+        # Rounding can put the target past the last non-zero weight; walk back to it.
+        index = min(position, len(self._values) - 1)
+        while index > 0 and self._values[index] <= 0:
+            index -= 1
+        return index
+
+
 class ProxyManager:
-    def __init__(self, config: ScraperConfig):
+    """
+    Selects proxies and tracks their health.
+
+    Per proxy it keeps an EWMA of the latency and of the success rate, the bytes transferred and
+    the request counts, fed by `report_success` and `report_failure`. A failing proxy is sidelined
+    for `proxy_cooldown_seconds`, doubling with each consecutive failure up to
+    `proxy_max_cooldown_seconds`. Besides 'random' and 'sequential', the 'weighted' strategy picks
+    proxies with probability proportional to success rate / latency and 'power_of_two' picks the
+    better of two random healthy proxies; both select in O(log n).
+
+    With a `health_store`, reports are written to it and changes made by other processes are
+    picked up before each selection, so all workers sharing the store avoid the same failed proxies.
+    Only the rows written since the last sync are read. Successes are applied locally at once and
+    written in batches (see `flush`), so most pages do not wait for the database lock.
+    """
+    def __init__(self, config: ScraperConfig, health_store: Optional[ProxyHealthStore] = None):
         self.config = config
+        self.health_store = health_store
         self.proxies: List[str] = self.config.proxy_list
-        # Health tracking: {'proxy_url': {'status': 'healthy'/'unhealthy', 'last_fail_time': timestamp}}
-        self.proxy_health: Dict[str, Dict] = {
-            proxy: {'status': 'healthy', 'last_fail_time': 0} for proxy in self.proxies
-        }
+        # Health tracking: {'proxy_url': {'status': 'healthy'/'unhealthy', 'last_fail_time': timestamp, ...metrics}}
+        self.proxy_health: Dict[str, Dict] = {proxy: dict(_INITIAL_HEALTH) for proxy in self.proxies}
+        self._index: Dict[str, int] = {proxy: i for i, proxy in enumerate(self.proxies)}
+        self._healthy = _FenwickTree(len(self.proxies))
+        self._weights = _FenwickTree(len(self.proxies))
+        for proxy in self.proxies:
+            self._refresh(proxy)
+        self._cooldowns: List[Tuple[float, str]] = []
         self._sequential_counter = 0
+        self._ambiguous_failure_hosts: Dict[str, set] = {}
+        self._store_version = 0
+        # Success reports not yet written to the store, per proxy in report order.
+        self._pending_successes: Dict[str, List[Callable[[Dict[str, Any]], Any]]] = {}
+        self._pending_count = 0
+        self._pending_since = 0.0
         if not self.proxies:
             logger.warning("ProxyManager initialized, but no proxies were provided in the configuration.")
+        self._sync_from_store()
+
+    def _sync_from_store(self):
+        """
+        Loads the shared health of the proxies written since the last sync, if another process
+        has updated the store since.
+        """
+        if self.health_store is None or not self.proxies:
+            return
+        try:
+            if not self.health_store.changed():
+                return
+            records, self._store_version = self.health_store.load_since(self._store_version)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read proxy health from {self.health_store.path}: {e}")
+            return
+        for proxy, record in records.items():
+            if proxy in self.proxy_health:
+                self._apply_stored(proxy, record)
+
+    def _apply_stored(self, proxy: str, record: Dict[str, Any]):
+        health = self.proxy_health[proxy]
+        cooldown_changed = record['cooldown_until'] != health['cooldown_until']
+        health.update(record)
+        # Pending local successes are not in the store yet.
+        for apply in self._pending_successes.get(proxy, ()):
+            apply(health)
+        if cooldown_changed and health['status'] == 'unhealthy':
+            heapq.heappush(self._cooldowns, (health['cooldown_until'], proxy))
+        self._refresh(proxy)
+
+    def flush(self):
+        """Writes pending success reports to the shared store in one transaction."""
+        if self.health_store is None or not self._pending_successes:
+            return
+        pending, self._pending_successes, self._pending_count = self._pending_successes, {}, 0
+
+        def replay(applies: List[Callable[[Dict[str, Any]], Any]]) -> Callable[[Dict[str, Any]], Any]:
+            def apply(health: Dict[str, Any]):
+                for report in applies:
+                    report(health)
+            return apply
+
+        try:
+            stored = self.health_store.update_many({proxy: (_INITIAL_HEALTH, replay(applies)) for proxy, applies in pending.items()})
+        except sqlite3.Error as e:
+            # Kept for the next flush.
+            logger.warning(f"Could not write proxy health to {self.health_store.path}: {e}")
+            self._pending_successes, self._pending_count = pending, sum(len(applies) for applies in pending.values())
+            return
+        for proxy, record in stored.items():
+            self._apply_stored(proxy, record)
+
+    def _record(self, proxy_url: str, apply: Callable[[Dict[str, Any]], Any]):
+        """
+        Applies a report to a proxy's health, through the shared store if there is one.
+        """
+        health = self.proxy_health[proxy_url]
+        if self.health_store is not None:
+            # Successes reported earlier must reach the store first, as this report builds on them.
+            self.flush()
+            try:
+                health.update(self.health_store.update(proxy_url, health, apply))
+                return
+            except sqlite3.Error as e:
+                logger.warning(f"Could not write proxy health to {self.health_store.path}: {e}")
+        apply(health)
+
+    def _score(self, proxy: str) -> float:
+        health = self.proxy_health[proxy]
+        latency = health['latency_ewma'] if health['latency_ewma'] is not None else _DEFAULT_LATENCY_SECONDS
+        return max(health['success_ewma'], 0.01) / max(latency, _MIN_LATENCY_SECONDS)
+
+    def _refresh(self, proxy: str):
+        index = self._index[proxy]
+        healthy = self.proxy_health[proxy]['status'] == 'healthy'
+        self._healthy.set(index, 1.0 if healthy else 0.0)
+        self._weights.set(index, self._score(proxy) if healthy else 0.0)
 
     def _update_proxy_health(self):
         """
-        Checks for unhealthy proxies whose cooldown has expired and marks them as healthy.
+        Marks unhealthy proxies whose cooldown has expired as healthy again.
         """
         if not self.config.proxy_health_check_enabled:
             return
 
         current_time = time.time()
-        for proxy, health in self.proxy_health.items():
-            if health['status'] == 'unhealthy':
-                if (current_time - health['last_fail_time']) > self.config.proxy_cooldown_seconds:
-                    health['status'] = 'healthy'
-                    health['last_fail_time'] = 0
-                    logger.info(f"Proxy {proxy} has cooled down and is now marked as healthy.")
+        while self._cooldowns and self._cooldowns[0][0] < current_time:
+            cooldown_until, proxy = heapq.heappop(self._cooldowns)
+            health = self.proxy_health[proxy]
+            # Entries of earlier, superseded cooldowns are skipped.
+            if health['status'] == 'unhealthy' and health['cooldown_until'] == cooldown_until:
+                health['status'] = 'healthy'
+                health['last_fail_time'] = 0
+                self._refresh(proxy)
+                logger.info(f"Proxy {proxy} has cooled down and is now marked as healthy.")
 
-    def get_proxy(self) -> Optional[str]:
+    def get_proxy(self, exclude: Optional[Iterable[str]] = None) -> Optional[str]:
         """
         Selects a healthy proxy from the list based on the configured rotation strategy.
         It first updates the health status of proxies based on the cooldown period.
+        Proxies in `exclude` are not considered.
         Returns None if no healthy proxies are available.
         """
+        self._flush_if_due()
+        self._sync_from_store() # Pick up failures reported by other processes
         self._update_proxy_health() # Check for cooled-down proxies first
 
-        healthy_proxies = [p for p, health in self.proxy_health.items() if health['status'] == 'healthy']
+        excluded = [p for p in set(exclude) if p in self._index and self.proxy_health[p]['status'] == 'healthy'] if exclude else []
+        # Excluded proxies are taken out of the trees for this selection only.
+        for proxy in excluded:
+            index = self._index[proxy]
+            self._healthy.set(index, 0.0)
+            self._weights.set(index, 0.0)
+        try:
+            if self._healthy.total() < 0.5:
+                logger.warning("No healthy proxies available to select from.")
+                return None
+            return self._select(excluded)
+        finally:
+            for proxy in excluded:
+                self._refresh(proxy)
 
-        if not healthy_proxies:
-            logger.warning("No healthy proxies available to select from.")
-            return None
+    def _random_healthy(self) -> str:
+        return self.proxies[self._healthy.find(random.random() * self._healthy.total())]
 
+    def _select(self, excluded: List[str]) -> str:
         strategy = self.config.proxy_rotation_strategy
-        
-        if strategy == 'random':
-            return random.choice(healthy_proxies)
-        
+
+        # Every strategy rotates away from failed proxies, so 'rotate_on_failure' is plain random selection.
+        if strategy in ('random', 'rotate_on_failure'):
+            return self._random_healthy()
+
         elif strategy == 'sequential':
-            proxy = healthy_proxies[self._sequential_counter % len(healthy_proxies)]
-            self._sequential_counter += 1
-            return proxy
-            
+            excluded_set = set(excluded)
+            for _ in range(len(self.proxies)):
+                proxy = self.proxies[self._sequential_counter % len(self.proxies)]
+                self._sequential_counter += 1
+                if self.proxy_health[proxy]['status'] == 'healthy' and proxy not in excluded_set:
+                    return proxy
+            return self._random_healthy()
+
+        elif strategy == 'weighted':
+            return self.proxies[self._weights.find(random.random() * self._weights.total())]
+
+        elif strategy == 'power_of_two':
+            first, second = self._random_healthy(), self._random_healthy()
+            return first if self._score(first) >= self._score(second) else second
+
         else:
             logger.warning(f"Unknown proxy rotation strategy: '{strategy}'. Defaulting to random.")
-            return random.choice(healthy_proxies)
+            return self._random_healthy()
+
+    def report_success(self, proxy_url: str, latency_seconds: float, bytes_transferred: int = 0):
+        """
+        Records a successful request through a proxy: its latency and the bytes it transferred.
+        """
+        if proxy_url not in self.proxy_health:
+            return
+        alpha = self.config.proxy_ewma_alpha
+
+        def apply(health: Dict[str, Any]):
+            health['latency_ewma'] = latency_seconds if health['latency_ewma'] is None else health['latency_ewma'] + alpha * (latency_seconds - health['latency_ewma'])
+            health['success_ewma'] += alpha * (1.0 - health['success_ewma'])
+            health['bytes'] += bytes_transferred
+            health['requests'] += 1
+            health['consecutive_failures'] = 0
+
+        apply(self.proxy_health[proxy_url])
+        self._ambiguous_failure_hosts.pop(proxy_url, None)
+        self._refresh(proxy_url)
+        if self.health_store is not None:
+            if not self._pending_successes:
+                self._pending_since = time.monotonic()
+            self._pending_successes.setdefault(proxy_url, []).append(apply)
+            self._pending_count += 1
+            self._flush_if_due()
+
+    def _flush_if_due(self):
+        if self._pending_successes and (self._pending_count >= _SUCCESS_FLUSH_REPORTS or time.monotonic() - self._pending_since >= _SUCCESS_FLUSH_SECONDS):
+            self.flush()
+
+    def is_proxy_failure(self, proxy_url: str, host: Optional[str]) -> bool:
+        """
+        Records a timeout or refused connection on `host` through a proxy and returns whether it
+        points at the proxy: True once such failures happened on `_AMBIGUOUS_FAILURE_HOSTS`
+        different hosts since the proxy's last success. A single slow or dead site therefore
+        does not use up healthy proxies. The caller reports the proxy with `report_failure`.
+        """
+        if proxy_url not in self.proxy_health:
+            return False
+        hosts = self._ambiguous_failure_hosts.setdefault(proxy_url, set())
+        hosts.add(host or '')
+        if len(hosts) < _AMBIGUOUS_FAILURE_HOSTS:
+            return False
+        del self._ambiguous_failure_hosts[proxy_url]
+        return True
 
     def report_failure(self, proxy_url: str):
         """
-        Marks a proxy as unhealthy after a connection failure.
+        Marks a proxy as unhealthy after a connection failure. The cooldown doubles with
+        each consecutive failure.
         """
         if proxy_url in self.proxy_health:
+            def apply(health: Dict[str, Any]):
+                health['requests'] += 1
+                health['failures'] += 1
+                health['consecutive_failures'] += 1
+                health['success_ewma'] -= self.config.proxy_ewma_alpha * health['success_ewma']
+                if self.config.proxy_health_check_enabled:
+                    cooldown = min(
+                        self.config.proxy_cooldown_seconds * 2 ** (health['consecutive_failures'] - 1),
+                        max(self.config.proxy_max_cooldown_seconds, self.config.proxy_cooldown_seconds),
+                    )
+                    health['status'] = 'unhealthy'
+                    health['last_fail_time'] = time.time()
+                    health['cooldown_until'] = health['last_fail_time'] + cooldown
+
+            self._record(proxy_url, apply)
+            health = self.proxy_health[proxy_url]
             if self.config.proxy_health_check_enabled:
-                self.proxy_health[proxy_url]['status'] = 'unhealthy'
-                self.proxy_health[proxy_url]['last_fail_time'] = time.time()
-                logger.warning(f"Proxy {proxy_url} reported as failed and marked as unhealthy.")
+                heapq.heappush(self._cooldowns, (health['cooldown_until'], proxy_url))
+                logger.warning(f"Proxy {proxy_url} reported as failed and marked as unhealthy for {health['cooldown_until'] - health['last_fail_time']}s ({health['consecutive_failures']} consecutive failures).")
             else:
                 logger.debug(f"Proxy failure reported for {proxy_url}, but health checks are disabled.")
+            self._refresh(proxy_url)
         else:
-            logger.warning(f"Attempted to report failure for a non-existent proxy: {proxy_url}")
\ No newline at end of file
+            logger.warning(f"Attempted to report failure for a non-existent proxy: {proxy_url}")
+
+    def proxy_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns a snapshot of the health metrics per proxy, including its current selection weight.
+        """
+        return {proxy: {**health, 'weight': self._weights.get(self._index[proxy])} for proxy, health in self.proxy_health.items()}
+
+
+_proxy_manager: Optional[ProxyManager] = None
+
+
+def get_proxy_manager(config: ScraperConfig) -> ProxyManager:
+    """
+    Returns the process-wide ProxyManager, so failures reported by one crawl steer the
+    proxy selection of all others. Created from `config` on first use; with
+    `proxy_health_db_path` set, its health is shared with other processes through that database.
+    """
+    global _proxy_manager
+    if _proxy_manager is None:
+        health_store = ProxyHealthStore(config.proxy_health_db_path) if config.proxy_health_db_path else None
+        _proxy_manager = ProxyManager(config, health_store)
+        if health_store is not None:
+            atexit.register(_proxy_manager.flush)
+    return _proxy_manager
@@ -0,0 +1,105 @@
+import logging
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+from playwright.async_api import BrowserContext, Route, Request, Error as PlaywrightError
+
+from .config import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _new_page_stats() -> Dict[str, Any]:
+    return {"blocked_requests": 0, "allowed_requests": 0, "blocked_by_type": {}, "blocked_by_domain": {}}
+
+
+class ResourceBlocker:
+    """
+    Route handler for a BrowserContext that aborts requests the scraper does not need.
+
+    Requests are aborted by resource type (e.g. images, fonts, media) and by a domain blocklist
+    (trackers, ads; a listed domain also blocks its subdomains). The top-level document of a page is
+    never blocked. Counters are kept per page and collected with `take_page_stats`.
+
+    Routing a context turns off Chromium's HTTP cache for it, so stylesheets and scripts shared
+    by a site's pages are downloaded again for every page.
+    """
+    def __init__(self, config: ScraperConfig):
+        self.blocked_resource_types = frozenset(config.scraper_block_resource_types)
+        self.blocked_domains = frozenset(domain.lstrip('.') for domain in config.scraper_block_domains)
+        self._page_stats: "WeakKeyDictionary[Any, Dict[str, Any]]" = WeakKeyDictionary()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.blocked_resource_types or self.blocked_domains)
+
+    async def install(self, context: BrowserContext):
+        """Routes all requests of the context through this blocker (which disables the context's HTTP cache)."""
+        if self.enabled:
+            await context.route("**/*", self._handle_route)
+
+    def blocked_domain(self, host: str) -> Optional[str]:
+        """Returns the blocklisted domain a host belongs to, or None. Costs one set lookup per label."""
+        host = host.lower().rstrip('.')
+        while host:
+            if host in self.blocked_domains:
+                return host
+            _, _, host = host.partition('.')
+        return None
+
+    def block_reason(self, resource_type: str, url: str, is_main_document: bool = False) -> Optional[str]:
+        """
+        Returns why a request would be blocked ('type:<resource type>' or 'domain:<domain>'), or None.
+        """
+        if is_main_document:
+            return None
+        if resource_type in self.blocked_resource_types:
+            return f"type:{resource_type}"
+        if self.blocked_domains:
+            domain = self.blocked_domain(urlsplit(url).hostname or '')
+            if domain:
+                return f"domain:{domain}"
+        return None
+
+    def reset_page_stats(self, page: Any):
+        """Drops the counters collected for a page, so a reused tab starts its next URL from zero."""
+        self._page_stats.pop(page, None)
+
+    def take_page_stats(self, page: Any) -> Dict[str, Any]:
+        """Returns the counters collected for a page since the last call and resets them."""
+        return self._page_stats.pop(page, None) or _new_page_stats()
+
+    async def _handle_route(self, route: Route, request: Request):
+        is_main_document = False
+        page = None
+        try:
+            frame = request.frame
+            page = frame.page
+            is_main_document = request.is_navigation_request() and frame.parent_frame is None
+        except PlaywrightError:
+            # Requests of service workers have no frame.
+            pass
+
+        reason = self.block_reason(request.resource_type, request.url, is_main_document)
+        if page is not None:
+            stats = self._page_stats.get(page)
+            if stats is None:
+                stats = _new_page_stats()
+                self._page_stats[page] = stats
+            if reason is None:
+                stats["allowed_requests"] += 1
+            else:
+                stats["blocked_requests"] += 1
+                kind, _, value = reason.partition(':')
+                counter = stats["blocked_by_type"] if kind == "type" else stats["blocked_by_domain"]
+                counter[value] = counter.get(value, 0) + 1
+
+        try:
+            if reason is None:
+                await route.continue_()
+            else:
+                await route.abort("blockedbyclient")
+        except PlaywrightError as e:
+            # The page may have navigated away or closed while the request was paused.
+            logger.debug(f"Could not {'continue' if reason is None else 'abort'} request {request.url}: {e}")
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict
+from urllib.parse import urlparse, urlunparse, quote, unquote
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from .config import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+# Fetch errors (timeouts, 5xx) are retried sooner than successful fetches and are never persisted.
+_ERROR_TTL_SECONDS = 300
+
+
+class RobotsRules:
+    """
+    The rules of one robots.txt for one user agent, compiled into a single regex.
+
+    `allows(url)` gives the same answer as `RobotFileParser.can_fetch` (the first rule whose
+    path prefixes the URL wins) with one regex match instead of a Python loop over all rules.
+    """
+    __slots__ = ('_allow_all', '_deny_all', '_matcher', '_allowances')
+
+    def __init__(self, parser: Optional[RobotFileParser], user_agent: str):
+        self._allow_all = parser is None or parser.allow_all
+        self._deny_all = parser is not None and (parser.disallow_all or not parser.last_checked)
+        self._matcher: Optional["re.Pattern[str]"] = None
+        self._allowances: List[bool] = []
+        if self._allow_all or self._deny_all:
+            return
+
+        applicable_entry = next((entry for entry in parser.entries if entry.applies_to(user_agent)), parser.default_entry)
+        if applicable_entry is None or not applicable_entry.rulelines:
+            self._allow_all = True
+            return
+        # Alternatives are tried in order, so the matching group is the first applicable rule.
+        self._matcher = re.compile('|'.join(
+            '()' if rule.path == '*' else f"({re.escape(rule.path)})" for rule in applicable_entry.rulelines
+        ))
+        self._allowances = [rule.allowance for rule in applicable_entry.rulelines]
+
+    def allows(self, url: str) -> bool:
+        if self._allow_all:
+            return True
+        if self._deny_all:
+            return False
+        # Same URL normalisation as RobotFileParser.can_fetch.
+        parsed_url = urlparse(unquote(url))
+        path = quote(urlunparse(('', '', parsed_url.path, parsed_url.params, parsed_url.query, parsed_url.fragment))) or "/"
+        match = self._matcher.match(path)
+        return True if match is None else self._allowances[match.lastindex - 1]
+
+
+class RobotsEntry:
+    """
+    The parsed robots.txt of one origin. `parser` is None when every URL is allowed
+    (no robots.txt, or it could not be fetched).
+    """
+    __slots__ = ('origin', 'parser', 'lines', 'status', 'fetched_at', 'expires_at', '_rules')
+
+    def __init__(self, origin: str, lines: Optional[List[str]], status: int, fetched_at: float, expires_at: float):
+        self.origin = origin
+        self.lines = lines
+        self.status = status
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.parser: Optional[RobotFileParser] = None
+        self._rules: Dict[str, RobotsRules] = {}
+        if lines is not None:
+            self.parser = RobotFileParser()
+            self.parser.parse(lines)
+
+    def rules_for(self, user_agent: str) -> RobotsRules:
+        rules = self._rules.get(user_agent)
+        if rules is None:
+            rules = RobotsRules(self.parser, user_agent)
+            self._rules[user_agent] = rules
+        return rules
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        return self.rules_for(user_agent).allows(url)
+
+    def crawl_delay(self, user_agent: str) -> Optional[float]:
+        if self.parser is None:
+            return None
+        delay = self.parser.crawl_delay(user_agent)
+        return float(delay) if delay is not None else None
+
+
+def robots_origin(url: str) -> Optional[str]:
+    """Returns the `scheme://host[:port]` key of a URL, or None for non-http(s) URLs."""
+    parsed_url = urlparse(url)
+    if parsed_url.scheme not in ('http', 'https') or not parsed_url.netloc:
+        return None
+    return f"{parsed_url.scheme}://{parsed_url.netloc.lower()}"
+
+
+class RobotsCache:
+    """
+    Process-wide cache of parsed robots.txt files keyed by scheme and host.
+
+    Entries live for `ttl_seconds`; beyond `max_entries` origins the least recently used are
+    dropped, so long batches over many domains keep memory bounded. With `persist_path`,
+    successful fetches are appended to a
+    JSON Lines file and loaded on first use, so repeated runs over the same domains do not
+    refetch robots.txt until the entries expire. `Crawl-delay` is enforced per origin by
+    `wait_for_crawl_delay`, capped at `max_crawl_delay_seconds`.
+    """
+    def __init__(self, ttl_seconds: float = 86400, persist_path: Optional[str] = None, max_crawl_delay_seconds: float = 10, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path or None
+        self.max_crawl_delay_seconds = max_crawl_delay_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, RobotsEntry]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Future[RobotsEntry]"] = {}
+        self._next_fetch_at: Dict[str, float] = {}
+        self._loaded = False
+        self.fetches = 0
+
+    async def get_entry(self, url: str, client: httpx.AsyncClient, user_agent: str, log_prefix: str = "") -> Optional[RobotsEntry]:
+        """
+        Returns the robots.txt entry for a URL's origin, fetching it at most once per TTL.
+        Returns None for URLs robots.txt does not apply to (e.g. file:// URLs).
+        """
+        origin = robots_origin(url)
+        if origin is None:
+            return None
+        self._load()
+        entry = self._entries.get(origin)
+        if entry is not None and entry.expires_at > time.time():
+            self._entries.move_to_end(origin)
+            return entry
+
+        lookup = self._in_flight.get(origin)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._fetch(origin, client, user_agent, log_prefix))
+            self._in_flight[origin] = lookup
+            lookup.add_done_callback(lambda _: self._in_flight.pop(origin, None))
+        return await asyncio.shield(lookup)
+
+    async def is_allowed(self, url: str, client: httpx.AsyncClient, user_agent: str, log_prefix: str = "") -> bool:
+        entry = await self.get_entry(url, client, user_agent, log_prefix)
+        return entry is None or entry.can_fetch(user_agent, url)
+
+    async def wait_for_crawl_delay(self, url: str, client: httpx.AsyncClient, user_agent: str, log_prefix: str = "") -> float:
+        """
+        Sleeps until the origin's `Crawl-delay` allows another request and reserves that slot.
+        Concurrent callers for the same origin are spaced out one delay apart. Returns the time waited.
+        """
+        entry = await self.get_entry(url, client, user_agent, log_prefix)
+        delay = entry.crawl_delay(user_agent) if entry is not None else None
+        if not delay:
+            return 0.0
+        delay = min(delay, self.max_crawl_delay_seconds)
+        now = time.monotonic()
+        # No await between reading and reserving the slot, so concurrent workers cannot take the same one.
+        slot = max(now, self._next_fetch_at.get(entry.origin, now))
+        self._next_fetch_at[entry.origin] = slot + delay
+        wait_seconds = slot - now
+        if wait_seconds > 0:
+            logger.debug(f"{log_prefix} Waiting {wait_seconds:.2f}s for Crawl-delay of {entry.origin}.")
+            await asyncio.sleep(wait_seconds)
+        return wait_seconds
+
+    async def _fetch(self, origin: str, client: httpx.AsyncClient, user_agent: str, log_prefix: str) -> RobotsEntry:
+        robots_url = f"{origin}/robots.txt"
+        now = time.time()
+        self.fetches += 1
+        try:
+            logger.debug(f"{log_prefix} Fetching robots.txt from: {robots_url}")
+            response = await client.get(robots_url, timeout=10, headers={'User-Agent': user_agent})
+            if response.status_code == 200:
+                logger.debug(f"{log_prefix} Successfully fetched robots.txt from {robots_url}, status: {response.status_code}")
+                entry = RobotsEntry(origin, response.text.splitlines(), 200, now, now + self.ttl_seconds)
+            elif response.status_code == 404:
+                logger.debug(f"{log_prefix} robots.txt not found at {robots_url} (status 404), assuming allowed.")
+                entry = RobotsEntry(origin, None, 404, now, now + self.ttl_seconds)
+            else:
+                logger.warning(f"{log_prefix} Failed to fetch robots.txt from {robots_url}, status: {response.status_code}. Assuming allowed.")
+                entry = RobotsEntry(origin, None, response.status_code, now, now + min(self.ttl_seconds, _ERROR_TTL_SECONDS))
+        except httpx.RequestError as e:
+            logger.warning(f"{log_prefix} httpx.RequestError fetching robots.txt from {robots_url}: {e}. Assuming allowed.")
+            entry = RobotsEntry(origin, None, 0, now, now + min(self.ttl_seconds, _ERROR_TTL_SECONDS))
+        except Exception as e:
+            logger.error(f"{log_prefix} Unexpected error processing robots.txt for {robots_url}: {e}. Assuming allowed.", exc_info=True)
+            entry = RobotsEntry(origin, None, 0, now, now + min(self.ttl_seconds, _ERROR_TTL_SECONDS))
+
+        self._store(entry)
+        if entry.status in (200, 404):
+            self._persist(entry)
+        return entry
+
+    def _store(self, entry: RobotsEntry):
+        self._entries[entry.origin] = entry
+        self._entries.move_to_end(entry.origin)
+        now = time.monotonic()
+        while len(self._entries) > self.max_entries:
+            evicted_origin, _ = self._entries.popitem(last=False)
+            # A reserved Crawl-delay slot still in the future is kept, so evicting cannot shorten the delay.
+            if self._next_fetch_at.get(evicted_origin, now) <= now:
+                self._next_fetch_at.pop(evicted_origin, None)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        now = time.time()
+        loaded_records = 0
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as persist_file:
+                for line in persist_file:
+                    try:
+                        record = json.loads(line)
+                        loaded_records += 1
+                        expires_at = record["fetched_at"] + self.ttl_seconds
+                        if expires_at > now:
+                            self._store(RobotsEntry(record["origin"], record["lines"], record["status"], record["fetched_at"], expires_at))
+                        else:
+                            self._entries.pop(record["origin"], None)
+                    except (ValueError, KeyError, TypeError):
+                        continue  # A partially written last line from an interrupted run.
+        except OSError as e:
+            logger.warning(f"Could not read robots.txt cache from {self.persist_path}: {e}")
+            return
+        logger.info(f"Loaded {len(self._entries)} robots.txt entries from {self.persist_path}.")
+        if loaded_records > 2 * max(len(self._entries), 100):
+            self._compact()
+
+    def _persist(self, entry: RobotsEntry):
+        if not self.persist_path:
+            return
+        record = {"origin": entry.origin, "lines": entry.lines, "status": entry.status, "fetched_at": entry.fetched_at}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+            with open(self.persist_path, 'a', encoding='utf-8') as persist_file:
+                persist_file.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write robots.txt cache to {self.persist_path}: {e}")
+
+    def _compact(self):
+        """Rewrites the persistence file with only the live, persistable entries."""
+        temp_path = f"{self.persist_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as persist_file:
+                for entry in self._entries.values():
+                    if entry.status in (200, 404):
+                        persist_file.write(json.dumps({"origin": entry.origin, "lines": entry.lines, "status": entry.status, "fetched_at": entry.fetched_at}) + "\n")
+            os.replace(temp_path, self.persist_path)
+        except OSError as e:
+            logger.warning(f"Could not compact robots.txt cache {self.persist_path}: {e}")
+
+
+_robots_cache: Optional[RobotsCache] = None
+
+
+def get_robots_cache(config: Optional[ScraperConfig] = None) -> RobotsCache:
+    """
+    Returns the process-wide robots.txt cache, creating it from `config` (or the defaults) on first use.
+    """
+    global _robots_cache
+    if _robots_cache is None:
+        config = config or ScraperConfig()
+        _robots_cache = RobotsCache(
+            ttl_seconds=config.robots_cache_ttl_seconds,
+            persist_path=config.robots_cache_path,
+            max_crawl_delay_seconds=config.robots_max_crawl_delay_seconds,
+            max_entries=config.robots_cache_max_entries,
+        )
+    return _robots_cache
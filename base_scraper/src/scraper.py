@@ -6,21 +6,35 @@ import time
 import heapq
 import hashlib # Added for hashing long filenames
 import random
+from contextlib import AsyncExitStack
 from . import caching
 from urllib.parse import urljoin, urlparse, urldefrag, urlunparse
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 from bs4 import BeautifulSoup
 from bs4.element import Tag # Added for type checking
 import httpx # For asynchronous robots.txt checking
-from urllib.robotparser import RobotFileParser
 from typing import Set, Tuple, Optional, List, Dict, Any
 from .config import ScraperConfig
-from .utils import normalize_url, get_safe_filename, extract_text_from_html, find_internal_links, _classify_page_type, validate_link_status, process_input_url
-from .page_handler import fetch_page_content
-from .proxy_manager import ProxyManager
+from .utils import normalize_url, get_safe_filename, parse_page, parse_extracted_page, _classify_page_type, validate_link_status, process_input_url_async
+from .page_handler import fetch_page_hybrid
+from .proxy_manager import ProxyManager, get_proxy_manager
+from .proxy_contexts import ProxyContextSet
+from .browser_pool import BrowserPool
+from .resource_blocker import ResourceBlocker
+from .consent_state import get_consent_state_store
+from .robots_cache import get_robots_cache, RobotsRules
+from .http_client import get_shared_http_client
+from .host_limiter import get_host_limiter, host_key
 
 logger = logging.getLogger(__name__)
 
+# Negative status codes returned by page_handler.fetch_page_content.
+_FETCH_STATUS_MAP = {-1: "TimeoutError", -2: "DNSError", -3: "ConnectionRefused", -4: "PlaywrightError", -5: "GenericScrapeError", -6: "RequestAborted", -7: "CaptchaFailed", -8: "ProxyError"}
+# Fetch status of a proxy or tunnel error, which is the proxy's fault.
+_PROXY_ERROR_STATUS = -8
+# Timeout and connection refused; these point at the proxy only if they repeat across hosts.
+_AMBIGUOUS_FAILURE_STATUSES = {-1, -3}
+
 
 async def is_allowed_by_robots(url: str, client: httpx.AsyncClient, config: ScraperConfig, input_row_id: Any, company_name_or_id: str) -> bool:
     if not config.respect_robots_txt:
@@ -30,27 +44,10 @@ async def is_allowed_by_robots(url: str, client: httpx.AsyncClient, config: Scra
     if parsed_url.scheme == 'file':
         logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Skipping robots.txt check for local file URL: {url}")
         return True
-    robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
-    rp = RobotFileParser()
-    try:
-        logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Fetching robots.txt from: {robots_url}")
-        response = await client.get(robots_url, timeout=10, headers={'User-Agent': config.robots_txt_user_agent})
-        if response.status_code == 200:
-            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Successfully fetched robots.txt for {url}, status: {response.status_code}")
-            rp.parse(response.text.splitlines())
-        elif response.status_code == 404:
-            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] robots.txt not found at {robots_url} (status 404), assuming allowed.")
-            return True
-        else:
-            logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Failed to fetch robots.txt from {robots_url}, status: {response.status_code}. Assuming allowed.")
-            return True
-    except httpx.RequestError as e:
-        logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] httpx.RequestError fetching robots.txt from {robots_url}: {e}. Assuming allowed.")
-        return True
-    except Exception as e:
-        logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Unexpected error processing robots.txt for {robots_url}: {e}. Assuming allowed.", exc_info=True)
-        return True
-    allowed = rp.can_fetch(config.robots_txt_user_agent, url)
+    # robots.txt is fetched once per origin and TTL and shared by all companies; see robots_cache.
+    allowed = await get_robots_cache(config).is_allowed(
+        url, client, config.robots_txt_user_agent, f"[RowID: {input_row_id}, Company: {company_name_or_id}]"
+    )
     if not allowed:
         logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Scraping disallowed by robots.txt for URL: {url} (User-agent: {config.robots_txt_user_agent})")
     else:
@@ -58,6 +55,13 @@ async def is_allowed_by_robots(url: str, client: httpx.AsyncClient, config: Scra
     return allowed
 
 
+def _page_data_bytes(page_data: Dict[str, Any]) -> int:
+    """Size of the fetched document, as a lower bound of the traffic a page caused."""
+    if page_data.get("html") is not None:
+        return len(page_data["html"].encode('utf-8', 'ignore'))
+    extraction = page_data.get("extraction") or {}
+    return len((extraction.get("text") or "").encode('utf-8', 'ignore'))
+
 
 async def _perform_scrape_for_entry_point(
     entry_url_to_process: str,
@@ -69,12 +73,24 @@ async def _perform_scrape_for_entry_point(
     globally_processed_urls: Set[str],
     input_row_id: Any,
     proxy_manager: Optional[ProxyManager],
-    proxy_to_use: Optional[str]
+    proxy_to_use: Optional[str],
+    resource_blocker: Optional[ResourceBlocker] = None
 ) -> Tuple[List[Dict[str, Any]], str, Optional[str], str]:
     """
     Core scraping logic for a single entry point URL.
+    Up to `scraper_pages_concurrency` pages of the context drain the priority queue concurrently;
+    the entry point itself is always fetched first and alone. Links disallowed by robots.txt are
+    dropped before they are queued.
+
+    `playwright_context` is either a BrowserContext (using `proxy_to_use`, if any) or a
+    ProxyContextSet, in which case a page that fails in a way that points at the proxy is
+    retried up to `proxy_page_retries` times on another healthy proxy.
     Returns page details, status, canonical URL, and collected text for summary.
     """
+    if isinstance(playwright_context, ProxyContextSet):
+        contexts = playwright_context
+    else:
+        contexts = ProxyContextSet.fixed(playwright_context, proxy_to_use, proxy_manager)
     final_canonical_entry_url_for_this_attempt: Optional[str] = None
     pages_scraped_this_entry_count = 0
     high_priority_pages_scraped_after_limit_entry = 0
@@ -94,106 +110,238 @@ async def _perform_scrape_for_entry_point(
     priority_pages_collected_count = 0
     priority_page_types_for_summary = {"homepage", "about", "product_service"}
 
+    # Plain HTTP fetches would bypass the context's proxy, so proxied crawls always use the browser.
+    http_fetch_client = http_client if contexts.current_proxy is None else None
+    if config.scraper_fetch_mode == 'http_first' and http_fetch_client is None and contexts.current_proxy is not None:
+        logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Proxy in use; fetching all pages with the browser.")
+
     urls_to_scrape_q: List[Tuple[int, int, str]] = [(-100, 0, entry_url_to_process)]
     heapq.heapify(urls_to_scrape_q)
     processed_urls_this_entry_call: Set[str] = {entry_url_to_process}
 
-    page = await playwright_context.new_page()
-    page.set_default_timeout(config.default_page_timeout)
-    
+    # Pages currently being fetched; the page limit is only decided once their outcome is known.
+    queue_condition = asyncio.Condition()
+    pages_in_flight = 0
+    bypass_pages_in_flight = 0
     entry_point_status_code: Optional[int] = None
+    entry_point_failure_status: Optional[str] = None
+
+    def _limit_decision(current_score: int) -> str:
+        """
+        Decides whether the next URL is processed ('process'/'bypass'), skipped ('skip'),
+        or must wait ('wait') for in-flight pages to settle the page-limit accounting.
+        """
+        if config.scraper_max_pages_per_domain <= 0:
+            return "process"
+        if pages_scraped_this_entry_count + pages_in_flight < config.scraper_max_pages_per_domain:
+            return "process"
+        if pages_scraped_this_entry_count < config.scraper_max_pages_per_domain:
+            return "wait"
+        if current_score < config.scraper_score_threshold_for_limit_bypass:
+            return "skip"
+        if high_priority_pages_scraped_after_limit_entry + bypass_pages_in_flight >= config.scraper_max_high_priority_pages_after_limit:
+            return "wait" if bypass_pages_in_flight else "skip"
+        return "bypass"
+
+    async def _next_url() -> Optional[Tuple[int, int, str, bool]]:
+        nonlocal pages_in_flight, bypass_pages_in_flight
+        async with queue_condition:
+            while True:
+                if entry_point_failure_status is not None:
+                    return None
+                if not urls_to_scrape_q:
+                    if pages_in_flight == 0:
+                        queue_condition.notify_all()
+                        return None
+                    await queue_condition.wait()
+                    continue
 
-    try:
-        while urls_to_scrape_q:
-            neg_score, current_depth, current_url_from_queue = heapq.heappop(urls_to_scrape_q)
-            current_score = -neg_score
-            
-            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Dequeuing URL: '{current_url_from_queue}' (Depth: {current_depth}, Score: {current_score})")
+                decision = _limit_decision(-urls_to_scrape_q[0][0])
+                if decision == "wait":
+                    await queue_condition.wait()
+                    continue
+
+                neg_score, current_depth, current_url_from_queue = heapq.heappop(urls_to_scrape_q)
+                current_score = -neg_score
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Dequeuing URL: '{current_url_from_queue}' (Depth: {current_depth}, Score: {current_score})")
 
-            if config.scraper_max_pages_per_domain > 0 and pages_scraped_this_entry_count >= config.scraper_max_pages_per_domain:
-                if current_score < config.scraper_score_threshold_for_limit_bypass or high_priority_pages_scraped_after_limit_entry >= config.scraper_max_high_priority_pages_after_limit:
+                if decision == "skip":
                     logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Page limit reached, skipping '{current_url_from_queue}'.")
                     continue
-                else:
+                if decision == "bypass":
                     logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Page limit reached, but processing high-priority '{current_url_from_queue}'.")
+                    bypass_pages_in_flight += 1
+                pages_in_flight += 1
+                return current_score, current_depth, current_url_from_queue, decision == "bypass"
+
+    async def _robots_rules_for(url: str) -> Optional[RobotsRules]:
+        if not config.respect_robots_txt:
+            return None
+        robots_entry = await get_robots_cache(config).get_entry(
+            url, http_client, config.robots_txt_user_agent, f"[RowID: {input_row_id}, Company: {company_name_or_id}]"
+        )
+        return robots_entry.rules_for(config.robots_txt_user_agent) if robots_entry is not None else None
+
+    async def _process_url(fetch, current_score: int, current_depth: int, current_url_from_queue: str):
+        nonlocal pages_scraped_this_entry_count, high_priority_pages_scraped_after_limit_entry
+        nonlocal final_canonical_entry_url_for_this_attempt, priority_pages_collected_count
+        nonlocal entry_point_status_code, entry_point_failure_status
+
+        if config.respect_robots_txt:
+            await get_robots_cache(config).wait_for_crawl_delay(
+                current_url_from_queue, http_client, config.robots_txt_user_agent,
+                f"[RowID: {input_row_id}, Company: {company_name_or_id}]"
+            )
+        page_data, status_code_fetch = await fetch(current_url_from_queue)
 
-            html_content, status_code_fetch = await fetch_page_content(page, current_url_from_queue, config, input_row_id, company_name_or_id)
-            
-            if current_url_from_queue == entry_url_to_process:
-                entry_point_status_code = status_code_fetch
+        if current_url_from_queue == entry_url_to_process:
+            entry_point_status_code = status_code_fetch
 
-            if html_content:
-                pages_scraped_this_entry_count += 1
-                if pages_scraped_this_entry_count > config.scraper_max_pages_per_domain and current_score >= config.scraper_score_threshold_for_limit_bypass:
-                    high_priority_pages_scraped_after_limit_entry += 1
+        if page_data:
+            pages_scraped_this_entry_count += 1
+            if pages_scraped_this_entry_count > config.scraper_max_pages_per_domain and current_score >= config.scraper_score_threshold_for_limit_bypass:
+                high_priority_pages_scraped_after_limit_entry += 1
 
-                final_landed_url_normalized = normalize_url(page.url)
-                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Fetched '{current_url_from_queue}', Landed at '{final_landed_url_normalized}', Status: {status_code_fetch}")
+            final_landed_url_normalized = normalize_url(page_data["url"])
+            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Fetched '{current_url_from_queue}', Landed at '{final_landed_url_normalized}', Status: {status_code_fetch}")
 
-                if not final_canonical_entry_url_for_this_attempt and current_depth == 0:
-                    final_canonical_entry_url_for_this_attempt = final_landed_url_normalized
-                    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Canonical URL for entry '{entry_url_to_process}' set to: '{final_canonical_entry_url_for_this_attempt}'")
-                
-                if final_landed_url_normalized in globally_processed_urls:
-                    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] URL '{final_landed_url_normalized}' already globally processed. Skipping.")
-                    continue
-                
-                globally_processed_urls.add(final_landed_url_normalized)
-                processed_urls_this_entry_call.add(final_landed_url_normalized)
+            if not final_canonical_entry_url_for_this_attempt and current_depth == 0:
+                final_canonical_entry_url_for_this_attempt = final_landed_url_normalized
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Canonical URL for entry '{entry_url_to_process}' set to: '{final_canonical_entry_url_for_this_attempt}'")
+            
+            if final_landed_url_normalized in globally_processed_urls:
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] URL '{final_landed_url_normalized}' already globally processed. Skipping.")
+                return
+            
+            globally_processed_urls.add(final_landed_url_normalized)
+            processed_urls_this_entry_call.add(final_landed_url_normalized)
 
-                cleaned_text = extract_text_from_html(html_content)
+            include_links = current_depth < config.max_depth_internal_links
+            if page_data["extraction"] is not None:
+                parsed_page = parse_extracted_page(page_data["extraction"], final_landed_url_normalized, config, input_row_id, company_name_or_id, include_links)
+            else:
+                parsed_page = parse_page(page_data["html"], final_landed_url_normalized, config, input_row_id, company_name_or_id, include_links)
+            cleaned_text = parsed_page["text"]
+            
+            landed_url_safe_name = get_safe_filename(final_landed_url_normalized, config, for_url=True)
+            content_filename = f"{company_safe_name}__{landed_url_safe_name}.txt"
+            content_filepath = os.path.join(base_scraped_content_dir, content_filename)
+            
+            try:
+                with open(content_filepath, 'w', encoding='utf-8') as f:
+                    f.write(cleaned_text)
                 
-                landed_url_safe_name = get_safe_filename(final_landed_url_normalized, config, for_url=True)
-                content_filename = f"{company_safe_name}__{landed_url_safe_name}.txt"
-                content_filepath = os.path.join(base_scraped_content_dir, content_filename)
+                page_type = _classify_page_type(final_landed_url_normalized, config)
                 
+                page_result = {
+                    "url": final_landed_url_normalized,
+                    "status": status_code_fetch,
+                    "content_file_path": content_filepath,
+                    "page_type": page_type,
+                    "title": parsed_page["title"],
+                    "fetch_method": page_data["fetch_method"],
+                    "blocked_requests": page_data.get("blocked_requests", 0),
+                    "wait_ms": page_data.get("wait_ms", 0),
+                    "summary_text": None
+                }
+                scraped_page_results.append(page_result)
+
+                if page_type in priority_page_types_for_summary and priority_pages_collected_count < config.scraper_pages_for_summary_count:
+                    collected_texts_for_summary.append(cleaned_text)
+                    priority_pages_collected_count += 1
+                    logger.debug(f"[RowID: {input_row_id}] Collected text from '{final_landed_url_normalized}' for summary.")
+
+            except IOError as e:
+                logger.error(f"[RowID: {input_row_id}] IOError saving content for '{final_landed_url_normalized}': {e}")
+
+            if current_depth < config.max_depth_internal_links:
+                # Scored links share the landed page's host, so one robots.txt applies to all of them.
+                robots_rules = await _robots_rules_for(final_landed_url_normalized)
+                for link_url, link_score in parsed_page["links"]:
+                    if link_url not in globally_processed_urls and link_url not in processed_urls_this_entry_call:
+                        processed_urls_this_entry_call.add(link_url)
+                        if robots_rules is not None and not robots_rules.allows(link_url):
+                            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{link_url}' disallowed by robots.txt. Not queueing.")
+                            continue
+                        heapq.heappush(urls_to_scrape_q, (-link_score, current_depth + 1, link_url))
+        else:
+            logger.warning(f"[RowID: {input_row_id}] Failed to fetch content from '{current_url_from_queue}'. Status: {status_code_fetch}.")
+
+            if current_url_from_queue == entry_url_to_process:
+                if status_code_fetch is None:
+                    http_status_report = "UnknownScrapeError"
+                else:
+                    http_status_report = f"HTTPError_{status_code_fetch}" if status_code_fetch > 0 else _FETCH_STATUS_MAP.get(status_code_fetch, "UnknownScrapeError")
+                logger.error(f"[RowID: {input_row_id}] Critical failure on entry point '{entry_url_to_process}'. Status: {http_status_report}.")
+                entry_point_failure_status = http_status_report
+
+    async def _crawl_worker():
+        nonlocal pages_in_flight, bypass_pages_in_flight
+        page = None
+        page_proxy = None
+
+        async def _get_page():
+            # Opened on first use only, so workers whose pages are all served over HTTP never open a tab.
+            nonlocal page, page_proxy
+            if page is not None and page_proxy != contexts.current_proxy:
+                # The crawl moved to another proxy since this page was opened.
+                await page.close()
+                page = None
+            if page is None:
+                page, page_proxy = await contexts.new_page()
+                page.set_default_timeout(config.default_page_timeout)
+            return page
+
+        async def _fetch(url: str):
+            retries_left = config.proxy_page_retries
+            while True:
+                page_data, status_code_fetch = await fetch_page_hybrid(
+                    _get_page, url, config, input_row_id, company_name_or_id,
+                    http_client=http_fetch_client, extract_in_browser=config.in_browser_extraction,
+                    resource_blocker=resource_blocker, user_agent=contexts.context_options.get('user_agent')
+                )
+                # Only browser navigations go through the proxy; they report their navigation time.
+                if page_data is not None and page_data.get("proxy_latency_ms") is not None and page_proxy is not None and contexts.proxy_manager is not None:
+                    contexts.proxy_manager.report_success(page_proxy, page_data["proxy_latency_ms"] / 1000, _page_data_bytes(page_data))
+                if page_data is not None or page is None or page_proxy is None or contexts.proxy_manager is None:
+                    return page_data, status_code_fetch
+                if status_code_fetch != _PROXY_ERROR_STATUS and not (
+                    status_code_fetch in _AMBIGUOUS_FAILURE_STATUSES
+                    and contexts.proxy_manager.is_proxy_failure(page_proxy, urlparse(url).hostname)
+                ):
+                    return page_data, status_code_fetch
+                failed_proxy = page_proxy
+                next_proxy = await contexts.switch_proxy(failed_proxy, find_replacement=retries_left > 0)
+                if next_proxy is None:
+                    return page_data, status_code_fetch
+                retries_left -= 1
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Retrying '{url}' on proxy {next_proxy} after failure on {failed_proxy}.")
+
+        try:
+            while True:
+                next_item = await _next_url()
+                if next_item is None:
+                    return
+                current_score, current_depth, current_url_from_queue, is_bypass = next_item
                 try:
-                    with open(content_filepath, 'w', encoding='utf-8') as f:
-                        f.write(cleaned_text)
-                    
-                    page_type = _classify_page_type(final_landed_url_normalized, config)
-                    
-                    page_result = {
-                        "url": final_landed_url_normalized,
-                        "status": status_code_fetch,
-                        "content_file_path": content_filepath,
-                        "page_type": page_type,
-                        "summary_text": None
-                    }
-                    scraped_page_results.append(page_result)
-
-                    if page_type in priority_page_types_for_summary and priority_pages_collected_count < config.scraper_pages_for_summary_count:
-                        collected_texts_for_summary.append(cleaned_text)
-                        priority_pages_collected_count += 1
-                        logger.debug(f"[RowID: {input_row_id}] Collected text from '{final_landed_url_normalized}' for summary.")
-
-                except IOError as e:
-                    logger.error(f"[RowID: {input_row_id}] IOError saving content for '{final_landed_url_normalized}': {e}")
-
-                if current_depth < config.max_depth_internal_links:
-                    newly_found_links = find_internal_links(html_content, final_landed_url_normalized, config, input_row_id, company_name_or_id)
-                    for link_url, link_score in newly_found_links:
-                        if link_url not in globally_processed_urls and link_url not in processed_urls_this_entry_call:
-                            heapq.heappush(urls_to_scrape_q, (-link_score, current_depth + 1, link_url))
-                            processed_urls_this_entry_call.add(link_url)
-            else:
-                logger.warning(f"[RowID: {input_row_id}] Failed to fetch content from '{current_url_from_queue}'. Status: {status_code_fetch}.")
-                
-                # Report proxy failure if applicable
-                if proxy_manager and proxy_to_use and status_code_fetch in [-1, -3]: # Timeout or Connection Refused
-                    proxy_manager.report_failure(proxy_to_use)
-
-                if current_url_from_queue == entry_url_to_process:
-                    status_map = {-1: "TimeoutError", -2: "DNSError", -3: "ConnectionRefused", -4: "PlaywrightError", -5: "GenericScrapeError", -6: "RequestAborted", -7: "CaptchaFailed"}
-                    if status_code_fetch is None:
-                        http_status_report = "UnknownScrapeError"
-                    else:
-                        http_status_report = f"HTTPError_{status_code_fetch}" if status_code_fetch > 0 else status_map.get(status_code_fetch, "UnknownScrapeError")
-                    logger.error(f"[RowID: {input_row_id}] Critical failure on entry point '{entry_url_to_process}'. Status: {http_status_report}.")
-                    await page.close()
-                    return [], http_status_report, None, ""
-        
-        await page.close()
+                    await _process_url(_fetch, current_score, current_depth, current_url_from_queue)
+                finally:
+                    pages_in_flight -= 1
+                    if is_bypass:
+                        bypass_pages_in_flight -= 1
+                    async with queue_condition:
+                        queue_condition.notify_all()
+        finally:
+            if page is not None and not page.is_closed():
+                await page.close()
+
+    worker_count = max(1, config.scraper_pages_concurrency)
+    workers = [asyncio.create_task(_crawl_worker()) for _ in range(worker_count)]
+    try:
+        await asyncio.gather(*workers)
+
+        if entry_point_failure_status is not None:
+            return [], entry_point_failure_status, None, ""
 
         final_summary_input_text = ""
         if collected_texts_for_summary:
@@ -207,30 +355,93 @@ async def _perform_scrape_for_entry_point(
             logger.info(f"[RowID: {input_row_id}] Successfully scraped {len(scraped_page_results)} pages for entry '{entry_url_to_process}'.")
             return scraped_page_results, "Success", final_canonical_entry_url_for_this_attempt, final_summary_input_text
         else:
-            status_map = {-1: "TimeoutError", -2: "DNSError", -3: "ConnectionRefused", -4: "PlaywrightError", -5: "GenericScrapeError", -6: "RequestAborted", -7: "CaptchaFailed"}
             if entry_point_status_code is None:
                 final_status = "NoContentScraped_Overall"
             else:
-                final_status = f"HTTPError_{entry_point_status_code}" if entry_point_status_code > 0 else status_map.get(entry_point_status_code, "NoContentScraped_Overall")
+                final_status = f"HTTPError_{entry_point_status_code}" if entry_point_status_code > 0 else _FETCH_STATUS_MAP.get(entry_point_status_code, "NoContentScraped_Overall")
             logger.warning(f"[RowID: {input_row_id}] No content scraped for entry '{entry_url_to_process}'. Final status: {final_status}")
             return [], final_status, final_canonical_entry_url_for_this_attempt, ""
             
     except Exception as e:
         logger.error(f"[RowID: {input_row_id}] General error during scraping for '{entry_url_to_process}': {e}", exc_info=True)
-        if not page.is_closed(): await page.close()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
         return [], f"GeneralScrapingError_{type(e).__name__}", final_canonical_entry_url_for_this_attempt, ""
 
 
+async def _scrape_with_browser_pool(
+    browser_pool: BrowserPool,
+    normalized_given_url: str,
+    config: ScraperConfig,
+    output_dir_for_run: str,
+    company_name_or_id: str,
+    globally_processed_urls: Set[str],
+    input_row_id: Any,
+    log_identifier: str,
+    http_client: httpx.AsyncClient
+) -> List[Dict[str, Any]]:
+    """
+    Runs the crawl for one company inside fresh BrowserContexts borrowed from the pool
+    (one per proxy the crawl uses).
+    """
+    user_agent = random.choice(config.user_agents) if config.user_agents else config.user_agent
+    context_options: Dict[str, Any] = {
+        'user_agent': user_agent,
+        'java_script_enabled': True,
+        'ignore_https_errors': True,
+        'extra_http_headers': config.default_headers
+    }
+
+    if config.consent_state_enabled:
+        storage_state = get_consent_state_store(config).load(normalized_given_url)
+        if storage_state is not None:
+            logger.debug(f"{log_identifier} Preloading stored consent state ({len(storage_state['cookies'])} cookies).")
+            context_options['storage_state'] = storage_state
+
+    resource_blocker = ResourceBlocker(config) if config.scraper_resource_blocking_enabled else None
+    # Each proxy gets its own context, so a failing proxy can be swapped out mid-crawl.
+    contexts = ProxyContextSet(
+        browser_pool, context_options,
+        proxy_manager=get_proxy_manager(config) if config.proxy_enabled else None,
+        on_new_context=resource_blocker.install if resource_blocker is not None else None,
+        log_prefix=log_identifier
+    )
+    try:
+        await contexts.start()
+        logger.info(f"{log_identifier} Attempting scrape with entry point: {normalized_given_url}")
+        results, status, _, _ = await _perform_scrape_for_entry_point(
+            normalized_given_url, contexts, http_client, config, output_dir_for_run,
+            company_name_or_id, globally_processed_urls, input_row_id,
+            contexts.proxy_manager, contexts.current_proxy, resource_blocker
+        )
+    finally:
+        await contexts.close()
+
+    logger.info(f"{log_identifier} Scrape attempt for '{normalized_given_url}' finished with status: {status}. Returning results.")
+    return results
+
+
 async def scrape_website(
     given_url: str,
     config: ScraperConfig,
     output_dir_for_run: str,
     company_name_or_id: str,
-    input_row_id: Any = "N/A"
+    input_row_id: Any = "N/A",
+    browser_pool: Optional[BrowserPool] = None,
+    http_client: Optional[httpx.AsyncClient] = None
 ) -> List[Dict[str, Any]]:
     """
     Performs a comprehensive scrape of a website based on a given URL and configuration.
     Includes caching to avoid re-scraping the same content.
+
+    If `browser_pool` is given, the crawl runs in a fresh context on one of its warm browsers;
+    otherwise a single-browser pool is started and torn down for this call. `http_client` is used
+    for robots.txt and link validation requests; by default the process-wide pooled client is used.
+
+    Cached results older than `cache_ttl_seconds` are scraped again. With
+    `cache_stale_while_revalidate`, they are returned right away instead and refreshed in the
+    background; `wait_for_revalidations` waits for those refreshes.
     """
     log_identifier = f"[RowID: {input_row_id}, Company: {company_name_or_id}]"
     logger.info(f"{log_identifier} Starting scrape for URL: {given_url}")
@@ -238,12 +449,90 @@ async def scrape_website(
     # --- Caching Logic: Check before scraping ---
     if config.caching_enabled:
         cache_key = caching.generate_cache_key(given_url)
-        cached_results = caching.load_from_cache(cache_key, config.cache_dir)
-        if cached_results is not None:
+        cached_results, stale = caching.get_scrape_cache(config).lookup(cache_key)
+        if cached_results is not None and not stale:
             logger.info(f"{log_identifier} Scrape data for '{given_url}' loaded from cache.")
             return cached_results
+        if cached_results is not None and config.cache_stale_while_revalidate:
+            logger.info(f"{log_identifier} Serving stale cached data for '{given_url}' while it is scraped again.")
+            if cache_key not in _revalidations:
+                revalidation = asyncio.ensure_future(_revalidate(
+                    given_url, config, output_dir_for_run, company_name_or_id, input_row_id,
+                    browser_pool, http_client, log_identifier
+                ))
+                _revalidations[cache_key] = revalidation
+                revalidation.add_done_callback(lambda _: _revalidations.pop(cache_key, None))
+            return cached_results
+        if cached_results is not None:
+            logger.info(f"{log_identifier} Cached data for '{given_url}' has expired; scraping again.")
+
+    return await _scrape_and_cache(
+        given_url, config, output_dir_for_run, company_name_or_id, input_row_id,
+        browser_pool, http_client, log_identifier
+    )
+
+
+# Background refreshes of stale cache entries, by cache key.
+_revalidations: Dict[str, "asyncio.Future[List[Dict[str, Any]]]"] = {}
+# Bounds how many refreshes crawl at once, per event loop.
+_revalidation_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+
+async def _revalidate(
+    given_url: str,
+    config: ScraperConfig,
+    output_dir_for_run: str,
+    company_name_or_id: str,
+    input_row_id: Any,
+    browser_pool: Optional[BrowserPool],
+    http_client: Optional[httpx.AsyncClient],
+    log_identifier: str
+) -> List[Dict[str, Any]]:
+    """
+    Refreshes a stale cache entry. At most `scraper_max_concurrent_companies` refreshes crawl at
+    once, and each holds a slot of the per-host limiter that batch workers use, so refreshes add
+    no more load to a host than a batch row would.
+    """
+    global _revalidation_slots
+    loop = asyncio.get_running_loop()
+    if _revalidation_slots is None or _revalidation_slots[0] is not loop:
+        _revalidation_slots = (loop, asyncio.Semaphore(max(1, config.scraper_max_concurrent_companies)))
+    slots = _revalidation_slots[1]
+    host_limiter, host = get_host_limiter(config), host_key(given_url)
+    async with slots:
+        await host_limiter.acquire(host)
+        try:
+            return await _scrape_and_cache(
+                given_url, config, output_dir_for_run, company_name_or_id, input_row_id,
+                browser_pool, http_client, log_identifier
+            )
+        finally:
+            host_limiter.release(host)
 
-    processed_url, status = process_input_url(given_url, config.url_probing_tlds, log_identifier)
+
+async def wait_for_revalidations():
+    """
+    Waits for the background refreshes of stale cache entries started so far. Callers that close
+    the browser pool or HTTP client passed to `scrape_website` should await this first.
+    """
+    while _revalidations:
+        await asyncio.gather(*_revalidations.values(), return_exceptions=True)
+
+
+async def _scrape_and_cache(
+    given_url: str,
+    config: ScraperConfig,
+    output_dir_for_run: str,
+    company_name_or_id: str,
+    input_row_id: Any,
+    browser_pool: Optional[BrowserPool],
+    http_client: Optional[httpx.AsyncClient],
+    log_identifier: str
+) -> List[Dict[str, Any]]:
+    """Scrapes `given_url` without consulting the cache and caches non-empty results."""
+    processed_url, status = await process_input_url_async(
+        given_url, config.url_probing_tlds, log_identifier, config.url_probing_dns_timeout_seconds
+    )
 
     if not processed_url:
         logger.warning(f"{log_identifier} The URL '{given_url}' was determined to be invalid. Aborting scrape.")
@@ -252,57 +541,30 @@ async def scrape_website(
     normalized_given_url = processed_url
     globally_processed_urls: Set[str] = set()
 
-    async with httpx.AsyncClient(follow_redirects=True, verify=False) as http_client:
+    results = []
+    async with AsyncExitStack() as exit_stack:
+        if http_client is None:
+            http_client = get_shared_http_client(config)
+
         if not await is_allowed_by_robots(normalized_given_url, http_client, config, input_row_id, company_name_or_id):
             return [{"url": normalized_given_url, "status": "RobotsDisallowed", "content_file_path": None, "page_type": "unknown", "summary_text": None}]
-    
-    os.makedirs(output_dir_for_run, exist_ok=True)
-
-    results = []
-    async with async_playwright() as p:
-        browser = None
-        try:
-            launch_options: Dict[str, Any] = {'headless': config.headless_mode}
-            proxy_manager = None
-            proxy_to_use = None
-
-            if config.proxy_enabled:
-                proxy_manager = ProxyManager(config)
-                proxy_to_use = proxy_manager.get_proxy()
-                if proxy_to_use:
-                    logger.info(f"{log_identifier} Using proxy: {proxy_to_use}")
-                    launch_options['proxy'] = {'server': proxy_to_use}
-                else:
-                    logger.warning(f"{log_identifier} Proxy is enabled, but no healthy proxy could be obtained. Proceeding without proxy.")
 
-            browser = await p.chromium.launch(**launch_options)
-            user_agent = random.choice(config.user_agents) if config.user_agents else config.user_agent
+        os.makedirs(output_dir_for_run, exist_ok=True)
 
-            context = await browser.new_context(
-                user_agent=user_agent,
-                java_script_enabled=True,
-                ignore_https_errors=True,
-                extra_http_headers=config.default_headers
+        try:
+            if browser_pool is None:
+                browser_pool = await exit_stack.enter_async_context(BrowserPool(config, size=1))
+            results = await _scrape_with_browser_pool(
+                browser_pool, normalized_given_url, config, output_dir_for_run,
+                company_name_or_id, globally_processed_urls, input_row_id, log_identifier,
+                http_client
             )
-            
-            logger.info(f"{log_identifier} Attempting scrape with entry point: {normalized_given_url}")
-            async with httpx.AsyncClient(follow_redirects=True, verify=False) as validation_client:
-                results, status, _, _ = await _perform_scrape_for_entry_point(
-                    normalized_given_url, context, validation_client, config, output_dir_for_run,
-                    company_name_or_id, globally_processed_urls, input_row_id,
-                    proxy_manager, proxy_to_use
-                )
-            
-            logger.info(f"{log_identifier} Scrape attempt for '{normalized_given_url}' finished with status: {status}. Returning results.")
-            
         except Exception as e:
             logger.error(f"{log_identifier} Outer error in scrape_website for '{given_url}': {e}", exc_info=True)
-        finally:
-            if browser: await browser.close()
 
     # --- Caching Logic: Save after scraping ---
     if config.caching_enabled and results:
         cache_key = caching.generate_cache_key(given_url)
-        caching.save_to_cache(cache_key, results, config.cache_dir)
+        caching.get_scrape_cache(config).put(cache_key, results, url=given_url)
 
-    return results
\ No newline at end of file
+    return results
@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Set
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, url TEXT, domain TEXT, saved_at REAL NOT NULL, "
+    "last_used REAL NOT NULL, size INTEGER NOT NULL, results TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS entries_url ON entries (url)",
+    "CREATE INDEX IF NOT EXISTS entries_domain ON entries (domain)",
+    "CREATE INDEX IF NOT EXISTS entries_saved_at ON entries (saved_at)",
+    "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)",
+    "CREATE TABLE IF NOT EXISTS pages (key TEXT NOT NULL, url TEXT NOT NULL, domain TEXT, saved_at REAL NOT NULL, "
+    "text TEXT NOT NULL, PRIMARY KEY (key, url))",
+    "CREATE INDEX IF NOT EXISTS pages_url ON pages (url)",
+    "CREATE INDEX IF NOT EXISTS pages_domain ON pages (domain)",
+)
+
+
+def url_domain(url: Optional[str]) -> Optional[str]:
+    """The host an entry is indexed under (lowercased, without a leading 'www.')."""
+    if not url:
+        return None
+    host = (urlsplit(url if '//' in url else f"//{url}").hostname or '').lower().rstrip('.')
+    return (host[4:] if host.startswith('www.') else host) or None
+
+
+class SqliteCacheBackend:
+    """
+    Cache store in a SQLite database, as an alternative to one JSON file per entry.
+
+    `entries` holds the results of each cache key with its URL and domain, save time, last use and
+    size, indexed by URL, domain, save time and last use. `pages` holds the text of every page
+    of an entry, read from the result's `content_file_path` when the entry is written. The
+    database runs in WAL mode, so any number of processes read while one writes.
+
+    Writes and last-use updates are buffered and committed `batch_size` at a time in one
+    transaction; buffered entries are served from the buffer. `flush` commits the buffer, which
+    the process-wide cache also does at exit.
+    """
+    def __init__(self, path: str, batch_size: int = 20, timeout_seconds: float = 10.0):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.timeout_seconds = timeout_seconds
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._pending: "OrderedDict[str, Tuple[tuple, List[tuple], List[Dict[str, Any]]]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._total_bytes: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not be used across fork(), so each process opens its own.
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=self.timeout_seconds, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        self._connection, self._pid = connection, os.getpid()
+        return connection
+
+    def read(self, key: str) -> Tuple[Optional[List[Dict[str, Any]]], float, int]:
+        pending = self._pending.get(key)
+        if pending is not None:
+            entry_row, _, data = pending
+            return data, entry_row[3], entry_row[5]
+        try:
+            row = self._connect().execute("SELECT results, saved_at, size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None, 0, 0
+            return json.loads(row[0]), row[1], row[2]
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error loading cache entry {key} from {self.path}: {e}")
+            return None, 0, 0
+
+    def write(self, key: str, data: List[Dict[str, Any]], saved_at: float, url: Optional[str] = None) -> int:
+        text = json.dumps(data)
+        domain = url_domain(url)
+        page_rows = []
+        for row in data:
+            content_path = row.get("content_file_path") if isinstance(row, dict) else None
+            if not content_path:
+                continue
+            try:
+                with open(content_path, 'r', encoding='utf-8') as content_file:
+                    page_rows.append((key, row.get("url") or content_path, url_domain(row.get("url")) or domain, saved_at, content_file.read()))
+            except OSError as e:
+                logger.debug(f"Page text of {row.get('url')} not stored in the cache: {e}")
+        if self._total_bytes is not None:
+            stored_size = self._stored_size(key)
+            if self._total_bytes is not None:
+                self._total_bytes += len(text) - stored_size
+        self._pending[key] = ((key, url, domain, saved_at, saved_at, len(text), text), page_rows, data)
+        self._touched.pop(key, None)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return len(text)
+
+    def _stored_size(self, key: str) -> int:
+        pending = self._pending.get(key)
+        if pending is not None:
+            return pending[0][5]
+        try:
+            row = self._connect().execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            # The running total is recomputed the next time it is needed.
+            logger.error(f"Error reading the size of cache entry {key} from {self.path}: {e}")
+            self._total_bytes = None
+            return 0
+        return row[0] if row is not None else 0
+
+    def touch(self, keys: Iterable[str]):
+        now = time.time()
+        for key in keys:
+            if key not in self._pending:
+                self._touched[key] = now
+        if len(self._touched) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Commits buffered writes and last-use updates in one transaction."""
+        if not self._pending and not self._touched:
+            return
+        pending, touched = self._pending, self._touched
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany("INSERT OR REPLACE INTO entries (key, url, domain, saved_at, last_used, size, results) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                       [entry_row for entry_row, _, _ in pending.values()])
+                connection.executemany("DELETE FROM pages WHERE key = ?", [(key,) for key in pending])
+                connection.executemany("INSERT OR REPLACE INTO pages (key, url, domain, saved_at, text) VALUES (?, ?, ?, ?, ?)",
+                                       [page_row for _, page_rows, _ in pending.values() for page_row in page_rows])
+                connection.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(used, key) for key, used in touched.items()])
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            # The buffer is kept, so the next flush retries it.
+            logger.error(f"Error writing {len(pending)} cache entries to {self.path}: {e}")
+            return
+        self._pending, self._touched = OrderedDict(), {}
+
+    def total_bytes(self) -> int:
+        """Size of all entries, or 0 while the database cannot be read."""
+        if self._total_bytes is None:
+            self.flush()
+            try:
+                self._total_bytes = self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            except sqlite3.Error as e:
+                logger.error(f"Error reading the cache size from {self.path}: {e}")
+                return 0
+        return self._total_bytes
+
+    def _delete(self, connection: sqlite3.Connection, keys: List[str]):
+        connection.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in keys])
+        connection.executemany("DELETE FROM pages WHERE key = ?", [(key,) for key in keys])
+
+    def prune(self, ttl_seconds: float = 0, max_bytes: int = 0, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Deletes entries saved more than `ttl_seconds` ago (if > 0), then the least recently used ones
+        until at most `max_bytes` (if > 0) remain. If the database cannot be written, nothing is
+        removed and the result has an `error`.
+        """
+        now = time.time() if now is None else now
+        self.flush()
+        try:
+            return self._prune(ttl_seconds, max_bytes, now)
+        except sqlite3.Error as e:
+            logger.error(f"Error pruning the cache in {self.path}: {e}")
+            return {"removed_expired": 0, "removed_corrupt": 0, "removed_for_size": 0, "remaining_entries": 0,
+                    "remaining_bytes": 0, "removed_keys": set(), "error": str(e)}
+
+    def _prune(self, ttl_seconds: float, max_bytes: int, now: float) -> Dict[str, Any]:
+        connection = self._connect()
+        removed_keys: Set[str] = set()
+        result = {"removed_expired": 0, "removed_corrupt": 0, "removed_for_size": 0}
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if ttl_seconds > 0:
+                expired = [row[0] for row in connection.execute("SELECT key FROM entries WHERE saved_at < ?", (now - ttl_seconds,))]
+                self._delete(connection, expired)
+                result["removed_expired"] = len(expired)
+                removed_keys.update(expired)
+            total_bytes = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if max_bytes > 0 and total_bytes > max_bytes:
+                evicted = []
+                for key, size in connection.execute("SELECT key, size FROM entries ORDER BY last_used"):
+                    if total_bytes <= max_bytes:
+                        break
+                    evicted.append(key)
+                    total_bytes -= size
+                self._delete(connection, evicted)
+                result["removed_for_size"] = len(evicted)
+                removed_keys.update(evicted)
+            remaining_entries = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._total_bytes = total_bytes
+        result.update(remaining_entries=remaining_entries, remaining_bytes=total_bytes, removed_keys=removed_keys)
+        return result
+
+    def stats(self, ttl_seconds: float = 0, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        self.flush()
+        connection = self._connect()
+        entries, total_bytes, oldest, newest = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(saved_at), MAX(saved_at) FROM entries"
+        ).fetchone()
+        expired = connection.execute("SELECT COUNT(*) FROM entries WHERE saved_at < ?", (now - ttl_seconds,)).fetchone()[0] if ttl_seconds > 0 else 0
+        return {
+            "entries": entries, "bytes": total_bytes, "expired": expired, "legacy_entries": 0, "corrupt_entries": 0,
+            "temp_files": 0, "oldest_saved_at": oldest, "newest_saved_at": newest,
+            "pages": connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0],
+            "database_bytes": self._file_size(),
+        }
+
+    def _file_size(self) -> int:
+        return sum(os.path.getsize(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path))
+
+    def compact(self) -> Dict[str, int]:
+        """Checkpoints the write-ahead log and rebuilds the database file without free pages."""
+        self.flush()
+        connection = self._connect()
+        bytes_before = self._file_size()
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("VACUUM")
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"rewritten": 0, "removed_corrupt": 0, "removed_temp_files": 0, "bytes_before": bytes_before, "bytes_after": self._file_size()}
+
+    def page_text(self, url: str) -> Optional[str]:
+        """Returns the most recently stored text of the page at `url`, or None."""
+        self.flush()
+        row = self._connect().execute("SELECT text FROM pages WHERE url = ? ORDER BY saved_at DESC LIMIT 1", (url,)).fetchone()
+        return row[0] if row is not None else None
+
+    def entries_for_domain(self, domain: str) -> List[Dict[str, Any]]:
+        """Returns key, URL and save time of every entry of a domain, newest first."""
+        self.flush()
+        rows = self._connect().execute("SELECT key, url, saved_at FROM entries WHERE domain = ? ORDER BY saved_at DESC", (url_domain(domain),))
+        return [{"key": key, "url": url, "saved_at": saved_at} for key, url, saved_at in rows]
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
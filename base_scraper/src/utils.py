@@ -1,52 +1,90 @@
+import asyncio
+import functools
 import logging
 import re
 import socket
 import hashlib
-from urllib.parse import urljoin, urlparse, urldefrag, quote, ParseResult
-from bs4 import BeautifulSoup
-from bs4.element import Tag
-from typing import List, Tuple, Optional, Any
+import time
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, urldefrag, quote, ParseResult
+from typing import List, Tuple, Optional, Any, Dict
 import httpx
 
 from .config import ScraperConfig
+from .html_parsers import get_html_parser
+from .dns_cache import resolve_host, get_dns_cache, host_not_found
 
 logger = logging.getLogger(__name__)
 
+_COMMON_INDEX_FILES = ('index.html', 'index.htm', 'index.php', 'default.html', 'default.htm', 'index.asp', 'default.asp')
+_IGNORED_QUERY_PARAMS = frozenset({'fallback'})
+# Navigation links repeat on every page of a site, so most calls are cache hits.
+NORMALIZE_URL_CACHE_SIZE = 65536
+
+@functools.lru_cache(maxsize=NORMALIZE_URL_CACHE_SIZE)
 def normalize_url(url: str) -> str:
     """
     Normalizes a URL to a canonical form.
+
+    Results are memoised in a bounded LRU cache (`normalize_url.cache_info()` / `.cache_clear()`).
     """
     try:
-        url_no_frag, _ = urldefrag(url)
-        parsed = urlparse(url_no_frag)
-        scheme = parsed.scheme.lower()
-        netloc = parsed.netloc.lower()
+        if '#' in url:
+            # urldefrag re-serialises the URL, which can change odd inputs; keep that behaviour.
+            url_no_frag, _ = urldefrag(url)
+        else:
+            url_no_frag = url
+        scheme, netloc, path, query, _ = urlsplit(url_no_frag)
+        if ';' in path:
+            # Path parameters are only split off the last segment by urlparse; keep its exact semantics.
+            return _normalize_url_with_params(url)
+        scheme = scheme.lower()
+        netloc = netloc.lower()
         if netloc.startswith("www."):
             netloc = netloc[4:]
-        path = parsed.path
-        common_indexes = ['index.html', 'index.htm', 'index.php', 'default.html', 'default.htm', 'index.asp', 'default.asp']
-        for index_file in common_indexes:
-            if path.endswith(f'/{index_file}'):
-                path = path[:-len(index_file)]
-                break
-        if netloc and path and not path.startswith('/'):
+        if path.endswith(_COMMON_INDEX_FILES):
+            slash_index = path.rfind('/')
+            if slash_index != -1 and path[slash_index + 1:] in _COMMON_INDEX_FILES:
+                path = path[:slash_index + 1]
+        if netloc and path and path[0] != '/':
             path = '/' + path
         if path != '/' and path.endswith('/'):
             path = path[:-1]
         if not path and netloc:
             path = '/'
-        query = ''
-        if parsed.query:
-            params = parsed.query.split('&')
-            ignored_params = {'fallback'}
-            filtered_params = [p for p in params if (p.split('=')[0].lower() if '=' in p else p.lower()) not in ignored_params]
-            if filtered_params:
-                query = '&'.join(sorted(filtered_params))
-        return urlparse('')._replace(scheme=scheme, netloc=netloc, path=path, params=parsed.params, query=query, fragment='').geturl()
+        if query:
+            filtered_params = [p for p in query.split('&') if p.split('=', 1)[0].lower() not in _IGNORED_QUERY_PARAMS]
+            query = '&'.join(sorted(filtered_params))
+        return urlunsplit((scheme, netloc, path, query, ''))
     except Exception as e:
         logger.error(f"Error normalizing URL '{url}': {e}. Returning original URL.", exc_info=True)
         return url
 
+def _normalize_url_with_params(url: str) -> str:
+    url_no_frag, _ = urldefrag(url)
+    parsed = urlparse(url_no_frag)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    path = parsed.path
+    for index_file in _COMMON_INDEX_FILES:
+        if path.endswith(f'/{index_file}'):
+            path = path[:-len(index_file)]
+            break
+    if netloc and path and not path.startswith('/'):
+        path = '/' + path
+    if path != '/' and path.endswith('/'):
+        path = path[:-1]
+    if not path and netloc:
+        path = '/'
+    query = ''
+    if parsed.query:
+        params = parsed.query.split('&')
+        filtered_params = [p for p in params if (p.split('=')[0].lower() if '=' in p else p.lower()) not in _IGNORED_QUERY_PARAMS]
+        if filtered_params:
+            query = '&'.join(sorted(filtered_params))
+    return urlparse('')._replace(scheme=scheme, netloc=netloc, path=path, params=parsed.params, query=query, fragment='').geturl()
+
 def get_safe_filename(name_or_url: str, config: ScraperConfig, for_url: bool = False, max_len: int = 100) -> str:
     if for_url:
         logger.info(f"get_safe_filename (for_url=True): Input for filename generation='{name_or_url}'")
@@ -66,98 +104,232 @@ def get_safe_filename(name_or_url: str, config: ScraperConfig, for_url: bool = F
         logger.debug(f"DEBUG PATH: get_safe_filename (for_url=False) output: '{safe_name_truncated}' (original sanitized: '{safe_name}', max_len: {max_len}) from input '{original_input}'") # DEBUG PATH LENGTH
         return safe_name_truncated
 
-def extract_text_from_html(html_content: str) -> str:
+def extract_text_from_html(html_content: str, config: Optional[ScraperConfig] = None) -> str:
     if not html_content: return ""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    for script_or_style in soup(["script", "style"]):
-        script_or_style.decompose()
-    text = soup.get_text(separator=' ', strip=True)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return get_html_parser(config.html_parser if config else None).extract_text(html_content)
 
 def find_internal_links(html_content: str, base_url: str, config: ScraperConfig, input_row_id: Any, company_name_or_id: str) -> List[Tuple[str, int]]:
     if not html_content: return []
-    scored_links: List[Tuple[str, int]] = []
-    soup = BeautifulSoup(html_content, 'html.parser')
-    normalized_base_url_str = normalize_url(base_url)
-    parsed_base_url = urlparse(normalized_base_url_str)
-
-    for link_tag in soup.find_all('a', href=True):
-        if not isinstance(link_tag, Tag): continue
-        href_attr = link_tag.get('href')
-        current_href: Optional[str] = None
-        if isinstance(href_attr, str): current_href = href_attr.strip()
-        elif isinstance(href_attr, list) and href_attr and isinstance(href_attr[0], str): current_href = href_attr[0].strip()
-        if not current_href: continue
-
-        absolute_url_raw = urljoin(base_url, current_href)
-        normalized_link_url = normalize_url(absolute_url_raw)
-        parsed_normalized_link = urlparse(normalized_link_url)
-
-        if parsed_normalized_link.scheme not in ['http', 'https']: continue
-        if parsed_normalized_link.netloc != parsed_base_url.netloc: continue
-
-        link_text = link_tag.get_text().lower().strip()
-        link_href_lower = normalized_link_url.lower()
-        initial_keyword_match = False
-        if config.target_link_keywords:
-            if any(kw in link_text for kw in config.target_link_keywords) or \
-               any(kw in link_href_lower for kw in config.target_link_keywords):
-                initial_keyword_match = True
-        if not initial_keyword_match: continue
-
-        if config.scraper_exclude_link_path_patterns:
-            path_lower = parsed_normalized_link.path.lower()
-            if any(p and p in path_lower for p in config.scraper_exclude_link_path_patterns):
-                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{normalized_link_url}' hard excluded by pattern in path: '{path_lower}'.")
-                continue
-        
+    anchors = get_html_parser(config.html_parser).collect_anchors(html_content)
+    return score_internal_links(anchors, base_url, config, input_row_id, company_name_or_id)
+
+def parse_page(html_content: str, base_url: str, config: ScraperConfig, input_row_id: Any = "N/A", company_name_or_id: str = "N/A", include_links: bool = True) -> Dict[str, Any]:
+    """
+    Parses a page once, with the backend selected by `config.html_parser`, and returns
+    everything the crawler needs from it.
+
+    Args:
+        html_content: The page HTML.
+        base_url: The URL the page was served from, used to resolve relative links.
+        config: The scraper configuration (parser backend, link keywords and scoring limits).
+        input_row_id: Row identifier used in log messages.
+        company_name_or_id: Company identifier used in log messages.
+        include_links: Whether to score the page's internal links. Skipping this saves
+                       the scoring work on pages at the maximum crawl depth.
+
+    Returns:
+        A dict with the cleaned `text` (same as `extract_text_from_html`), the scored
+        internal `links` (same as `find_internal_links`) and the page's `title`,
+        `meta_description`, `canonical_url` and `language`.
+    """
+    if not html_content:
+        return {"text": "", "links": [], "title": None, "meta_description": None, "canonical_url": None, "language": None}
+    document = get_html_parser(config.html_parser).parse_document(html_content, include_anchors=include_links)
+    return _build_parsed_page(document, base_url, config, input_row_id, company_name_or_id, include_links)
+
+def parse_extracted_page(extraction: Dict[str, Any], base_url: str, config: ScraperConfig, input_row_id: Any = "N/A", company_name_or_id: str = "N/A", include_links: bool = True) -> Dict[str, Any]:
+    """
+    Builds the same result as `parse_page` from data extracted inside the browser
+    (see `page_handler.fetch_page_data`), without parsing any HTML in Python.
+    The text is the page's rendered `innerText`, whitespace-collapsed.
+    """
+    document = {
+        "text": re.sub(r'\s+', ' ', extraction.get("text") or '').strip(),
+        "anchors": [(href, text or '') for href, text in (extraction.get("anchors") or []) if href] if include_links else [],
+        "title": extraction.get("title"),
+        "meta_description": extraction.get("meta_description"),
+        "canonical_href": extraction.get("canonical_href"),
+        "language": extraction.get("language"),
+    }
+    return _build_parsed_page(document, base_url, config, input_row_id, company_name_or_id, include_links)
+
+def _build_parsed_page(document: Dict[str, Any], base_url: str, config: ScraperConfig, input_row_id: Any, company_name_or_id: str, include_links: bool) -> Dict[str, Any]:
+    parsed_page: Dict[str, Any] = {
+        "text": document["text"],
+        "links": [],
+        "title": document["title"],
+        "meta_description": document["meta_description"],
+        "canonical_url": None,
+        "language": document["language"],
+    }
+    if include_links:
+        parsed_page["links"] = score_internal_links(document["anchors"], base_url, config, input_row_id, company_name_or_id)
+    if document["canonical_href"]:
+        parsed_page["canonical_url"] = normalize_url(urljoin(base_url, document["canonical_href"]))
+    return parsed_page
+
+def _compile_substring_matcher(keywords: List[str]) -> Optional["re.Pattern[str]"]:
+    """
+    Compiles keywords into one alternation regex; `pattern.search(text)` is truthy iff any keyword
+    is a substring of `text`. Returns None for an empty keyword list.
+    """
+    if not keywords:
+        return None
+    # Longest first so the alternation never stops at a shorter keyword that prefixes a longer one.
+    return re.compile('|'.join(re.escape(kw) for kw in sorted(set(keywords), key=len, reverse=True)))
+
+class LinkScorer:
+    """
+    The link scoring rules of a ScraperConfig, compiled once and reused for every page.
+
+    Keyword lists become frozensets for the exact path segment tiers and single compiled regexes
+    for the substring tiers and the exclusion patterns, so scoring a link costs a few set lookups
+    and regex scans instead of nested loops over every keyword and segment.
+    Scores are identical to the tiered rules documented in `score_internal_links`.
+    """
+    def __init__(self, config: ScraperConfig):
+        target_keywords = list(config.target_link_keywords or [])
+        critical_keywords = list(config.scraper_critical_priority_keywords or [])
+        high_keywords = list(config.scraper_high_priority_keywords or [])
+
+        self.min_score_to_queue = config.scraper_min_score_to_queue
+        self.max_keyword_path_segments = config.scraper_max_keyword_path_segments
+        self._critical_keywords = frozenset(critical_keywords)
+        self._high_keywords = frozenset(high_keywords)
+        self._other_target_keywords = frozenset(target_keywords) - self._critical_keywords - self._high_keywords
+        self._target_matcher = _compile_substring_matcher(target_keywords)
+        self._exclude_matcher = _compile_substring_matcher([p for p in (config.scraper_exclude_link_path_patterns or []) if p])
+
+    @staticmethod
+    def fingerprint(config: ScraperConfig) -> Tuple[Any, ...]:
+        """Returns the config values the compiled rules depend on."""
+        return (
+            tuple(config.target_link_keywords or []),
+            tuple(config.scraper_critical_priority_keywords or []),
+            tuple(config.scraper_high_priority_keywords or []),
+            tuple(config.scraper_exclude_link_path_patterns or []),
+            config.scraper_min_score_to_queue,
+            config.scraper_max_keyword_path_segments,
+        )
+
+    def score_path(self, path: str, link_text: str) -> int:
+        """
+        Scores a link by its normalized URL path and its lower-cased, stripped link text.
+        """
         score = 0
-        path_segments = [seg for seg in parsed_normalized_link.path.lower().strip('/').split('/') if seg]
+        path_segments = [seg for seg in path.lower().strip('/').split('/') if seg]
         num_segments = len(path_segments)
+        excess_segments = num_segments - self.max_keyword_path_segments
 
         # Tier 1: Critical Keywords (Score: 100)
-        if config.scraper_critical_priority_keywords and any(kw in path_segments for kw in config.scraper_critical_priority_keywords):
+        if self._critical_keywords and not self._critical_keywords.isdisjoint(path_segments):
             score = 100
-            if num_segments > config.scraper_max_keyword_path_segments:
-                score -= min(20, (num_segments - config.scraper_max_keyword_path_segments) * 5)
-        
+            if excess_segments > 0:
+                score -= min(20, excess_segments * 5)
+
         # Tier 2: High-Priority Keywords (Score: 90)
-        if score < 90 and config.scraper_high_priority_keywords and any(kw in path_segments for kw in config.scraper_high_priority_keywords):
+        if score < 90 and self._high_keywords and not self._high_keywords.isdisjoint(path_segments):
             score = 90
-            if num_segments > config.scraper_max_keyword_path_segments:
-                score -= min(20, (num_segments - config.scraper_max_keyword_path_segments) * 5)
+            if excess_segments > 0:
+                score -= min(20, excess_segments * 5)
 
         # Tier 3: Other Target Keywords as exact path segments (Score: 70)
-        if score < 70:
-            all_target_kws = set(config.target_link_keywords or [])
-            priority_kws = set(config.scraper_critical_priority_keywords or []) | set(config.scraper_high_priority_keywords or [])
-            other_target_kws = all_target_kws - priority_kws
-            if other_target_kws and any(kw in path_segments for kw in other_target_kws):
-                score = 70
-                if num_segments > config.scraper_max_keyword_path_segments:
-                    score -= min(10, (num_segments - config.scraper_max_keyword_path_segments) * 3)
-
-        # Tier 4: Any target keyword as a substring in a path segment (Score: 50)
-        if score < 50 and config.target_link_keywords:
-            if any(tk in seg for tk in config.target_link_keywords for seg in path_segments):
+        if score < 70 and self._other_target_keywords and not self._other_target_keywords.isdisjoint(path_segments):
+            score = 70
+            if excess_segments > 0:
+                score -= min(10, excess_segments * 3)
+
+        if self._target_matcher is not None:
+            # Tier 4: Any target keyword as a substring in a path segment (Score: 50)
+            # Segments are joined with a character no keyword contains, so matches cannot span segments.
+            if score < 50 and path_segments and self._target_matcher.search('\x00'.join(path_segments)):
                 score = max(score, 50)
-        
-        # Tier 5: Any target keyword in the link's visible text (Score: 40)
-        if score < 40 and config.target_link_keywords:
-            if any(tk in link_text for tk in config.target_link_keywords):
+
+            # Tier 5: Any target keyword in the link's visible text (Score: 40)
+            if score < 40 and self._target_matcher.search(link_text):
                 score = max(score, 40)
 
-        if score >= config.scraper_min_score_to_queue:
-            log_text_snippet = link_text[:50].replace('\n', ' ')
-            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{normalized_link_url}' scored: {score} (Text: '{log_text_snippet}...', Path: '{parsed_normalized_link.path}') - Adding to potential queue.")
-            scored_links.append((normalized_link_url, score))
-        else:
-            log_text_snippet = link_text[:50].replace('\n', ' ')
-            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{normalized_link_url}' (score {score}) below min_score_to_queue ({config.scraper_min_score_to_queue}). Path: '{parsed_normalized_link.path}', Text: '{log_text_snippet}...'. Discarding.")
-            
-    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] From page {base_url}, found {len(scored_links)} internal links meeting score criteria.")
-    return scored_links
+        return score
+
+    def score_links(self, anchors: List[Tuple[str, str]], base_url: str, input_row_id: Any, company_name_or_id: str) -> List[Tuple[str, int]]:
+        """
+        Scores (href, link text) pairs found on a page and returns the internal links that meet
+        the minimum score, as (normalized URL, score) tuples in page order.
+        """
+        scored_links: List[Tuple[str, int]] = []
+        parsed_base_url = urlparse(normalize_url(base_url))
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        target_matcher = self._target_matcher
+        exclude_matcher = self._exclude_matcher
+
+        if target_matcher is None:
+            # Without target keywords no link passes the initial keyword match.
+            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] From page {base_url}, found 0 internal links meeting score criteria.")
+            return scored_links
+
+        for current_href, raw_link_text in anchors:
+            absolute_url_raw = urljoin(base_url, current_href)
+            normalized_link_url = normalize_url(absolute_url_raw)
+            parsed_normalized_link = urlparse(normalized_link_url)
+
+            if parsed_normalized_link.scheme not in ('http', 'https'): continue
+            if parsed_normalized_link.netloc != parsed_base_url.netloc: continue
+
+            link_text = raw_link_text.lower().strip()
+            if not (target_matcher.search(link_text) or target_matcher.search(normalized_link_url.lower())):
+                continue
+
+            if exclude_matcher is not None:
+                path_lower = parsed_normalized_link.path.lower()
+                if exclude_matcher.search(path_lower):
+                    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{normalized_link_url}' hard excluded by pattern in path: '{path_lower}'.")
+                    continue
+
+            score = self.score_path(parsed_normalized_link.path, link_text)
+
+            if score >= self.min_score_to_queue:
+                if debug_enabled:
+                    log_text_snippet = link_text[:50].replace('\n', ' ')
+                    logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{normalized_link_url}' scored: {score} (Text: '{log_text_snippet}...', Path: '{parsed_normalized_link.path}') - Adding to potential queue.")
+                scored_links.append((normalized_link_url, score))
+            elif debug_enabled:
+                log_text_snippet = link_text[:50].replace('\n', ' ')
+                logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{normalized_link_url}' (score {score}) below min_score_to_queue ({self.min_score_to_queue}). Path: '{parsed_normalized_link.path}', Text: '{log_text_snippet}...'. Discarding.")
+
+        logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] From page {base_url}, found {len(scored_links)} internal links meeting score criteria.")
+        return scored_links
+
+_link_scorers: Dict[Tuple[Any, ...], LinkScorer] = {}
+
+def get_link_scorer(config: ScraperConfig) -> LinkScorer:
+    """
+    Returns the compiled LinkScorer for a config. Scorers are cached by the relevant config
+    values, so a config edited at runtime (as tests do) gets a freshly compiled scorer.
+    """
+    key = LinkScorer.fingerprint(config)
+    scorer = _link_scorers.get(key)
+    if scorer is None:
+        if len(_link_scorers) >= 32:
+            _link_scorers.clear()
+        scorer = LinkScorer(config)
+        _link_scorers[key] = scorer
+    return scorer
+
+def score_internal_links(anchors: List[Tuple[str, str]], base_url: str, config: ScraperConfig, input_row_id: Any, company_name_or_id: str) -> List[Tuple[str, int]]:
+    """
+    Scores (href, link text) pairs found on a page and returns the internal links that meet
+    `scraper_min_score_to_queue`, as (normalized URL, score) tuples.
+
+    Only same-host http(s) links containing a target keyword in their text or URL are scored,
+    and links whose path matches an exclusion pattern are dropped. Scores, highest tier wins:
+      - 100: a critical keyword is a whole path segment
+      - 90:  a high-priority keyword is a whole path segment
+      - 70:  any other target keyword is a whole path segment
+      - 50:  a target keyword is a substring of a path segment
+      - 40:  a target keyword appears in the link text
+    Tiers 1-3 lose a few points for paths deeper than `scraper_max_keyword_path_segments`.
+    """
+    return get_link_scorer(config).score_links(anchors, base_url, input_row_id, company_name_or_id)
 
 def _classify_page_type(url_str: str, config: ScraperConfig) -> str:
     """Classifies a URL based on keywords in its path."""
@@ -222,76 +394,39 @@ async def validate_link_status(url: str, http_client: httpx.AsyncClient) -> bool
     except Exception as e:
         logger.error(f"An unexpected error occurred during link validation for {url}: {e}", exc_info=True)
         return False
-def process_input_url(
-    given_url_original: Optional[str],
-    app_config_url_probing_tlds: List[str],
-    row_identifier_for_log: str,
-) -> Tuple[Optional[str], str]:
+def _prepare_input_url(given_url_original: Optional[str], row_identifier_for_log: str) -> Optional[List[str]]:
     """
-    Processes an input URL by cleaning, performing TLD probing, and validating it.
-
-    The function attempts to normalize the URL by adding a scheme if missing,
-    removing spaces from the netloc, and quoting path/query/fragment.
-    If the domain appears to lack a TLD (and is not 'localhost' or an IP address),
-    it tries appending common TLDs from `app_config_url_probing_tlds` and
-    checks for DNS resolution.
-
-    Args:
-        given_url_original: The original URL string from the input data.
-        app_config_url_probing_tlds: A list of TLD strings (e.g., ["com", "org"])
-                                     to try if the input URL seems to lack a TLD.
-        row_identifier_for_log: A string identifier for logging, typically including
-                                row index and company name, to contextualize log messages.
-                                Example: "[RowID: 123, Company: ExampleCorp]"
-
-    Returns:
-        A tuple containing:
-            - The processed and validated URL string if successful, otherwise None.
-            - A status string: "Valid" if the URL is processed successfully,
-              or "InvalidURL" if it's deemed invalid after processing.
+    Cleans an input URL for `process_input_url`: adds a missing scheme, removes spaces from
+    the netloc and quotes path/query/fragment. Returns the components as
+    [scheme, netloc, path, params, query, fragment], or None if the input is missing or empty.
     """
-    processed_url: Optional[str] = given_url_original
-    status: str = "Valid"
-
     if not given_url_original or not isinstance(given_url_original, str):
         logger.warning(
             f"{row_identifier_for_log} Input URL is missing or not a string: '{given_url_original}'"
         )
-        return None, "InvalidURL"
+        return None
 
     temp_url_stripped: str = given_url_original.strip()
     if not temp_url_stripped:
         logger.warning(
             f"{row_identifier_for_log} Input URL is empty after stripping: '{given_url_original}'"
         )
-        return None, "InvalidURL"
+        return None
 
     parsed_obj: ParseResult = urlparse(temp_url_stripped)
-    current_scheme: str = parsed_obj.scheme
-    current_netloc: str = parsed_obj.netloc
-    current_path: str = parsed_obj.path
-    current_params: str = parsed_obj.params
-    current_query: str = parsed_obj.query
-    current_fragment: str = parsed_obj.fragment
 
     # Ensure a scheme is present
-    if not current_scheme:
+    if not parsed_obj.scheme:
         logger.info(
             f"{row_identifier_for_log} URL '{temp_url_stripped}' is schemeless. "
             f"Adding 'http://' and re-parsing."
         )
-        temp_for_reparse_schemeless: str = "http://" + temp_url_stripped
-        parsed_obj_schemed: ParseResult = urlparse(temp_for_reparse_schemeless)
-        current_scheme = parsed_obj_schemed.scheme
-        current_netloc = parsed_obj_schemed.netloc
-        current_path = parsed_obj_schemed.path
-        current_params = parsed_obj_schemed.params
-        current_query = parsed_obj_schemed.query
-        current_fragment = parsed_obj_schemed.fragment
+        parsed_obj = urlparse("http://" + temp_url_stripped)
         logger.debug(
-            f"{row_identifier_for_log} After adding scheme: Netloc='{current_netloc}', Path='{current_path}'"
+            f"{row_identifier_for_log} After adding scheme: Netloc='{parsed_obj.netloc}', Path='{parsed_obj.path}'"
         )
 
+    current_netloc: str = parsed_obj.netloc
     # Clean netloc (domain part)
     if " " in current_netloc:
         logger.info(
@@ -300,62 +435,40 @@ def process_input_url(
         current_netloc = current_netloc.replace(" ", "")
 
     # Safely quote URL components
-    current_path = quote(current_path, safe='/%')
-    current_query = quote(current_query, safe='=&amp;/?+%')  # Allow common query characters
-    current_fragment = quote(current_fragment, safe='/?#%')  # Allow common fragment characters
-
-    # TLD Probing Logic for domains that seem to lack a TLD
-    # (e.g., "example" instead of "example.com")
-    # Skips if it's 'localhost', an IP address, or already has a TLD-like pattern.
-    if current_netloc and \
-       not re.search(r'\.[a-zA-Z]{2,}$', current_netloc) and \
-       not current_netloc.endswith('.'):
-        is_ip_address = re.match(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", current_netloc)
-        if current_netloc.lower() != 'localhost' and not is_ip_address:
-            logger.info(
-                f"{row_identifier_for_log} Domain '{current_netloc}' appears to lack a TLD. "
-                f"Attempting TLD probing with {app_config_url_probing_tlds}..."
-            )
-            successfully_probed_tld: bool = False
-            probed_netloc_base: str = current_netloc
-            
-            for tld_to_try in app_config_url_probing_tlds:
-                candidate_domain_to_probe: str = f"{probed_netloc_base}.{tld_to_try}"
-                logger.debug(f"{row_identifier_for_log} Probing: Trying '{candidate_domain_to_probe}'")
-                try:
-                    socket.gethostbyname(candidate_domain_to_probe) # Attempt DNS resolution
-                    current_netloc = candidate_domain_to_probe
-                    logger.info(
-                        f"{row_identifier_for_log} TLD probe successful. "
-                        f"Using '{current_netloc}' after trying '.{tld_to_try}'."
-                    )
-                    successfully_probed_tld = True
-                    break  # Stop probing on first success
-                except socket.gaierror:
-                    logger.debug(
-                        f"{row_identifier_for_log} TLD probe DNS lookup failed for '{candidate_domain_to_probe}'."
-                    )
-                except Exception as sock_e: # Catch other potential socket errors
-                    logger.warning(
-                        f"{row_identifier_for_log} TLD probe for '{candidate_domain_to_probe}' "
-                        f"failed with unexpected socket error: {sock_e}"
-                    )
-            
-            if not successfully_probed_tld:
-                logger.warning(
-                    f"{row_identifier_for_log} TLD probing failed for base domain '{probed_netloc_base}'. "
-                    f"Proceeding with original/schemed netloc: '{current_netloc}'."
-                )
+    return [
+        parsed_obj.scheme,
+        current_netloc,
+        quote(parsed_obj.path, safe='/%'),
+        parsed_obj.params,
+        quote(parsed_obj.query, safe='=&amp;/?+%'),  # Allow common query characters
+        quote(parsed_obj.fragment, safe='/?#%'),  # Allow common fragment characters
+    ]
+
+def _needs_tld_probing(netloc: str) -> bool:
+    """
+    True if a domain seems to lack a TLD (e.g., "example" instead of "example.com").
+    'localhost', IP addresses and domains with a TLD-like ending are never probed.
+    """
+    if not netloc or re.search(r'\.[a-zA-Z]{2,}$', netloc) or netloc.endswith('.'):
+        return False
+    is_ip_address = re.match(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", netloc)
+    return netloc.lower() != 'localhost' and not is_ip_address
+
+def _finish_processed_url(url_components: List[str], given_url_original: str, row_identifier_for_log: str) -> Tuple[Optional[str], str]:
+    """
+    Rebuilds the URL from its processed components and validates it.
+    """
+    current_scheme, current_netloc, current_path, current_params, current_query, current_fragment = url_components
 
     # Ensure path is at least '/' if netloc is present, otherwise empty
     effective_path: str = current_path if current_path else ('/' if current_netloc else '')
-    
+
     # Reconstruct the URL from processed components
     processed_url = urlparse('')._replace(
         scheme=current_scheme, netloc=current_netloc, path=effective_path,
         params=current_params, query=current_query, fragment=current_fragment
     ).geturl()
-    
+
     if processed_url != given_url_original:
         logger.info(
             f"{row_identifier_for_log} URL processed: Original='{given_url_original}', "
@@ -373,7 +486,209 @@ def process_input_url(
             f"{row_identifier_for_log} Final URL is invalid: '{processed_url}' "
             f"(Original input was: '{given_url_original}')"
         )
-        status = "InvalidURL"
-        return None, status
+        return None, "InvalidURL"
+
+    return processed_url, "Valid"
+
+def process_input_url(
+    given_url_original: Optional[str],
+    app_config_url_probing_tlds: List[str],
+    row_identifier_for_log: str,
+) -> Tuple[Optional[str], str]:
+    """
+    Processes an input URL by cleaning, performing TLD probing, and validating it.
+
+    The function attempts to normalize the URL by adding a scheme if missing,
+    removing spaces from the netloc, and quoting path/query/fragment.
+    If the domain appears to lack a TLD (and is not 'localhost' or an IP address),
+    it tries appending common TLDs from `app_config_url_probing_tlds` and
+    checks for DNS resolution.
+
+    DNS lookups here block the calling thread; async code should use
+    `process_input_url_async` instead.
+
+    Args:
+        given_url_original: The original URL string from the input data.
+        app_config_url_probing_tlds: A list of TLD strings (e.g., ["com", "org"])
+                                     to try if the input URL seems to lack a TLD.
+        row_identifier_for_log: A string identifier for logging, typically including
+                                row index and company name, to contextualize log messages.
+                                Example: "[RowID: 123, Company: ExampleCorp]"
+
+    Returns:
+        A tuple containing:
+            - The processed and validated URL string if successful, otherwise None.
+            - A status string: "Valid" if the URL is processed successfully,
+              or "InvalidURL" if it's deemed invalid after processing.
+    """
+    url_components = _prepare_input_url(given_url_original, row_identifier_for_log)
+    if url_components is None:
+        return None, "InvalidURL"
+
+    current_netloc = url_components[1]
+    if _needs_tld_probing(current_netloc):
+        logger.info(
+            f"{row_identifier_for_log} Domain '{current_netloc}' appears to lack a TLD. "
+            f"Attempting TLD probing with {app_config_url_probing_tlds}..."
+        )
+        successfully_probed_tld: bool = False
+        probed_netloc_base: str = current_netloc
+
+        for tld_to_try in app_config_url_probing_tlds:
+            candidate_domain_to_probe: str = f"{probed_netloc_base}.{tld_to_try}"
+            logger.debug(f"{row_identifier_for_log} Probing: Trying '{candidate_domain_to_probe}'")
+            try:
+                socket.gethostbyname(candidate_domain_to_probe) # Attempt DNS resolution
+                current_netloc = candidate_domain_to_probe
+                logger.info(
+                    f"{row_identifier_for_log} TLD probe successful. "
+                    f"Using '{current_netloc}' after trying '.{tld_to_try}'."
+                )
+                successfully_probed_tld = True
+                break  # Stop probing on first success
+            except socket.gaierror:
+                logger.debug(
+                    f"{row_identifier_for_log} TLD probe DNS lookup failed for '{candidate_domain_to_probe}'."
+                )
+            except Exception as sock_e: # Catch other potential socket errors
+                logger.warning(
+                    f"{row_identifier_for_log} TLD probe for '{candidate_domain_to_probe}' "
+                    f"failed with unexpected socket error: {sock_e}"
+                )
+
+        if not successfully_probed_tld:
+            logger.warning(
+                f"{row_identifier_for_log} TLD probing failed for base domain '{probed_netloc_base}'. "
+                f"Proceeding with original/schemed netloc: '{current_netloc}'."
+            )
+        url_components[1] = current_netloc
+
+    return _finish_processed_url(url_components, given_url_original, row_identifier_for_log)
+
+# Probe outcomes per (base domain, TLD list): the resolved domain, or None if no candidate resolved,
+# with the monotonic time it expires at. They live as long as the DNS cache keeps the lookups they
+# came from; outcomes that depended on a timed-out lookup are not cached at all.
+_tld_probe_cache: Dict[Tuple[str, Tuple[str, ...]], Tuple[Optional[str], float]] = {}
+_tld_probes_in_flight: Dict[Tuple[str, Tuple[str, ...]], "asyncio.Future[Tuple[Optional[str], bool]]"] = {}
+_TLD_PROBE_CACHE_MAX_ENTRIES = 10000
+
+async def _resolve_host(hostname: str) -> None:
+    """
+    Resolves a hostname through the shared DNS cache; raises socket.gaierror if it does not resolve.
+    """
+    await resolve_host(hostname)
+
+async def _probe_tld_candidates(
+    probed_netloc_base: str,
+    probing_tlds: Tuple[str, ...],
+    dns_timeout_seconds: float,
+    row_identifier_for_log: str,
+) -> Tuple[Optional[str], bool]:
+    """
+    Resolves all `<base>.<tld>` candidates concurrently and returns the first one, in the
+    configured TLD order, that resolves. Remaining lookups are cancelled once the winner is known.
+    Also returns whether the outcome is conclusive: False if a candidate ahead of the winner (or
+    any candidate, if none resolved) timed out or failed transiently rather than not existing.
+    """
+    conclusive = True
+    candidates = [f"{probed_netloc_base}.{tld_to_try}" for tld_to_try in probing_tlds]
+    lookups = [
+        asyncio.ensure_future(asyncio.wait_for(_resolve_host(candidate), timeout=dns_timeout_seconds))
+        for candidate in candidates
+    ]
+    try:
+        # Awaiting in priority order keeps the old sequential semantics: a lower-priority TLD
+        # that resolves faster never wins over a higher-priority one that also resolves.
+        for candidate_domain_to_probe, lookup in zip(candidates, lookups):
+            try:
+                await lookup
+                return candidate_domain_to_probe, conclusive
+            except socket.gaierror as dns_e:
+                if not host_not_found(dns_e):
+                    conclusive = False
+                logger.debug(
+                    f"{row_identifier_for_log} TLD probe DNS lookup failed for '{candidate_domain_to_probe}': {dns_e}"
+                )
+            except asyncio.TimeoutError:
+                conclusive = False
+                logger.debug(
+                    f"{row_identifier_for_log} TLD probe DNS lookup timed out for '{candidate_domain_to_probe}'."
+                )
+            except Exception as sock_e: # Catch other potential socket errors
+                conclusive = False
+                logger.warning(
+                    f"{row_identifier_for_log} TLD probe for '{candidate_domain_to_probe}' "
+                    f"failed with unexpected socket error: {sock_e}"
+                )
+        return None, conclusive
+    finally:
+        for lookup in lookups:
+            if not lookup.done():
+                lookup.cancel()
+        # Retrieve outcomes of lookups that finished but were never awaited, so asyncio does not log them.
+        await asyncio.gather(*lookups, return_exceptions=True)
+
+async def process_input_url_async(
+    given_url_original: Optional[str],
+    app_config_url_probing_tlds: List[str],
+    row_identifier_for_log: str,
+    dns_timeout_seconds: float = 5.0,
+) -> Tuple[Optional[str], str]:
+    """
+    Async variant of `process_input_url` with identical results, for use inside the event loop.
+
+    TLD candidates are resolved in parallel via the shared DNS cache instead of one blocking
+    `socket.gethostbyname` call after another; the first success in the configured TLD order wins.
+    Outcomes are cached per base domain for the DNS cache's TTL (its negative TTL if no TLD
+    resolved), except those a lookup timeout may have changed, and concurrent calls for the same
+    base domain share one probe.
+    """
+    url_components = _prepare_input_url(given_url_original, row_identifier_for_log)
+    if url_components is None:
+        return None, "InvalidURL"
+
+    current_netloc = url_components[1]
+    if _needs_tld_probing(current_netloc):
+        probing_tlds = tuple(app_config_url_probing_tlds)
+        cache_key = (current_netloc.lower(), probing_tlds)
+        cached = _tld_probe_cache.get(cache_key)
+        if cached is not None and cached[1] <= time.monotonic():
+            del _tld_probe_cache[cache_key]
+            cached = None
+        if cached is not None:
+            probed_netloc = cached[0]
+            logger.debug(f"{row_identifier_for_log} TLD probe result for '{current_netloc}' taken from cache: '{probed_netloc}'.")
+        else:
+            logger.info(
+                f"{row_identifier_for_log} Domain '{current_netloc}' appears to lack a TLD. "
+                f"Attempting TLD probing with {app_config_url_probing_tlds}..."
+            )
+            probe = _tld_probes_in_flight.get(cache_key)
+            if probe is None:
+                probe = asyncio.ensure_future(
+                    _probe_tld_candidates(current_netloc, probing_tlds, dns_timeout_seconds, row_identifier_for_log)
+                )
+                _tld_probes_in_flight[cache_key] = probe
+                try:
+                    probed_netloc, conclusive = await asyncio.shield(probe)
+                    if conclusive:
+                        dns_cache = get_dns_cache()
+                        ttl_seconds = dns_cache.ttl_seconds if probed_netloc else dns_cache.negative_ttl_seconds
+                        if len(_tld_probe_cache) >= _TLD_PROBE_CACHE_MAX_ENTRIES:
+                            _tld_probe_cache.clear()
+                        _tld_probe_cache[cache_key] = (probed_netloc, time.monotonic() + ttl_seconds)
+                finally:
+                    _tld_probes_in_flight.pop(cache_key, None)
+            else:
+                probed_netloc, _ = await asyncio.shield(probe)
+
+        if probed_netloc:
+            logger.info(f"{row_identifier_for_log} TLD probe successful. Using '{probed_netloc}'.")
+            url_components[1] = probed_netloc
+        else:
+            logger.warning(
+                f"{row_identifier_for_log} TLD probing failed for base domain '{current_netloc}'. "
+                f"Proceeding with original/schemed netloc: '{current_netloc}'."
+            )
 
-    return processed_url, status
\ No newline at end of file
+    return _finish_processed_url(url_components, given_url_original, row_identifier_for_log)
@@ -0,0 +1,135 @@
+"""
+Throughput benchmark for link scoring on link-heavy pages (mega-menus, HTML sitemaps).
+
+Compares the compiled LinkScorer used by `utils.score_internal_links` with the previous
+per-anchor implementation that rebuilt keyword sets and scanned every keyword per link.
+
+Usage (from the repository root):
+    python benchmarks/bench_link_scoring.py [--links 5000] [--repeat 5]
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from base_scraper.src.config import ScraperConfig
+from base_scraper.src.utils import normalize_url, score_internal_links, get_link_scorer
+
+PATH_WORDS = ["about", "company", "team", "products", "services", "solutions", "kontakt", "impressum",
+              "news", "blog", "careers", "industries", "automotive", "widgets", "history", "locations",
+              "ueber-uns", "leistungen", "media", "downloads", "faq", "support", "partner", "events"]
+TEXT_WORDS = ["Our", "team", "Products", "About", "Contact", "Read more", "Services", "Careers", "Home",
+              "Solutions", "Impressum", "Downloads", "Support", "Menu", "Partner", "Company history"]
+
+
+def build_anchors(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    anchors = []
+    for i in range(count):
+        depth = rng.randint(1, 6)
+        path = "/".join(rng.choice(PATH_WORDS) for _ in range(depth))
+        if i % 17 == 0:
+            href = f"https://partner-{i}.example.org/{path}"
+        elif i % 5 == 0:
+            href = f"https://www.example.com/{path}/?id={i}&fallback=1"
+        else:
+            href = f"/{path}/page-{i % 250}"
+        text = " ".join(rng.choice(TEXT_WORDS) for _ in range(rng.randint(1, 3)))
+        anchors.append((href, text))
+    return anchors
+
+
+def legacy_score_path(path, link_text, config):
+    """The tier rules as they were before LinkScorer, kept here for comparison only."""
+    score = 0
+    path_segments = [seg for seg in path.lower().strip('/').split('/') if seg]
+    num_segments = len(path_segments)
+    if any(kw in path_segments for kw in config.scraper_critical_priority_keywords):
+        score = 100
+        if num_segments > config.scraper_max_keyword_path_segments:
+            score -= min(20, (num_segments - config.scraper_max_keyword_path_segments) * 5)
+    if score < 90 and any(kw in path_segments for kw in config.scraper_high_priority_keywords):
+        score = 90
+        if num_segments > config.scraper_max_keyword_path_segments:
+            score -= min(20, (num_segments - config.scraper_max_keyword_path_segments) * 5)
+    if score < 70:
+        all_target_kws = set(config.target_link_keywords)
+        priority_kws = set(config.scraper_critical_priority_keywords) | set(config.scraper_high_priority_keywords)
+        other_target_kws = all_target_kws - priority_kws
+        if other_target_kws and any(kw in path_segments for kw in other_target_kws):
+            score = 70
+            if num_segments > config.scraper_max_keyword_path_segments:
+                score -= min(10, (num_segments - config.scraper_max_keyword_path_segments) * 3)
+    if score < 50 and any(tk in seg for tk in config.target_link_keywords for seg in path_segments):
+        score = max(score, 50)
+    if score < 40 and any(tk in link_text for tk in config.target_link_keywords):
+        score = max(score, 40)
+    return score
+
+
+def legacy_score_internal_links(anchors, base_url, config):
+    """The scoring loop as it was before LinkScorer, kept here for comparison only."""
+    scored_links = []
+    parsed_base_url = urlparse(normalize_url(base_url))
+    for current_href, raw_link_text in anchors:
+        normalized_link_url = normalize_url(urljoin(base_url, current_href))
+        parsed_normalized_link = urlparse(normalized_link_url)
+        if parsed_normalized_link.scheme not in ['http', 'https']: continue
+        if parsed_normalized_link.netloc != parsed_base_url.netloc: continue
+        link_text = raw_link_text.lower().strip()
+        link_href_lower = normalized_link_url.lower()
+        if not (any(kw in link_text for kw in config.target_link_keywords) or
+                any(kw in link_href_lower for kw in config.target_link_keywords)):
+            continue
+        path_lower = parsed_normalized_link.path.lower()
+        if any(p and p in path_lower for p in config.scraper_exclude_link_path_patterns): continue
+        score = legacy_score_path(parsed_normalized_link.path, link_text, config)
+        if score >= config.scraper_min_score_to_queue:
+            scored_links.append((normalized_link_url, score))
+    return scored_links
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=5000, help="Anchors per synthetic page.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation; the best is reported.")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    config = ScraperConfig()
+    base_url = "https://www.example.com/"
+    anchors = build_anchors(args.links)
+
+    scorer = get_link_scorer(config)
+    tier_inputs = [(urlparse(normalize_url(urljoin(base_url, href))).path, text.lower().strip()) for href, text in anchors]
+    legacy_tier_seconds, legacy_scores = best_of(args.repeat, lambda: [legacy_score_path(path, text, config) for path, text in tier_inputs])
+    compiled_tier_seconds, compiled_scores = best_of(args.repeat, lambda: [scorer.score_path(path, text) for path, text in tier_inputs])
+    assert compiled_scores == legacy_scores, "LinkScorer tier scores differ from the legacy implementation"
+
+    legacy_seconds, legacy_links = best_of(args.repeat, lambda: legacy_score_internal_links(anchors, base_url, config))
+    compiled_seconds, compiled_links = best_of(args.repeat, lambda: score_internal_links(anchors, base_url, config, "bench", "bench"))
+    assert compiled_links == legacy_links, "LinkScorer output differs from the legacy implementation"
+
+    print(f"anchors per page: {len(anchors)}, links queued: {len(compiled_links)}")
+    for label, legacy, compiled in (("keyword tiers only", legacy_tier_seconds, compiled_tier_seconds),
+                                    ("full link scoring ", legacy_seconds, compiled_seconds)):
+        print(f"{label}: legacy {len(anchors) / legacy:10.0f} links/s, "
+              f"LinkScorer {len(anchors) / compiled:10.0f} links/s ({legacy / compiled:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark for `utils.normalize_url` on a crawl-like URL stream.
+
+A site's navigation links repeat on every page, so the stream mixes a few hundred recurring
+URLs with page-specific ones. Compares the previous implementation, the new normalisation
+path without the cache (`normalize_url.__wrapped__`) and the memoised `normalize_url`.
+
+Usage (from the repository root):
+    python benchmarks/bench_normalize_url.py [--pages 200] [--links-per-page 400] [--repeat 5]
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urldefrag, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from base_scraper.src.utils import normalize_url
+
+NAV_PATHS = ["about", "ueber-uns", "company/team", "products", "products/widgets", "services", "kontakt",
+             "impressum", "news", "careers", "index.html", "de/index.php", "blog/", "locations/europe/"]
+
+
+def legacy_normalize_url(url):
+    """normalize_url as it was before memoisation, kept here for comparison only."""
+    url_no_frag, _ = urldefrag(url)
+    parsed = urlparse(url_no_frag)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    path = parsed.path
+    common_indexes = ['index.html', 'index.htm', 'index.php', 'default.html', 'default.htm', 'index.asp', 'default.asp']
+    for index_file in common_indexes:
+        if path.endswith(f'/{index_file}'):
+            path = path[:-len(index_file)]
+            break
+    if netloc and path and not path.startswith('/'):
+        path = '/' + path
+    if path != '/' and path.endswith('/'):
+        path = path[:-1]
+    if not path and netloc:
+        path = '/'
+    query = ''
+    if parsed.query:
+        params = parsed.query.split('&')
+        ignored_params = {'fallback'}
+        filtered_params = [p for p in params if (p.split('=')[0].lower() if '=' in p else p.lower()) not in ignored_params]
+        if filtered_params:
+            query = '&'.join(sorted(filtered_params))
+    return urlparse('')._replace(scheme=scheme, netloc=netloc, path=path, params=parsed.params, query=query, fragment='').geturl()
+
+
+def build_url_stream(pages: int, links_per_page: int, seed: int = 11):
+    rng = random.Random(seed)
+    nav_urls = [f"https://www.Example.com/{path}" for path in NAV_PATHS]
+    nav_urls += [f"https://www.example.com/{path}#main" for path in NAV_PATHS]
+    nav_urls += [f"https://www.example.com/products/item-{i}/?ref=nav&fallback=1" for i in range(200)]
+    stream = []
+    for page in range(pages):
+        for link in range(links_per_page):
+            if rng.random() < 0.85:
+                stream.append(rng.choice(nav_urls))
+            else:
+                stream.append(f"https://www.example.com/news/{page}/article-{link}?page={page}&b=1")
+    return stream
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="Pages in the simulated crawl.")
+    parser.add_argument("--links-per-page", type=int, default=400, help="Anchors per page.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation; the best is reported.")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    stream = build_url_stream(args.pages, args.links_per_page)
+    uncached_normalize_url = normalize_url.__wrapped__
+
+    def run_cached():
+        # Starts cold each run, as a fresh process would.
+        normalize_url.cache_clear()
+        return [normalize_url(url) for url in stream]
+
+    legacy_seconds, legacy_urls = best_of(args.repeat, lambda: [legacy_normalize_url(url) for url in stream])
+    uncached_seconds, uncached_urls = best_of(args.repeat, lambda: [uncached_normalize_url(url) for url in stream])
+    cached_seconds, cached_urls = best_of(args.repeat, run_cached)
+    assert legacy_urls == uncached_urls == cached_urls, "normalize_url output differs from the legacy implementation"
+
+    print(f"URLs: {len(stream)} ({len(set(stream))} distinct), cache: {normalize_url.cache_info()}")
+    for label, seconds in (("legacy          ", legacy_seconds), ("new, no cache   ", uncached_seconds), ("new, memoised   ", cached_seconds)):
+        print(f"{label}: {len(stream) / seconds:12.0f} URLs/s ({legacy_seconds / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Simulation of the proxy rotation strategies of `ProxyManager` on a pool of uneven proxies.
+
+Each simulated proxy has a hidden latency and failure rate. Every request selects a proxy,
+draws its outcome and reports it back, as the crawl does. Reports the mean latency, the
+success rate and the selections per second of each strategy.
+
+Usage (from the repository root):
+    python benchmarks/bench_proxy_selection.py [--proxies 200] [--requests 20000]
+"""
+import argparse
+import copy
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from base_scraper.src.config import ScraperConfig
+from base_scraper.src.proxy_manager import ProxyManager
+
+STRATEGIES = ("random", "sequential", "power_of_two", "weighted")
+
+
+def build_pool(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    pool = {}
+    for i in range(size):
+        # Most proxies are fine, some are slow and a few are flaky.
+        latency = rng.lognormvariate(-0.5, 0.6)
+        failure_rate = 0.3 if rng.random() < 0.1 else 0.02
+        pool[f"http://proxy{i}:8080"] = (latency, failure_rate)
+    return pool
+
+
+def simulate(config: ScraperConfig, pool, requests: int, seed: int = 3):
+    rng = random.Random(seed)
+    manager = ProxyManager(config)
+    clock = [0.0]
+    latencies, failures = [], 0
+    # Simulated time, so cooldowns expire during the run.
+    with patch("base_scraper.src.proxy_manager.time.time", lambda: clock[0]):
+        started = time.perf_counter()
+        for _ in range(requests):
+            clock[0] += 0.05
+            proxy = manager.get_proxy()
+            if proxy is None:
+                failures += 1
+                continue
+            latency, failure_rate = pool[proxy]
+            if rng.random() < failure_rate:
+                failures += 1
+                manager.report_failure(proxy)
+            else:
+                sample = latency * rng.uniform(0.8, 1.2)
+                latencies.append(sample)
+                manager.report_success(proxy, sample, 50_000)
+        elapsed = time.perf_counter() - started
+    return sum(latencies) / max(len(latencies), 1), 1 - failures / requests, requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--proxies", type=int, default=200, help="Proxies in the simulated pool.")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests to simulate per strategy.")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    pool = build_pool(args.proxies)
+    config = copy.copy(ScraperConfig())
+    config.proxy_list = list(pool)
+    config.proxy_health_check_enabled = True
+    config.proxy_cooldown_seconds = 30
+    config.proxy_max_cooldown_seconds = 600
+
+    print(f"Proxies: {args.proxies}, requests: {args.requests}")
+    for strategy in STRATEGIES:
+        config.proxy_rotation_strategy = strategy
+        mean_latency, success_rate, per_second = simulate(config, pool, args.requests)
+        print(f"{strategy:13}: mean latency {mean_latency * 1000:7.1f} ms, success {success_rate:6.1%}, {per_second:10.0f} selections/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
+import json
 import pytest
 import http.server
 import socketserver
 import threading
 import sys
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 
 # Add the project root to the Python path to allow importing from base_scraper
 project_root = Path(__file__).resolve().parent.parent
@@ -34,4 +36,77 @@ def test_server():
         server_thread.daemon = True
         server_thread.start()
         yield f"http://localhost:{PORT}"
-        httpd.shutdown()
\ No newline at end of file
+        httpd.shutdown()
+
+class Mock2CaptchaHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Local stand-in for the 2Captcha `in.php`/`res.php` API. A task is ready after
+    `server.ready_after_polls` polls and its token is `token-<sitekey>`. The site key
+    'unsolvable' fails with ERROR_CAPTCHA_UNSOLVABLE and the API key 'bad-key' is rejected.
+    """
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, request):
+        body = json.dumps({"status": status, "request": request}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode()).items()}
+        if urlsplit(self.path).path != "/in.php":
+            return self.send_error(404)
+        if form.get("key") == "bad-key":
+            return self._reply(0, "ERROR_WRONG_USER_KEY")
+        with server.lock:
+            task_id = str(len(server.submissions) + 1)
+            server.submissions.append(form)
+            server.polls[task_id] = 0
+            server.open_tasks += 1
+            server.max_open_tasks = max(server.max_open_tasks, server.open_tasks)
+        self._reply(1, task_id)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path != "/res.php" or params.get("id") not in server.polls:
+            return self._reply(0, "ERROR_WRONG_CAPTCHA_ID")
+        task_id = params["id"]
+        form = server.submissions[int(task_id) - 1]
+        sitekey = form.get("googlekey") or form.get("sitekey")
+        with server.lock:
+            server.polls[task_id] += 1
+            ready = server.polls[task_id] >= server.ready_after_polls
+            if server.polls[task_id] == server.ready_after_polls:
+                server.open_tasks -= 1
+        if not ready:
+            return self._reply(0, "CAPCHA_NOT_READY")
+        if sitekey == "unsolvable":
+            return self._reply(0, "ERROR_CAPTCHA_UNSOLVABLE")
+        self._reply(1, f"token-{sitekey}")
+
+
+@pytest.fixture
+def mock_2captcha_server():
+    """
+    Starts the 2Captcha stand-in on a free port; yields the server (its base URL is `server.base_url`).
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Mock2CaptchaHandler)
+    server.lock = threading.Lock()
+    server.submissions = []
+    server.polls = {}
+    server.open_tasks = 0
+    server.max_open_tasks = 0
+    server.ready_after_polls = 2
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server_thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05})
+    server_thread.daemon = True
+    server_thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,100 @@
+import asyncio
+import copy
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from base_scraper.src import batch
+from base_scraper.src.batch import scrape_many, iter_scrape_many
+from base_scraper.src.host_limiter import host_key
+
+
+@pytest.fixture
+def config(scraper_config):
+    batch_config = copy.copy(scraper_config)
+    batch_config.scraper_max_concurrent_companies = 3
+    batch_config.scraper_max_concurrent_per_host = 1
+    return batch_config
+
+
+@pytest.fixture
+def running_hosts(mocker):
+    """
+    Replaces scrape_website with a fake that records how many companies run per host.
+    """
+    state = {"running": {}, "max_total": 0, "max_per_host": 0}
+
+    async def fake_scrape_website(given_url, config, output_dir_for_run, company_name_or_id, input_row_id="N/A", browser_pool=None, http_client=None):
+        host = host_key(given_url)
+        state["running"][host] = state["running"].get(host, 0) + 1
+        state["max_total"] = max(state["max_total"], sum(state["running"].values()))
+        state["max_per_host"] = max(state["max_per_host"], state["running"][host])
+        await asyncio.sleep(0.01)
+        state["running"][host] -= 1
+        if given_url.endswith("broken.com"):
+            raise RuntimeError("boom")
+        return [{"url": given_url, "status": 200}]
+
+    mocker.patch.object(batch, 'scrape_website', side_effect=fake_scrape_website)
+    return state
+
+
+@pytest.mark.parametrize("given_url, expected", [
+    ("example.com", "example.com"),
+    ("https://www.Example.com/about?x=1", "example.com"),
+    ("http://example.com:8080/", "example.com:8080"),
+    (None, ""),
+])
+def test_host_key(given_url, expected):
+    assert host_key(given_url) == expected
+
+
+@pytest.mark.asyncio
+async def test_iter_scrape_many_limits_concurrency(config, running_hosts, tmp_path):
+    rows = [{"given_url": f"https://site{i % 4}.com", "company_name_or_id": f"company{i}", "input_row_id": i} for i in range(12)]
+    items = [item async for item in iter_scrape_many(rows, config, str(tmp_path), browser_pool=MagicMock(), http_client=MagicMock())]
+
+    assert sorted(item["input_row_id"] for item in items) == list(range(12))
+    assert running_hosts["max_total"] == 3
+    assert running_hosts["max_per_host"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rows_for_a_busy_host_do_not_hold_up_other_hosts(config, mocker, tmp_path):
+    finished = []
+
+    async def fake_scrape_website(given_url, *args, **kwargs):
+        await asyncio.sleep(0.05 if "slow.com" in given_url else 0.001)
+        finished.append(given_url)
+        return []
+
+    mocker.patch.object(batch, 'scrape_website', side_effect=fake_scrape_website)
+    rows = []
+    for i in range(4):
+        rows.append({"given_url": f"https://slow.com/{i}"})
+        rows.extend({"given_url": f"https://fast{i}-{j}.com"} for j in range(5))
+    items = [item async for item in iter_scrape_many(rows, config, str(tmp_path), browser_pool=MagicMock(), http_client=MagicMock())]
+
+    assert len(items) == len(rows)
+    # The slow host runs one row at a time, in input order, while the other hosts finish meanwhile.
+    assert [url for url in finished if "slow.com" in url] == [f"https://slow.com/{i}" for i in range(4)]
+    assert finished.index("https://slow.com/0") >= 18
+    assert finished[-3:] == ["https://slow.com/1", "https://slow.com/2", "https://slow.com/3"]
+
+
+@pytest.mark.asyncio
+async def test_scrape_many_writes_results_as_jsonl(config, running_hosts, tmp_path):
+    rows = [
+        {"given_url": "https://ok.com", "company_name_or_id": "ok"},
+        {"given_url": "https://broken.com", "company_name_or_id": "broken"},
+    ]
+    results_path = tmp_path / "results.jsonl"
+    items = await scrape_many(rows, config, str(tmp_path), str(results_path), browser_pool=MagicMock(), http_client=MagicMock())
+
+    written = [json.loads(line) for line in results_path.read_text(encoding='utf-8').splitlines()]
+    assert len(items) == len(written) == 2
+    by_company = {item["company_name_or_id"]: item for item in written}
+    assert by_company["ok"]["results"] == [{"url": "https://ok.com", "status": 200}]
+    assert by_company["ok"]["input_row_id"] == 0
+    assert by_company["broken"]["results"] == []
+    assert by_company["broken"]["error"] == "RuntimeError: boom"
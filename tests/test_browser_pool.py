@@ -0,0 +1,123 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from base_scraper.src.config import ScraperConfig
+from base_scraper.src.browser_pool import BrowserPool
+
+
+@pytest.fixture
+def config():
+    mock_config = ScraperConfig()
+    mock_config.browser_pool_size = 2
+    mock_config.browser_pool_max_contexts_per_browser = 2
+    mock_config.browser_pool_max_memory_mb = 0
+    return mock_config
+
+
+@pytest.fixture
+def launched_browsers(mocker):
+    """
+    Patches async_playwright so that every chromium.launch returns a new mock browser.
+    """
+    browsers = []
+
+    async def launch(**kwargs):
+        browser = MagicMock()
+        browser.launch_kwargs = kwargs
+        browser.is_connected.return_value = True
+        browser.close = AsyncMock()
+        browser.new_context = AsyncMock(side_effect=lambda **opts: AsyncMock())
+        browsers.append(browser)
+        return browser
+
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(side_effect=launch)
+    manager = MagicMock()
+    manager.start = AsyncMock(return_value=playwright)
+    manager.__aexit__ = AsyncMock()
+    mocker.patch('base_scraper.src.browser_pool.async_playwright', return_value=manager)
+    return browsers
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_launches_browsers_once(config, launched_browsers):
+    async with BrowserPool(config) as pool:
+        for _ in range(2):
+            async with pool.context(user_agent="test") as context:
+                assert context is not None
+    assert len(launched_browsers) == 2
+    for browser in launched_browsers:
+        browser.close.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_spreads_contexts(config, launched_browsers):
+    async with BrowserPool(config) as pool:
+        first = await pool.new_context()
+        second = await pool.new_context()
+        launched_browsers[0].new_context.assert_awaited_once()
+        launched_browsers[1].new_context.assert_awaited_once()
+        await pool.release_context(first)
+        await pool.release_context(second)
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_recycles_after_max_contexts(config, launched_browsers):
+    config.browser_pool_size = 1
+    async with BrowserPool(config) as pool:
+        for _ in range(2):
+            async with pool.context():
+                pass
+        # The first browser served its quota and was replaced by a fresh launch.
+        assert len(launched_browsers) == 2
+        launched_browsers[0].close.assert_awaited_once()
+        async with pool.context():
+            pass
+        launched_browsers[1].new_context.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_recycles_on_memory_ceiling(config, launched_browsers, mocker):
+    config.browser_pool_size = 1
+    config.browser_pool_max_contexts_per_browser = 0
+    config.browser_pool_max_memory_mb = 100
+    mocker.patch.object(BrowserPool, '_browser_rss_mb', AsyncMock(return_value=250.0))
+    async with BrowserPool(config) as pool:
+        async with pool.context():
+            pass
+        assert len(launched_browsers) == 2
+        launched_browsers[0].close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_passes_cached_dns_to_chromium(config, launched_browsers, mocker):
+    from base_scraper.src import dns_cache
+    cache = dns_cache.AsyncDNSCache()
+    cache._entries["example.com"] = dns_cache._DNSEntry(["93.184.216.34"], None, float("inf"))
+    cache._entries["dead.test"] = dns_cache._DNSEntry([], "not found", float("inf"))
+    mocker.patch.object(dns_cache, '_dns_cache', cache)
+    config.dns_cache_chromium_resolver_rules = True
+
+    async with BrowserPool(config, size=1):
+        pass
+    assert launched_browsers[0].launch_kwargs["args"] == ["--host-resolver-rules=MAP example.com 93.184.216.34"]
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_recycles_browsers_with_stale_resolver_rules(config, launched_browsers, mocker):
+    from base_scraper.src import dns_cache
+    cache = dns_cache.AsyncDNSCache(ttl_seconds=0.1)
+    cache._entries["example.com"] = dns_cache._DNSEntry(["93.184.216.34"], None, time.monotonic() + 0.08)
+    mocker.patch.object(dns_cache, '_dns_cache', cache)
+    config.dns_cache_chromium_resolver_rules = True
+
+    async with BrowserPool(config, size=1) as pool:
+        assert launched_browsers[0].launch_kwargs["args"] == ["--host-resolver-rules=MAP example.com 93.184.216.34"]
+        await asyncio.sleep(0.1)
+        async with pool.context():
+            pass
+        launched_browsers[0].close.assert_awaited_once()
+        assert len(launched_browsers) == 2
+        assert launched_browsers[1].launch_kwargs["args"] == []
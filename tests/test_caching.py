@@ -0,0 +1,197 @@
+import asyncio
+import copy
+import json
+import os
+import pytest
+from collections import Counter
+from unittest.mock import AsyncMock
+
+from base_scraper import cache as cache_command
+from base_scraper.src import caching, scraper
+from base_scraper.src.caching import ScrapeCache, generate_cache_key, load_from_cache, save_to_cache, cache_stats, prune_cache, compact_cache
+
+RESULTS = [{"url": "https://example.com/", "status": 200, "page_type": "homepage"}]
+
+
+def _entry_size(saved_at):
+    return len(json.dumps({"saved_at": saved_at, "results": RESULTS}, indent=4))
+
+
+def test_module_functions_round_trip(tmp_path):
+    key = generate_cache_key(" https://Example.com/ ")
+    assert key == generate_cache_key("https://example.com/")
+    assert load_from_cache(key, str(tmp_path)) is None
+    save_to_cache(key, RESULTS, str(tmp_path))
+    assert load_from_cache(key, str(tmp_path)) == RESULTS
+    save_to_cache("empty", [], str(tmp_path))
+    assert not (tmp_path / "empty.json").exists()
+
+
+def test_memory_tier_serves_repeated_lookups(tmp_path):
+    save_to_cache("a", RESULTS, str(tmp_path))
+    cache = ScrapeCache(str(tmp_path))
+
+    assert cache.get("a") == RESULTS
+    (tmp_path / "a.json").unlink()
+    first = cache.get("a")
+    assert first == RESULTS
+    first[0]["status"] = 500
+    assert cache.get("a") == RESULTS
+    assert cache.get("missing") is None
+    assert cache.stats() == {
+        "memory_hits": 2, "disk_hits": 1, "misses": 1, "stale_hits": 0, "evictions": 0, "disk_evictions": 0,
+        "entries": 1, "bytes": cache._entries["a"][1],
+    }
+
+
+def test_put_writes_through_and_evicts_least_recently_used(tmp_path, mocker):
+    mocker.patch('base_scraper.src.caching.time.time', return_value=1e9)
+    size = _entry_size(1e9)
+    cache = ScrapeCache(str(tmp_path), max_entries=2, max_bytes=10 * size)
+    for key in ("a", "b"):
+        cache.put(key, RESULTS)
+    cache.get("a")
+    cache.put("c", RESULTS)
+
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+    # Evicted entries are still read from disk.
+    assert cache.get("b") == RESULTS
+    assert cache.stats()["disk_hits"] == 1
+
+    by_bytes = ScrapeCache(str(tmp_path), max_entries=10, max_bytes=int(1.5 * size))
+    by_bytes.get("a")
+    by_bytes.get("b")
+    assert list(by_bytes._entries) == ["b"]
+    assert by_bytes.stats()["bytes"] == size
+
+
+def test_expired_entries_are_stale_and_legacy_files_use_their_mtime(tmp_path, mocker):
+    (tmp_path / "old.json").write_text(json.dumps(RESULTS))
+    os.utime(tmp_path / "old.json", (1000, 1000))
+    mocker.patch('base_scraper.src.caching.time.time', return_value=1000)
+    cache = ScrapeCache(str(tmp_path), ttl_seconds=60)
+    cache.put("new", RESULTS)
+    assert load_from_cache("old", str(tmp_path)) == RESULTS
+
+    mocker.patch('base_scraper.src.caching.time.time', return_value=1030)
+    assert cache.get("old") == RESULTS
+    mocker.patch('base_scraper.src.caching.time.time', return_value=1100)
+    assert cache.get("new") is None
+    assert cache.lookup("old") == (RESULTS, True)
+    assert cache.stats()["stale_hits"] == 2
+
+
+def test_writes_past_the_disk_cap_evict_least_recently_used_files(tmp_path, mocker):
+    mocker.patch('base_scraper.src.caching.time.time', return_value=1e9)
+    for i, key in enumerate(("a", "b", "c")):
+        save_to_cache(key, RESULTS, str(tmp_path))
+        os.utime(tmp_path / f"{key}.json", (1000 + i, 1000 + i))
+    cache = ScrapeCache(str(tmp_path), max_entries=1, max_disk_bytes=int(3.5 * _entry_size(1e9)))
+    # Reading a and b marks them as used, also once they have left the memory tier.
+    cache.get("a")
+    cache.get("b")
+
+    cache.put("d", RESULTS)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.json", "b.json", "d.json"]
+    assert cache.stats()["disk_evictions"] == 1
+
+
+def test_stat_prune_and_compact(tmp_path, mocker):
+    mocker.patch('base_scraper.src.caching.time.time', return_value=5000)
+    save_to_cache("fresh", RESULTS, str(tmp_path))
+    (tmp_path / "legacy.json").write_text(json.dumps(RESULTS, indent=4))
+    os.utime(tmp_path / "legacy.json", (1000, 1000))
+    (tmp_path / "broken.json").write_text("{not json")
+    (tmp_path / "fresh.json.123.tmp").write_text("partial")
+
+    stats = cache_stats(str(tmp_path), ttl_seconds=3600, now=5000)
+    assert (stats["entries"], stats["expired"], stats["legacy_entries"], stats["corrupt_entries"], stats["temp_files"]) == (3, 1, 1, 1, 1)
+    assert (stats["oldest_saved_at"], stats["newest_saved_at"]) == (1000, 5000)
+
+    compacted = compact_cache(str(tmp_path))
+    assert (compacted["rewritten"], compacted["removed_corrupt"], compacted["removed_temp_files"]) == (2, 1, 1)
+    assert compacted["bytes_after"] < compacted["bytes_before"]
+    assert json.loads((tmp_path / "legacy.json").read_text()) == {"saved_at": 1000, "results": RESULTS}
+    assert (tmp_path / "legacy.json").stat().st_mtime == 1000
+
+    pruned = prune_cache(str(tmp_path), ttl_seconds=3600, now=5000)
+    assert (pruned["removed_expired"], pruned["remaining_entries"], pruned["removed_keys"]) == (1, 1, {"legacy"})
+    assert load_from_cache("fresh", str(tmp_path)) == RESULTS
+
+
+def test_cache_command(tmp_path, capsys):
+    save_to_cache("a", RESULTS, str(tmp_path))
+    assert cache_command.main(["stat", "--cache-dir", str(tmp_path), "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["entries"] == 1
+    assert cache_command.main(["prune", "--cache-dir", str(tmp_path), "--max-bytes", "1"]) == 0
+    assert "1 least recently used entries; 0 entries" in capsys.readouterr().out
+    assert cache_command.main(["compact", "--cache-dir", str(tmp_path / "missing")]) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_results_are_served_while_refreshed(scraper_config, tmp_path, mocker):
+    config = copy.copy(scraper_config)
+    config.caching_enabled = True
+    config.cache_dir = str(tmp_path)
+    config.cache_ttl_seconds = 60
+    config.cache_stale_while_revalidate = True
+    mocker.patch.object(caching, '_scrape_cache', None)
+    save_to_cache(generate_cache_key("https://example.com"), RESULTS, str(tmp_path))
+    os.utime(tmp_path / f"{generate_cache_key('https://example.com')}.json")
+    mocker.patch('base_scraper.src.caching.time.time', return_value=4e9)
+
+    refreshed = asyncio.Event()
+
+    async def fake_scrape(given_url, *args):
+        await refreshed.wait()
+        return [{"url": given_url, "status": 200}]
+
+    scrape = mocker.patch('base_scraper.src.scraper._scrape_and_cache', AsyncMock(side_effect=fake_scrape))
+    first = await scraper.scrape_website("https://example.com", config, str(tmp_path), "test_company")
+    second = await scraper.scrape_website("https://example.com", config, str(tmp_path), "test_company")
+    assert first == second == RESULTS
+    assert list(scraper._revalidations) == [generate_cache_key("https://example.com")]
+
+    refreshed.set()
+    await scraper.wait_for_revalidations()
+    assert scrape.call_count == 1
+    assert not scraper._revalidations
+
+    config.cache_stale_while_revalidate = False
+    assert await scraper.scrape_website("https://example.com", config, str(tmp_path), "test_company") == [{"url": "https://example.com", "status": 200}]
+
+
+@pytest.mark.asyncio
+async def test_stale_refreshes_respect_the_company_and_host_limits(scraper_config, tmp_path, mocker):
+    config = copy.copy(scraper_config)
+    config.caching_enabled = True
+    config.cache_dir = str(tmp_path)
+    config.cache_ttl_seconds = 60
+    config.cache_stale_while_revalidate = True
+    config.scraper_max_concurrent_companies = 2
+    config.scraper_max_concurrent_per_host = 1
+    mocker.patch.object(caching, '_scrape_cache', None)
+    urls = [f"https://site{i % 3}.com/page{i}" for i in range(9)]
+    for url in urls:
+        save_to_cache(generate_cache_key(url), RESULTS, str(tmp_path))
+    mocker.patch('base_scraper.src.caching.time.time', return_value=4e9)
+
+    running, peaks = Counter(), {"total": 0, "per_host": 0}
+
+    async def fake_scrape(given_url, *args):
+        host = given_url.split("/")[2]
+        running[host] += 1
+        peaks["total"] = max(peaks["total"], sum(running.values()))
+        peaks["per_host"] = max(peaks["per_host"], running[host])
+        await asyncio.sleep(0.01)
+        running[host] -= 1
+        return [{"url": given_url, "status": 200}]
+
+    scrape = mocker.patch('base_scraper.src.scraper._scrape_and_cache', AsyncMock(side_effect=fake_scrape))
+    for url in urls:
+        assert await scraper.scrape_website(url, config, str(tmp_path), "test_company") == RESULTS
+    await scraper.wait_for_revalidations()
+
+    assert scrape.call_count == 9
+    assert peaks == {"total": 2, "per_host": 1}
@@ -0,0 +1,106 @@
+import asyncio
+import copy
+import pytest
+import httpx
+from unittest.mock import AsyncMock, MagicMock
+
+from base_scraper.src.captcha_queue import CaptchaSolveQueue
+from base_scraper.src.captcha_solver import TwoCaptchaSolver
+from base_scraper.src.http_client import close_shared_http_client
+
+
+@pytest.fixture
+def captcha_config(scraper_config, mock_2captcha_server):
+    config = copy.copy(scraper_config)
+    config.captcha_solver_enabled = True
+    config.captcha_api_key = "test-key"
+    config.captcha_api_base_url = mock_2captcha_server.base_url
+    config.captcha_poll_interval_seconds = 0.01
+    return config
+
+
+def _page(url="https://shop.example.com/login"):
+    page = MagicMock()
+    page.url = url
+    page.evaluate = AsyncMock(return_value=1)
+    return page
+
+
+@pytest.mark.asyncio
+async def test_solve_captcha_submits_polls_and_injects_token(captcha_config, mock_2captcha_server):
+    page = _page()
+    solver = TwoCaptchaSolver(page, captcha_config)
+
+    assert await solver.solve_captcha(page, {"kind": "recaptcha", "sitekey": "site-a", "source": "dom"})
+
+    assert mock_2captcha_server.submissions == [{"key": "test-key", "method": "userrecaptcha", "googlekey": "site-a", "pageurl": "https://shop.example.com/login", "json": "1"}]
+    assert page.evaluate.await_args.args[1] == {"kind": "recaptcha", "token": "token-site-a"}
+    assert not await solver.solve_captcha(page, {"kind": "cloudflare_challenge", "sitekey": None, "source": "dom"})
+    await close_shared_http_client()
+
+
+@pytest.mark.asyncio
+async def test_queue_bounds_in_flight_solves_and_shares_tokens(captcha_config, mock_2captcha_server):
+    http_client = httpx.AsyncClient()
+    solver = TwoCaptchaSolver(None, captcha_config)
+    queue = CaptchaSolveQueue(max_concurrent_solves=2, poll_interval_seconds=0.01)
+    challenges = [{"kind": "hcaptcha", "sitekey": f"site-{i}"} for i in range(5)]
+    # Three pages of one site hit the same challenge at once.
+    challenges += [{"kind": "hcaptcha", "sitekey": "site-0"}] * 2
+
+    tokens = await asyncio.gather(*(queue.solve(solver, http_client, challenge, "https://example.com/") for challenge in challenges))
+
+    assert tokens == [f"token-site-{i}" for i in range(5)] + ["token-site-0"] * 2
+    assert len(mock_2captcha_server.submissions) == 5
+    assert mock_2captcha_server.max_open_tasks == 2
+    assert await queue.solve(solver, http_client, challenges[1], "https://example.com/other") == "token-site-1"
+    assert (queue.submitted, queue.solved, queue.cache_hits) == (5, 5, 1)
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_queue_reports_provider_errors_and_timeouts(captcha_config, mock_2captcha_server):
+    http_client = httpx.AsyncClient()
+    solver = TwoCaptchaSolver(None, captcha_config)
+    queue = CaptchaSolveQueue(poll_interval_seconds=0.01, solve_timeout_seconds=0.5)
+    assert await queue.solve(solver, http_client, {"kind": "turnstile", "sitekey": "unsolvable"}, "https://example.com/") is None
+
+    mock_2captcha_server.ready_after_polls = 1000
+    assert await queue.solve(solver, http_client, {"kind": "turnstile", "sitekey": "slow"}, "https://example.com/") is None
+
+    captcha_config.captcha_api_key = "bad-key"
+    assert await queue.solve(TwoCaptchaSolver(None, captcha_config), http_client, {"kind": "turnstile", "sitekey": "x"}, "https://example.com/") is None
+    assert queue.failed == 3
+    assert queue.solved == 0
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_queue_counts_malformed_provider_responses_as_failures():
+    queue = CaptchaSolveQueue(poll_interval_seconds=0.01)
+    not_json = MagicMock(submit_challenge=AsyncMock(side_effect=ValueError("Expecting value: line 1 column 1 (char 0)")))
+    no_request_field = MagicMock(submit_challenge=AsyncMock(return_value="1"), get_result=AsyncMock(side_effect=KeyError("request")))
+
+    assert await queue.solve(not_json, MagicMock(), {"kind": "hcaptcha", "sitekey": "a"}, "https://example.com/") is None
+    assert await queue.solve(no_request_field, MagicMock(), {"kind": "hcaptcha", "sitekey": "b"}, "https://example.com/") is None
+    assert (queue.failed, queue.solved) == (2, 0)
+
+
+@pytest.mark.asyncio
+async def test_captcha_wait_overlaps_with_other_work(captcha_config, mock_2captcha_server):
+    http_client = httpx.AsyncClient()
+    mock_2captcha_server.ready_after_polls = 10
+    solver = TwoCaptchaSolver(None, captcha_config)
+    queue = CaptchaSolveQueue(poll_interval_seconds=0.02)
+    other_pages_done = []
+
+    async def other_page(i):
+        await asyncio.sleep(0.01)
+        other_pages_done.append(i)
+
+    solve = asyncio.create_task(queue.solve(solver, http_client, {"kind": "recaptcha", "sitekey": "site-a"}, "https://example.com/"))
+    await asyncio.gather(*(other_page(i) for i in range(5)))
+    assert not solve.done()
+    assert len(other_pages_done) == 5
+    assert await solve == "token-site-a"
+    await http_client.aclose()
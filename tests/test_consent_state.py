@@ -0,0 +1,78 @@
+import copy
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from base_scraper.src import consent_state
+from base_scraper.src.consent_state import ConsentStateStore, consent_host, filter_storage_state
+from base_scraper.src.page_handler import fetch_page_data
+
+STORAGE_STATE = {
+    "cookies": [
+        {"name": "consent", "value": "yes", "domain": ".example.com", "path": "/"},
+        {"name": "session", "value": "1", "domain": "shop.example.com", "path": "/"},
+        {"name": "_ga", "value": "x", "domain": ".tracker.net", "path": "/"},
+    ],
+    "origins": [
+        {"origin": "https://www.example.com", "localStorage": [{"name": "cmp", "value": "accepted"}]},
+        {"origin": "https://cdn.other.org", "localStorage": [{"name": "x", "value": "y"}]},
+    ],
+}
+
+
+def _context(storage_state=STORAGE_STATE):
+    context = MagicMock()
+    context.storage_state = AsyncMock(return_value=storage_state)
+    return context
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.Example.com/about", "example.com"),
+    ("http://shop.example.com:8080/", "shop.example.com"),
+    ("file:///tmp/index.html", None),
+])
+def test_consent_host(url, expected):
+    assert consent_host(url) == expected
+
+
+def test_filter_keeps_only_the_hosts_state():
+    filtered = filter_storage_state(STORAGE_STATE, "example.com")
+    assert [cookie["name"] for cookie in filtered["cookies"]] == ["consent", "session"]
+    assert [origin["origin"] for origin in filtered["origins"]] == ["https://www.example.com"]
+
+
+@pytest.mark.asyncio
+async def test_state_is_persisted_per_host(tmp_path):
+    store = ConsentStateStore(str(tmp_path))
+    assert store.load("https://example.com/") is None
+    assert await store.save(_context(), "https://www.example.com/impressum")
+
+    next_run = ConsentStateStore(str(tmp_path))
+    state = next_run.load("https://example.com/kontakt")
+    assert [cookie["name"] for cookie in state["cookies"]] == ["consent", "session"]
+    assert next_run.load("https://other.org/") is None
+    assert json.loads((tmp_path / "example.com.json").read_text())["host"] == "example.com"
+
+    assert ConsentStateStore(str(tmp_path), ttl_seconds=-1).load("https://example.com/") is None
+    assert not await store.save(_context({"cookies": [], "origins": []}), "https://empty.com/")
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_data_stores_state_after_consent_click(scraper_config, mocker):
+    config = copy.copy(scraper_config)
+    config.captcha_solver_enabled = False
+    config.scraper_networkidle_timeout_ms = 0
+    config.consent_state_enabled = True
+    store = ConsentStateStore()
+    mocker.patch.object(consent_state, '_consent_state_store', store)
+    mocker.patch('base_scraper.src.page_handler.InteractionHandler.handle_interactions', AsyncMock(return_value=("text", "Accept all")))
+
+    page = MagicMock()
+    page.url = "https://example.com/"
+    page.goto = AsyncMock(return_value=MagicMock(ok=True, status=200))
+    page.content = AsyncMock(return_value="<html></html>")
+    page.context = _context()
+
+    await fetch_page_data(page, "https://example.com/", config, "test_id", "test_company")
+
+    assert store.load("https://example.com/")["cookies"][0]["name"] == "consent"
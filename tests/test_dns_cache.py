@@ -0,0 +1,125 @@
+import asyncio
+import socket
+import pytest
+import httpx
+
+from base_scraper.src import dns_cache
+from base_scraper.src.dns_cache import AsyncDNSCache, cached_http_transport
+
+
+@pytest.fixture
+def fake_getaddrinfo(mocker):
+    """
+    Patches the running loop's getaddrinfo: hosts in `addresses` resolve, hosts in `errors` raise
+    the given error, hosts in `hanging` do not answer, and all others do not exist.
+    """
+    state = {"addresses": {"example.com": ["93.184.216.34", "2606:2800:220:1::"]}, "errors": {}, "hanging": set(), "calls": []}
+
+    async def getaddrinfo(host, port, *args, **kwargs):
+        state["calls"].append(host)
+        await asyncio.sleep(10 if host in state["hanging"] else 0.01)
+        if host in state["errors"]:
+            raise state["errors"][host]
+        if host not in state["addresses"]:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [
+            (socket.AF_INET6 if ':' in address else socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, 0))
+            for address in reversed(state["addresses"][host])
+        ]
+
+    mocker.patch('asyncio.base_events.BaseEventLoop.getaddrinfo', side_effect=getaddrinfo)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_resolve_caches_hits_and_shares_concurrent_lookups(fake_getaddrinfo):
+    cache = AsyncDNSCache()
+    results = await asyncio.gather(*(cache.resolve("Example.com.") for _ in range(5)))
+    assert results == [["93.184.216.34", "2606:2800:220:1::"]] * 5
+    assert await cache.resolve("example.com") == ["93.184.216.34", "2606:2800:220:1::"]
+    assert fake_getaddrinfo["calls"] == ["example.com"]
+    assert await cache.resolve("10.0.0.1") == ["10.0.0.1"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_caches_failures_until_negative_ttl_expires(fake_getaddrinfo):
+    cache = AsyncDNSCache(negative_ttl_seconds=0.05)
+    for _ in range(3):
+        with pytest.raises(socket.gaierror):
+            await cache.resolve("dead-domain.test")
+    assert fake_getaddrinfo["calls"] == ["dead-domain.test"]
+    # Failed lookups are left to Chromium, which would otherwise keep them for the browser's lifetime.
+    assert cache.chromium_host_resolver_rules() == ("", None)
+
+    await asyncio.sleep(0.06)
+    fake_getaddrinfo["addresses"]["dead-domain.test"] = ["10.1.2.3"]
+    assert await cache.resolve("dead-domain.test") == ["10.1.2.3"]
+    assert cache.chromium_host_resolver_rules() == ("MAP dead-domain.test 10.1.2.3", cache._entries["dead-domain.test"].expires_at)
+
+
+@pytest.mark.asyncio
+async def test_resolve_does_not_cache_timeouts_or_transient_errors(fake_getaddrinfo):
+    cache = AsyncDNSCache(lookup_timeout_seconds=0.05)
+    fake_getaddrinfo["hanging"].add("stalled.test")
+    fake_getaddrinfo["errors"]["flaky.test"] = socket.gaierror(socket.EAI_AGAIN, "Temporary failure in name resolution")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await cache.resolve("stalled.test")
+    with pytest.raises(socket.gaierror) as transient:
+        await cache.resolve("flaky.test")
+    assert not dns_cache.host_not_found(transient.value)
+    with pytest.raises(socket.gaierror) as missing:
+        await cache.resolve("missing.test")
+    assert dns_cache.host_not_found(missing.value)
+    assert cache.fresh_entries() == {"missing.test": []}
+
+    fake_getaddrinfo["hanging"].clear()
+    fake_getaddrinfo["errors"].clear()
+    fake_getaddrinfo["addresses"].update({"stalled.test": ["10.0.0.3"], "flaky.test": ["10.0.0.4"]})
+    assert await cache.resolve("stalled.test") == ["10.0.0.3"]
+    assert await cache.resolve("flaky.test") == ["10.0.0.4"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_evicts_least_recently_used(fake_getaddrinfo):
+    fake_getaddrinfo["addresses"].update({"a.test": ["10.0.0.1"], "b.test": ["10.0.0.2"]})
+    cache = AsyncDNSCache(max_entries=2)
+    await cache.resolve("a.test")
+    await cache.resolve("b.test")
+    await cache.resolve("a.test")
+    await cache.resolve("example.com")
+    assert set(cache.fresh_entries()) == {"a.test", "example.com"}
+
+
+@pytest.mark.asyncio
+async def test_cached_transport_connects_to_resolved_address(scraper_config, mocker):
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    cache = AsyncDNSCache()
+    cache._entries["scraper-test.invalid"] = dns_cache._DNSEntry(["127.0.0.1"], None, float("inf"))
+    mocker.patch.object(dns_cache, '_dns_cache', cache)
+
+    async with server, httpx.AsyncClient(transport=cached_http_transport(scraper_config)) as client:
+        response = await client.get(f"http://scraper-test.invalid:{port}/")
+    assert response.text == "ok"
+    assert cache.hits == 1
+
+    with pytest.raises(httpx.ConnectError):
+        cache._entries["dead.invalid"] = dns_cache._DNSEntry([], "not found", float("inf"))
+        async with httpx.AsyncClient(transport=cached_http_transport(scraper_config)) as client:
+            await client.get("http://dead.invalid/")
+
+
+def test_cached_transport_is_skipped_when_environment_proxies_are_set(scraper_config, monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    assert isinstance(cached_http_transport(scraper_config), dns_cache.CachedDNSTransport)
+
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.test:3128")
+    assert cached_http_transport(scraper_config) is None
@@ -0,0 +1,73 @@
+import copy
+import difflib
+import pytest
+from pathlib import Path
+
+from base_scraper.src.html_parsers import get_html_parser, HtmlParserBackend
+from base_scraper.src.utils import parse_page
+
+TESTS_DIR = Path(__file__).parent
+CORPUS_PAGES = sorted((TESTS_DIR / "parser_corpus").glob("*.html")) + sorted((TESTS_DIR / "test_site").glob("*.html"))
+
+
+def _backend_or_skip(name):
+    pytest.importorskip(name)
+    parser = get_html_parser(name)
+    assert parser.name == name
+    return parser
+
+
+def _config_for(scraper_config, backend_name):
+    config = copy.copy(scraper_config)
+    config.html_parser = backend_name
+    return config
+
+
+@pytest.mark.parametrize("backend_name", ["lxml", "selectolax"])
+@pytest.mark.parametrize("page_path", CORPUS_PAGES, ids=lambda p: p.name)
+def test_backend_link_scores_match_reference(backend_name, page_path, scraper_config):
+    _backend_or_skip(backend_name)
+    html = page_path.read_text(encoding='utf-8')
+    base_url = "https://www.example-industries.com/"
+
+    reference = parse_page(html, base_url, _config_for(scraper_config, "html.parser"))
+    candidate = parse_page(html, base_url, _config_for(scraper_config, backend_name))
+
+    assert candidate["links"] == reference["links"]
+
+
+@pytest.mark.parametrize("backend_name", ["lxml", "selectolax"])
+@pytest.mark.parametrize("page_path", CORPUS_PAGES, ids=lambda p: p.name)
+def test_backend_text_matches_reference(backend_name, page_path, scraper_config):
+    _backend_or_skip(backend_name)
+    html = page_path.read_text(encoding='utf-8')
+    base_url = "https://www.example-industries.com/"
+
+    reference = parse_page(html, base_url, _config_for(scraper_config, "html.parser"))
+    candidate = parse_page(html, base_url, _config_for(scraper_config, backend_name))
+
+    ratio = difflib.SequenceMatcher(None, reference["text"].split(), candidate["text"].split()).ratio()
+    assert ratio >= 0.95, f"{backend_name} text diverges on {page_path.name}: {candidate['text']!r}"
+    assert candidate["title"] == reference["title"]
+    assert candidate["meta_description"] == reference["meta_description"]
+    assert candidate["canonical_url"] == reference["canonical_url"]
+    assert candidate["language"] == reference["language"]
+
+
+@pytest.mark.parametrize("backend_name", ["html.parser", "lxml", "selectolax"])
+def test_backend_excludes_scripts_styles_and_comments(backend_name):
+    if backend_name != "html.parser":
+        _backend_or_skip(backend_name)
+    html = "<html><head><style>p {}</style></head><body><!-- note --><p>Hello <b>World</b></p><script>var x;</script>tail</body></html>"
+    assert get_html_parser(backend_name).extract_text(html) == "Hello World tail"
+
+
+def test_backend_handles_empty_document():
+    for backend_name in ("html.parser", "lxml", "selectolax"):
+        parser = get_html_parser(backend_name)
+        assert parser.extract_text("") == ""
+        assert parser.collect_anchors("") == []
+
+
+def test_unknown_backend_falls_back_to_html_parser():
+    assert isinstance(get_html_parser("does-not-exist"), HtmlParserBackend)
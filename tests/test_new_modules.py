@@ -1,12 +1,14 @@
+import gc
 import pytest
 import time
+import weakref
 from unittest.mock import AsyncMock, MagicMock
-from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 
 from base_scraper.src.config import ScraperConfig
 from base_scraper.src.proxy_manager import ProxyManager
-from base_scraper.src.interaction_handler import InteractionHandler
-from base_scraper.src.captcha_solver import get_captcha_solver, TwoCaptchaSolver
+from base_scraper.src.interaction_handler import InteractionHandler, clear_interaction_memo
+from base_scraper.src.captcha_solver import get_captcha_solver, TwoCaptchaSolver, get_captcha_detection_stats, reset_captcha_detection_stats
 
 @pytest.fixture
 def config():
@@ -70,6 +72,7 @@ def test_proxy_manager_failure_and_cooldown(config, mocker):
 # --- InteractionHandler and CaptchaSolver Tests ---
 @pytest.mark.asyncio
 async def test_interaction_handler(config):
+    config.interaction_handler_fast_scan = False
     mock_page = AsyncMock()
 
     # --- Mock for selector ---
@@ -112,6 +115,79 @@ async def test_interaction_handler(config):
     assert selector_locator.click.call_count == 1
     assert text_locator.click.call_count == 1
 
+def _scanning_page(url, matches):
+    """A page whose in-page scan returns `matches` one after another, then nothing."""
+    page = MagicMock()
+    page.url = url
+    page.evaluate = AsyncMock(side_effect=lambda *a: {"match": matches.pop(0) if matches else None, "unsupported": []})
+    page.locator.return_value.first.click = AsyncMock()
+    page.wait_for_timeout = AsyncMock()
+    return page
+
+@pytest.mark.asyncio
+async def test_interaction_handler_fast_scan_remembers_hosts(config):
+    clear_interaction_memo()
+    page = _scanning_page("https://shop.example.com/", [{"kind": "text", "query": "Accept All"}])
+    await InteractionHandler(page, config).handle_interactions()
+    assert page.evaluate.await_count == 2
+    page.locator.assert_called_with("[data-scraper-interaction]")
+    assert page.locator.return_value.first.click.await_count == 1
+    assert page.evaluate.await_args.args[1]["selectors"] == ["#cookie-accept"]
+
+    # Later pages of the host only look for the element that worked.
+    page = _scanning_page("https://shop.example.com/contact", [])
+    await InteractionHandler(page, config).handle_interactions()
+    assert page.evaluate.await_args.args[1] == {"selectors": [], "texts": ["Accept All"], "marker": "data-scraper-interaction"}
+
+    # A page without an overlay does not stop the host from being scanned...
+    page = _scanning_page("https://late.example.org/", [])
+    await InteractionHandler(page, config).handle_interactions()
+    page = _scanning_page("https://late.example.org/about", [{"kind": "selector", "query": "#cookie-accept"}])
+    assert await InteractionHandler(page, config).handle_interactions() == ("selector", "#cookie-accept")
+
+    # ...but several pages in a row without one do.
+    for path in ("", "about", "team"):
+        await InteractionHandler(_scanning_page(f"https://plain.example.org/{path}", []), config).handle_interactions()
+    page = _scanning_page("https://plain.example.org/contact", [{"kind": "selector", "query": "#cookie-accept"}])
+    await InteractionHandler(page, config).handle_interactions()
+    page.evaluate.assert_not_awaited()
+    clear_interaction_memo()
+
+@pytest.mark.asyncio
+async def test_interaction_memo_expires(config, mocker):
+    clear_interaction_memo()
+    config.interaction_memo_ttl_seconds = 60
+    mock_time = mocker.patch('base_scraper.src.interaction_handler.time.time', return_value=1000)
+    for path in ("", "about", "team"):
+        await InteractionHandler(_scanning_page(f"https://plain.example.org/{path}", []), config).handle_interactions()
+
+    mock_time.return_value = 1059
+    page = _scanning_page("https://plain.example.org/contact", [])
+    await InteractionHandler(page, config).handle_interactions()
+    page.evaluate.assert_not_awaited()
+
+    mock_time.return_value = 1061
+    page = _scanning_page("https://plain.example.org/contact", [{"kind": "selector", "query": "#cookie-accept"}])
+    assert await InteractionHandler(page, config).handle_interactions() == ("selector", "#cookie-accept")
+    clear_interaction_memo()
+
+@pytest.mark.asyncio
+async def test_interaction_handler_fast_scan_falls_back_to_locators(config):
+    clear_interaction_memo()
+    page = _scanning_page("https://example.com/", [])
+    page.evaluate = AsyncMock(return_value={"match": None, "unsupported": ["text=Got it"]})
+    page.locator.return_value.first.is_visible = AsyncMock(return_value=False)
+    await InteractionHandler(page, config).handle_interactions()
+    page.locator.assert_called_once_with("text=Got it")
+
+    page = _scanning_page("https://other.example.com/", [])
+    page.evaluate = AsyncMock(side_effect=PlaywrightError("Execution context was destroyed"))
+    page.locator.return_value.first.is_visible = AsyncMock(return_value=False)
+    await InteractionHandler(page, config).handle_interactions()
+    page.locator.assert_any_call("#cookie-accept")
+    page.locator.assert_any_call("*:visible:text-is('Accept All')")
+    clear_interaction_memo()
+
 @pytest.mark.asyncio
 async def test_captcha_solver_factory(config):
     mock_page = AsyncMock()
@@ -122,32 +198,58 @@ async def test_captcha_solver_factory(config):
     solver = get_captcha_solver(mock_page, config)
     assert solver is None
 
+@pytest.mark.asyncio
+async def test_captcha_solver_is_reused_per_context(config):
+    context, other_context = MagicMock(), MagicMock()
+    pages = [MagicMock(context=context), MagicMock(context=context), MagicMock(context=other_context)]
+    solvers = [get_captcha_solver(page, config) for page in pages]
+    assert solvers[0] is solvers[1]
+    assert solvers[2] is not solvers[0]
+
+@pytest.mark.asyncio
+async def test_captcha_solver_does_not_keep_its_context_alive(config):
+    class Context:
+        pass
+    context = Context()
+    page = MagicMock(context=context)
+    # A real context holds its pages, which hold the context.
+    context.pages = [page]
+    solver = weakref.ref(get_captcha_solver(page, config))
+    closed = weakref.ref(context)
+    del context, page
+    gc.collect()
+    assert closed() is None
+    assert solver() is None
+
 @pytest.mark.asyncio
 async def test_captcha_detector(config):
-    mock_page = AsyncMock()
+    reset_captcha_detection_stats()
+    mock_page = MagicMock()
+    mock_page.evaluate = AsyncMock()
+    solver = TwoCaptchaSolver(mock_page, config)
 
-    # The final locator object that has the async `wait_for` method.
-    final_locator = MagicMock()
-    final_locator.wait_for = AsyncMock()
+    # Test case 1: Captcha detected by the DOM query
+    mock_page.evaluate.return_value = {"kind": "hcaptcha", "sitekey": "abc", "source": "dom"}
+    assert await solver.detect_captcha() is True
+    assert (await solver.detect_challenge())["sitekey"] == "abc"
 
-    # The intermediate locator returned by `frame_locator.locator()`
-    intermediate_locator = MagicMock()
-    intermediate_locator.locator.return_value = final_locator
+    # Test case 2: Captcha not detected
+    mock_page.evaluate.return_value = None
+    assert await solver.detect_captcha() is False
 
-    # Replace `frame_locator` on the page mock with a sync mock
-    mock_page.frame_locator = MagicMock(return_value=intermediate_locator)
+    # Test case 3: Challenge announced by a response header, without querying the page
+    mock_page.evaluate.reset_mock()
+    assert await solver.detect_captcha(mock_page, {"CF-Mitigated": "challenge"}) is True
+    mock_page.evaluate.assert_not_awaited()
 
-    solver = TwoCaptchaSolver(mock_page, config)
+    # Test case 4: The page navigated away during the query
+    mock_page.evaluate.side_effect = PlaywrightError("Execution context was destroyed")
+    assert await solver.detect_captcha() is False
 
-    # Test case 1: Captcha detected
-    final_locator.wait_for.side_effect = None
-    detected = await solver.detect_captcha()
-    assert detected is True
+    stats = get_captcha_detection_stats()
+    assert (stats["checks"], stats["detections"]) == (5, 3)
+    assert stats["max_ms"] >= stats["avg_ms"] >= 0
 
-    # Test case 2: Captcha not detected (timeout)
-    final_locator.wait_for.side_effect = PlaywrightTimeoutError("Timeout")
-    detected = await solver.detect_captcha()
-    assert detected is False
 # --- Integration Tests ---
 @pytest.mark.asyncio
 async def test_full_integration_with_interaction_handler(config):
@@ -1,7 +1,11 @@
+import copy
 import pytest
+import httpx
+from unittest.mock import AsyncMock, MagicMock
 from playwright.async_api import async_playwright
 
-from base_scraper.src.page_handler import fetch_page_content
+from base_scraper.src.page_handler import fetch_page_content, fetch_page_data, fetch_page_http, fetch_page_hybrid
+from base_scraper.src.resource_blocker import ResourceBlocker
 
 @pytest.mark.asyncio
 async def test_fetch_page_content_success(scraper_config, test_server):
@@ -65,4 +69,184 @@ async def test_fetch_page_content_dns_error(scraper_config):
         await browser.close()
 
         assert status == -2  # DNS error code
-        assert content is None
\ No newline at end of file
+        assert content is None
+
+@pytest.mark.asyncio
+async def test_fetch_page_data_extracts_in_browser(scraper_config):
+    """
+    Tests that in-browser extraction returns the page script's result instead of the HTML.
+    """
+    config = copy.copy(scraper_config)
+    config.interaction_handler_enabled = False
+    config.captcha_solver_enabled = False
+    config.scraper_networkidle_timeout_ms = 0
+    extraction = {"text": "Hello", "anchors": [["/about", "About"]], "title": "T", "meta_description": None, "canonical_href": None, "language": None}
+
+    response = MagicMock(ok=True, status=200)
+    page = MagicMock()
+    page.url = "http://example.com/"
+    page.goto = AsyncMock(return_value=response)
+    page.evaluate = AsyncMock(return_value=extraction)
+    page.content = AsyncMock()
+
+    page_data, status = await fetch_page_data(page, "http://example.com/", config, "test_id", "test_company", extract_in_browser=True)
+
+    assert status == 200
+    assert page_data == {"url": "http://example.com/", "html": None, "extraction": extraction, "wait_ms": 0, "proxy_latency_ms": 0}
+    page.content.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_proxy_latency_covers_only_the_navigation(scraper_config, mocker):
+    config = copy.copy(scraper_config)
+    config.captcha_solver_enabled = False
+    config.scraper_networkidle_timeout_ms = 0
+    clock = mocker.patch('base_scraper.src.page_handler.time')
+    clock.monotonic.return_value = 100.0
+
+    async def goto(*args, **kwargs):
+        clock.monotonic.return_value += 0.3
+        return MagicMock(ok=True, status=200)
+
+    async def slow_interactions(self):
+        clock.monotonic.return_value += 5.0
+        return None
+
+    mocker.patch('base_scraper.src.page_handler.InteractionHandler.handle_interactions', slow_interactions)
+    page = MagicMock()
+    page.url = "http://example.com/"
+    page.goto = AsyncMock(side_effect=goto)
+    page.content = AsyncMock(return_value="<html></html>")
+
+    page_data, status = await fetch_page_data(page, "http://example.com/", config, "test_id", "test_company")
+    assert status == 200
+    assert page_data["proxy_latency_ms"] == 300
+
+SERVER_RENDERED_PAGE = "<html><head><title>Impressum</title></head><body><p>" + "ACME GmbH, Musterstrasse 1. " * 30 + '</p><a href="/kontakt">Kontakt</a></body></html>'
+
+@pytest.fixture
+def http_first_config(scraper_config):
+    config = copy.copy(scraper_config)
+    config.scraper_fetch_mode = 'http_first'
+    return config
+
+def _http_client(pages):
+    def handler(request):
+        status, body = pages[request.url.path]
+        return httpx.Response(status, text=body, headers={"content-type": "text/html; charset=utf-8"})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+@pytest.mark.asyncio
+async def test_fetch_page_hybrid_serves_sufficient_pages_over_http(http_first_config):
+    client = _http_client({"/impressum": (200, SERVER_RENDERED_PAGE)})
+    get_page = AsyncMock()
+
+    page_data, status = await fetch_page_hybrid(get_page, "http://example.com/impressum", http_first_config, "test_id", "test_company", http_client=client)
+
+    assert status == 200
+    assert page_data["fetch_method"] == "http"
+    assert page_data["url"] == "http://example.com/impressum"
+    assert page_data["extraction"]["title"] == "Impressum"
+    assert page_data["extraction"]["anchors"] == [("/kontakt", "Kontakt")]
+    get_page.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_fetch_page_hybrid_sends_the_browser_contexts_user_agent(http_first_config):
+    sent_user_agents = []
+    def handler(request):
+        sent_user_agents.append(request.headers["user-agent"])
+        return httpx.Response(200, text=SERVER_RENDERED_PAGE, headers={"content-type": "text/html; charset=utf-8"})
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await fetch_page_hybrid(AsyncMock(), "http://example.com/impressum", http_first_config, "test_id", "test_company", http_client=client, user_agent="ContextAgent/1.0")
+    await fetch_page_hybrid(AsyncMock(), "http://example.com/impressum", http_first_config, "test_id", "test_company", http_client=client)
+
+    assert sent_user_agents == ["ContextAgent/1.0", http_first_config.user_agent]
+
+@pytest.mark.asyncio
+async def test_fetch_page_http_stops_reading_oversized_responses(http_first_config):
+    config = copy.copy(http_first_config)
+    config.http_fetch_max_bytes = 10000
+    chunks_read = []
+
+    async def endless_body():
+        for i in range(100):
+            chunks_read.append(i)
+            yield b"<p>" + b"x" * 1000 + b"</p>"
+
+    def handler(request):
+        headers = {"content-type": "text/html; charset=utf-8"}
+        if request.url.path == "/announced":
+            return httpx.Response(200, headers={**headers, "content-length": "20000"}, content=endless_body())
+        return httpx.Response(200, headers=headers, content=endless_body())
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    assert await fetch_page_http("http://example.com/announced", config, client, "test_id", "test_company") == (None, 200)
+    assert chunks_read == []
+    assert await fetch_page_http("http://example.com/chunked", config, client, "test_id", "test_company") == (None, 200)
+    assert len(chunks_read) == 10
+
+@pytest.mark.asyncio
+async def test_fetch_page_http_decodes_the_declared_charset(http_first_config):
+    def handler(request):
+        body = SERVER_RENDERED_PAGE.replace("ACME", "Müller").encode("iso-8859-1")
+        return httpx.Response(200, headers={"content-type": "text/html; charset=iso-8859-1"}, content=body)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    page_data, status = await fetch_page_http("http://example.com/impressum", http_first_config, client, "test_id", "test_company")
+    assert status == 200
+    assert "Müller GmbH" in page_data["html"]
+
+@pytest.mark.parametrize("path, status, body", [
+    ("/app", 200, '<html><body><div id="root"></div><noscript>Please enable JavaScript</noscript></body></html>'),
+    ("/short", 200, "<html><body><p>Loading...</p></body></html>"),
+    ("/captcha", 200, SERVER_RENDERED_PAGE.replace("</body>", '<div class="g-recaptcha"></div></body>')),
+    ("/blocked", 403, SERVER_RENDERED_PAGE),
+])
+@pytest.mark.asyncio
+async def test_fetch_page_hybrid_falls_back_to_browser(http_first_config, mocker, path, status, body):
+    client = _http_client({path: (status, body)})
+    page = MagicMock()
+    get_page = AsyncMock(return_value=page)
+    browser_fetch = mocker.patch('base_scraper.src.page_handler.fetch_page_data', AsyncMock(return_value=({"url": "http://example.com" + path, "html": "<html></html>", "extraction": None}, 200)))
+
+    page_data, fetch_status = await fetch_page_hybrid(get_page, "http://example.com" + path, http_first_config, "test_id", "test_company", http_client=client)
+
+    assert fetch_status == 200
+    assert page_data["fetch_method"] == "browser"
+    browser_fetch.assert_awaited_once_with(page, "http://example.com" + path, http_first_config, "test_id", "test_company", extract_in_browser=False)
+
+@pytest.mark.asyncio
+async def test_fetch_page_hybrid_browser_mode_skips_http(scraper_config, mocker):
+    client = MagicMock()
+    client.get = AsyncMock()
+    mocker.patch('base_scraper.src.page_handler.fetch_page_data', AsyncMock(return_value=(None, -1)))
+
+    page_data, status = await fetch_page_hybrid(AsyncMock(), "http://example.com/", scraper_config, "test_id", "test_company", http_client=client)
+
+    assert (page_data, status) == (None, -1)
+    client.get.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_fetch_page_hybrid_counts_blocked_requests_of_the_current_url_only(scraper_config, mocker):
+    page = MagicMock()
+    blocker = ResourceBlocker(scraper_config)
+    # Left over from the previous URL rendered in this tab and never collected.
+    await blocker._handle_route(AsyncMock(), _blocked_request(page))
+
+    async def render(page, *args, **kwargs):
+        await blocker._handle_route(AsyncMock(), _blocked_request(page))
+        return {"url": "http://example.com/", "html": "<html></html>", "extraction": None}, 200
+    mocker.patch('base_scraper.src.page_handler.fetch_page_data', render)
+
+    page_data, status = await fetch_page_hybrid(AsyncMock(return_value=page), "http://example.com/", scraper_config, "test_id", "test_company", resource_blocker=blocker)
+
+    assert status == 200
+    assert page_data["blocked_requests"] == 1
+
+def _blocked_request(page):
+    request = MagicMock()
+    request.url = "http://example.com/logo.png"
+    request.resource_type = "image"
+    request.frame.page = page
+    request.is_navigation_request.return_value = False
+    return request
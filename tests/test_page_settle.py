@@ -0,0 +1,83 @@
+import copy
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
+
+from base_scraper.src import page_settle
+from base_scraper.src.page_settle import SettleTimeTracker, wait_for_page_settle
+
+
+@pytest.fixture
+def tracker(mocker):
+    tracker = SettleTimeTracker(alpha=0.5)
+    mocker.patch.object(page_settle, '_settle_tracker', tracker)
+    return tracker
+
+
+@pytest.fixture
+def settle_config(scraper_config):
+    config = copy.copy(scraper_config)
+    config.scraper_wait_strategy = 'content_stable'
+    config.scraper_networkidle_timeout_ms = 3000
+    return config
+
+
+def _page(url="https://example.com/about", evaluate_result=None):
+    page = MagicMock()
+    page.url = url
+    page.evaluate = AsyncMock(return_value=evaluate_result)
+    page.wait_for_load_state = AsyncMock()
+    return page
+
+
+def test_tracker_averages_and_evicts_hosts():
+    tracker = SettleTimeTracker(alpha=0.5, max_hosts=2)
+    tracker.record("a.com", 1000)
+    tracker.record("a.com", 2000)
+    assert tracker.typical_settle_ms("a.com") == 1500
+    tracker.record("b.com", 100)
+    tracker.typical_settle_ms("a.com")
+    tracker.record("c.com", 100)
+    assert tracker.typical_settle_ms("b.com") is None
+    assert tracker.typical_settle_ms("a.com") == 1500
+
+
+@pytest.mark.asyncio
+async def test_content_stable_wait_learns_per_host(settle_config, tracker):
+    page = _page(evaluate_result={"settled": True, "waited_ms": 900, "settled_at_ms": 400, "text_length": 5000})
+
+    assert await wait_for_page_settle(page, settle_config) == {"strategy": "content_stable", "wait_ms": 900, "settled": True}
+    assert page.evaluate.await_args.args[1]["minWaitMs"] == 0
+    assert tracker.typical_settle_ms("example.com") == 400
+
+    page.evaluate.return_value = {"settled": False, "waited_ms": 3000, "settled_at_ms": 2950, "text_length": 5200}
+    result = await wait_for_page_settle(page, settle_config)
+    assert result == {"strategy": "content_stable", "wait_ms": 3000, "settled": False}
+    assert page.evaluate.await_args.args[1]["minWaitMs"] == 200
+    assert tracker.typical_settle_ms("example.com") == 1700
+
+    await wait_for_page_settle(page, settle_config)
+    assert page.evaluate.await_args.args[1]["minWaitMs"] == 850
+
+
+@pytest.mark.asyncio
+async def test_content_stable_wait_survives_navigation(settle_config, tracker):
+    page = _page()
+    page.evaluate.side_effect = PlaywrightError("Execution context was destroyed, most likely because of a navigation")
+    result = await wait_for_page_settle(page, settle_config)
+    assert result["settled"] is False
+    assert tracker.typical_settle_ms("example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_networkidle_strategy_and_disabled_wait(settle_config, tracker):
+    settle_config.scraper_wait_strategy = 'networkidle'
+    page = _page()
+    page.wait_for_load_state.side_effect = PlaywrightTimeoutError("Timeout 3000ms exceeded.")
+    result = await wait_for_page_settle(page, settle_config)
+    assert (result["strategy"], result["settled"]) == ("networkidle", False)
+    page.wait_for_load_state.assert_awaited_once_with('networkidle', timeout=3000)
+    page.evaluate.assert_not_awaited()
+
+    settle_config.scraper_networkidle_timeout_ms = 0
+    assert await wait_for_page_settle(page, settle_config) == {"strategy": "none", "wait_ms": 0, "settled": True}
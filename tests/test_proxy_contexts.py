@@ -0,0 +1,152 @@
+import asyncio
+import copy
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from base_scraper.src.proxy_manager import ProxyManager
+from base_scraper.src.proxy_contexts import ProxyContextSet
+from base_scraper.src.scraper import _perform_scrape_for_entry_point
+
+PROXIES = ["http://proxy1:8080", "http://proxy2:8080", "http://proxy3:8080"]
+
+
+@pytest.fixture
+def proxy_config(scraper_config):
+    config = copy.copy(scraper_config)
+    config.proxy_enabled = True
+    config.proxy_list = list(PROXIES)
+    config.proxy_rotation_strategy = 'sequential'
+    config.proxy_health_check_enabled = True
+    config.respect_robots_txt = False
+    return config
+
+
+@pytest.fixture
+def fake_pool():
+    """A BrowserPool stand-in whose contexts remember the proxy they were created with."""
+    pool = MagicMock()
+
+    async def new_context(**options):
+        context = MagicMock()
+        context.proxy = options.get('proxy', {}).get('server')
+
+        async def new_page():
+            page = MagicMock()
+            page.context = context
+            page.is_closed.return_value = False
+            page.close = AsyncMock()
+            return page
+
+        context.new_page = AsyncMock(side_effect=new_page)
+        return context
+
+    pool.new_context = AsyncMock(side_effect=new_context)
+    pool.release_context = AsyncMock()
+    return pool
+
+
+def test_get_proxy_skips_excluded(proxy_config):
+    manager = ProxyManager(proxy_config)
+    assert manager.get_proxy(exclude=PROXIES[:2]) == PROXIES[2]
+    assert manager.get_proxy(exclude=PROXIES) is None
+
+
+@pytest.mark.asyncio
+async def test_switch_proxy_moves_crawl_to_another_healthy_proxy(proxy_config, fake_pool):
+    manager = ProxyManager(proxy_config)
+    installed = []
+    contexts = ProxyContextSet(fake_pool, {"user_agent": "test"}, manager, on_new_context=AsyncMock(side_effect=installed.append))
+
+    assert await contexts.start() == PROXIES[0]
+    page, proxy = await contexts.new_page()
+    assert (page.context.proxy, proxy) == (PROXIES[0], PROXIES[0])
+
+    # Several workers see the same proxy fail at once; the crawl switches only once.
+    switched = await asyncio.gather(*(contexts.switch_proxy(PROXIES[0]) for _ in range(3)))
+    assert switched == [PROXIES[1]] * 3
+    assert manager.proxy_health[PROXIES[0]]['status'] == 'unhealthy'
+    assert fake_pool.new_context.await_count == 2
+    assert len(installed) == 2
+    assert fake_pool.new_context.await_args.kwargs == {"user_agent": "test", "proxy": {"server": PROXIES[1]}}
+
+    assert await contexts.switch_proxy(PROXIES[1], find_replacement=False) is None
+    assert contexts.current_proxy == PROXIES[1]
+    assert manager.proxy_health[PROXIES[1]]['status'] == 'unhealthy'
+
+    await contexts.close()
+    assert fake_pool.release_context.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_page_is_retried_on_another_proxy(proxy_config, fake_pool, tmp_path, mocker):
+    async def fake_fetch(page, url, config, input_row_id, company_name_or_id, extract_in_browser=False):
+        if page.context.proxy == PROXIES[0]:
+            return None, -8
+        return {"url": url, "html": "<html><body>Hello</body></html>", "extraction": None, "proxy_latency_ms": 250}, 200
+
+    mocker.patch('base_scraper.src.page_handler.fetch_page_data', side_effect=fake_fetch)
+    manager = ProxyManager(proxy_config)
+    contexts = ProxyContextSet(fake_pool, {}, manager)
+    await contexts.start()
+
+    results, status, _, _ = await _perform_scrape_for_entry_point(
+        "http://example.com/", contexts, None, proxy_config, str(tmp_path),
+        "test_company", set(), "test_id", manager, contexts.current_proxy
+    )
+
+    assert status == "Success"
+    assert [result["url"] for result in results] == ["http://example.com/"]
+    assert contexts.current_proxy != PROXIES[0]
+    assert manager.proxy_health[PROXIES[0]]['status'] == 'unhealthy'
+    # The page that succeeded reported its latency and size for the proxy's health score.
+    assert manager.proxy_health[contexts.current_proxy]['requests'] == 1
+    assert manager.proxy_health[contexts.current_proxy]['bytes'] == len("<html><body>Hello</body></html>")
+    assert manager.proxy_health[contexts.current_proxy]['latency_ewma'] == 0.25
+    # Later selections in the same process avoid the failed proxy.
+    assert PROXIES[0] not in {manager.get_proxy() for _ in range(4)}
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_when_no_proxy_is_left(proxy_config, fake_pool, tmp_path, mocker):
+    fetch = mocker.patch('base_scraper.src.page_handler.fetch_page_data', AsyncMock(return_value=(None, -8)))
+    proxy_config.proxy_page_retries = 5
+    manager = ProxyManager(proxy_config)
+    contexts = ProxyContextSet(fake_pool, {}, manager)
+    await contexts.start()
+
+    results, status, _, _ = await _perform_scrape_for_entry_point(
+        "http://example.com/", contexts, None, proxy_config, str(tmp_path),
+        "test_company", set(), "test_id", manager, contexts.current_proxy
+    )
+
+    assert (results, status) == ([], "ProxyError")
+    assert fetch.await_count == 3
+    assert all(manager.proxy_health[proxy]['status'] == 'unhealthy' for proxy in PROXIES)
+
+
+@pytest.mark.asyncio
+async def test_timeouts_blame_the_proxy_only_across_hosts(proxy_config, fake_pool, tmp_path, mocker):
+    fetch = mocker.patch('base_scraper.src.page_handler.fetch_page_data', AsyncMock(return_value=(None, -1)))
+    manager = ProxyManager(proxy_config)
+
+    async def crawl(url):
+        contexts = ProxyContextSet(fake_pool, {}, manager)
+        await contexts.start()
+        try:
+            return await _perform_scrape_for_entry_point(
+                url, contexts, None, proxy_config, str(tmp_path),
+                "test_company", set(), "test_id", manager, contexts.current_proxy
+            )
+        finally:
+            await contexts.close()
+
+    # A slow site times out without costing the proxy its health or trying other proxies.
+    assert (await crawl("http://slow.example.com/"))[1] == "TimeoutError"
+    assert fetch.await_count == 1
+    assert all(health['status'] == 'healthy' for health in manager.proxy_health.values())
+
+    # A timeout on a second host through the same proxy points at the proxy.
+    mocker.patch.object(manager, 'get_proxy', side_effect=[PROXIES[0], PROXIES[1]])
+    assert (await crawl("http://other.example.com/"))[1] == "TimeoutError"
+    assert manager.proxy_health[PROXIES[0]]['status'] == 'unhealthy'
+    assert fetch.await_count == 3
@@ -0,0 +1,180 @@
+import copy
+import multiprocessing
+import random
+import pytest
+from collections import Counter
+
+from base_scraper.src.proxy_manager import ProxyManager, _FenwickTree
+from base_scraper.src.proxy_health_store import ProxyHealthStore
+
+PROXIES = ["http://proxy1:8080", "http://proxy2:8080", "http://proxy3:8080"]
+
+
+@pytest.fixture
+def proxy_config(scraper_config):
+    config = copy.copy(scraper_config)
+    config.proxy_list = list(PROXIES)
+    config.proxy_health_check_enabled = True
+    config.proxy_cooldown_seconds = 10
+    config.proxy_max_cooldown_seconds = 35
+    config.proxy_ewma_alpha = 0.5
+    return config
+
+
+def test_fenwick_find_matches_linear_scan():
+    rng = random.Random(5)
+    weights = [rng.choice([0.0, 0.5, 1.0, 3.0]) for _ in range(37)]
+    tree = _FenwickTree(len(weights))
+    for index, weight in enumerate(weights):
+        tree.set(index, weight)
+    assert tree.total() == pytest.approx(sum(weights))
+    for _ in range(200):
+        target = rng.random() * sum(weights)
+        cumulative = 0.0
+        for expected, weight in enumerate(weights):
+            cumulative += weight
+            if target < cumulative:
+                break
+        assert tree.find(target) == expected
+
+
+def test_report_success_updates_moving_averages(proxy_config):
+    manager = ProxyManager(proxy_config)
+    manager.report_success(PROXIES[0], 0.4, 1000)
+    manager.report_success(PROXIES[0], 0.2, 500)
+    manager.report_failure(PROXIES[0])
+
+    stats = manager.proxy_stats()[PROXIES[0]]
+    assert stats['latency_ewma'] == pytest.approx(0.3)
+    assert stats['success_ewma'] == pytest.approx(0.5)
+    assert (stats['bytes'], stats['requests'], stats['failures']) == (1500, 3, 1)
+    assert stats['weight'] == 0.0
+
+
+def test_cooldown_doubles_with_consecutive_failures(proxy_config, mocker):
+    mock_time = mocker.patch('base_scraper.src.proxy_manager.time.time')
+    manager = ProxyManager(proxy_config)
+
+    cooldowns = []
+    for now in (100, 200, 300, 400):
+        mock_time.return_value = now
+        manager.report_failure(PROXIES[0])
+        cooldowns.append(manager.proxy_health[PROXIES[0]]['cooldown_until'] - now)
+    assert cooldowns == [10, 20, 35, 35]
+
+    mock_time.return_value = 436
+    manager.get_proxy()
+    assert manager.proxy_health[PROXIES[0]]['status'] == 'healthy'
+
+    # A success resets the backoff.
+    manager.report_success(PROXIES[0], 0.1)
+    manager.report_failure(PROXIES[0])
+    assert manager.proxy_health[PROXIES[0]]['cooldown_until'] - 436 == 10
+
+
+def test_weighted_selection_prefers_fast_reliable_proxies(proxy_config):
+    proxy_config.proxy_rotation_strategy = 'weighted'
+    manager = ProxyManager(proxy_config)
+    manager.report_success(PROXIES[0], 0.1)
+    manager.report_success(PROXIES[1], 1.0)
+    manager.report_success(PROXIES[2], 1.0)
+    manager.report_failure(PROXIES[2])
+
+    random.seed(1)
+    picks = Counter(manager.get_proxy() for _ in range(1000))
+    assert PROXIES[2] not in picks
+    assert picks[PROXIES[0]] > 8 * picks[PROXIES[1]]
+    assert manager.get_proxy(exclude=[PROXIES[0]]) == PROXIES[1]
+
+
+def test_power_of_two_picks_the_better_of_two(proxy_config, mocker):
+    proxy_config.proxy_rotation_strategy = 'power_of_two'
+    manager = ProxyManager(proxy_config)
+    manager.report_success(PROXIES[0], 2.0)
+    manager.report_success(PROXIES[1], 0.2)
+    manager.report_success(PROXIES[2], 0.5)
+
+    mocker.patch('base_scraper.src.proxy_manager.random.random', side_effect=[0.1, 0.9, 0.1, 0.5])
+    assert manager.get_proxy() == PROXIES[2]
+    assert manager.get_proxy() == PROXIES[1]
+
+
+_DEFAULT_HEALTH = {
+    'status': 'healthy', 'last_fail_time': 0, 'cooldown_until': 0, 'consecutive_failures': 0,
+    'latency_ewma': None, 'success_ewma': 1.0, 'bytes': 0, 'requests': 0, 'failures': 0,
+}
+
+
+def _count_requests(path, proxy, count):
+    store = ProxyHealthStore(path)
+    for _ in range(count):
+        store.update(proxy, _DEFAULT_HEALTH, lambda health: health.update(requests=health['requests'] + 1))
+    store.close()
+
+
+def test_health_store_updates_are_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "proxy_health.sqlite3")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_count_requests, args=(path, PROXIES[0], 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    assert ProxyHealthStore(path).load(PROXIES)[PROXIES[0]]['requests'] == 200
+
+
+def test_failure_in_one_process_steers_the_others(proxy_config, tmp_path, mocker):
+    mocker.patch('base_scraper.src.proxy_manager.time.time', return_value=100)
+    path = str(tmp_path / "proxy_health.sqlite3")
+    proxy_config.proxy_rotation_strategy = 'sequential'
+    first = ProxyManager(proxy_config, ProxyHealthStore(path))
+    second = ProxyManager(proxy_config, ProxyHealthStore(path))
+
+    first.report_success(PROXIES[1], 0.5, 100)
+    first.report_failure(PROXIES[0])
+    assert [second.get_proxy() for _ in range(3)] == [PROXIES[1], PROXIES[2], PROXIES[1]]
+    assert second.proxy_health[PROXIES[0]]['status'] == 'unhealthy'
+
+    # Consecutive failures count across processes, and a new run starts from the stored state.
+    second.report_failure(PROXIES[0])
+    assert second.proxy_health[PROXIES[0]]['consecutive_failures'] == 2
+    next_run = ProxyManager(proxy_config, ProxyHealthStore(path))
+    assert next_run.proxy_stats()[PROXIES[1]]['bytes'] == 100
+    assert next_run.proxy_health[PROXIES[0]]['cooldown_until'] == 120
+
+
+def test_sync_reads_only_changed_rows_and_pushes_changed_cooldowns(proxy_config, tmp_path, mocker):
+    mocker.patch('base_scraper.src.proxy_manager.time.time', return_value=100)
+    path = str(tmp_path / "proxy_health.sqlite3")
+    first = ProxyManager(proxy_config, ProxyHealthStore(path))
+    second = ProxyManager(proxy_config, ProxyHealthStore(path))
+
+    first.report_failure(PROXIES[0])
+    second.get_proxy()
+    assert len(second._cooldowns) == 1
+
+    load_since = mocker.spy(second.health_store, 'load_since')
+    for _ in range(3):
+        first.report_success(PROXIES[1], 0.5, 10)
+        first.flush()
+        second.get_proxy()
+    assert [list(records) for records, _ in load_since.spy_return_list] == [[PROXIES[1]]] * 3
+    assert len(second._cooldowns) == 1
+    assert second.proxy_stats()[PROXIES[1]]['bytes'] == 30
+
+
+def test_successes_are_written_in_batches(proxy_config, tmp_path, mocker):
+    path = str(tmp_path / "proxy_health.sqlite3")
+    manager = ProxyManager(proxy_config, ProxyHealthStore(path))
+    update_many = mocker.spy(manager.health_store, 'update_many')
+    for _ in range(19):
+        manager.report_success(PROXIES[0], 0.2, 1)
+    assert update_many.call_count == 0
+    assert manager.proxy_stats()[PROXIES[0]]['requests'] == 19
+
+    manager.report_success(PROXIES[1], 0.2, 1)
+    assert update_many.call_count == 1
+    stored = ProxyHealthStore(path).load(PROXIES)
+    assert (stored[PROXIES[0]]['requests'], stored[PROXIES[1]]['requests']) == (19, 1)
+    assert stored[PROXIES[0]]['latency_ewma'] == pytest.approx(0.2)
@@ -0,0 +1,79 @@
+import copy
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from base_scraper.src.resource_blocker import ResourceBlocker
+
+
+@pytest.fixture
+def blocker(scraper_config):
+    config = copy.copy(scraper_config)
+    config.scraper_block_resource_types = ["image", "font"]
+    config.scraper_block_domains = ["doubleclick.net", "google-analytics.com"]
+    return ResourceBlocker(config)
+
+
+def _mock_request(url, resource_type, page, navigation=False, parent_frame=None):
+    request = MagicMock()
+    request.url = url
+    request.resource_type = resource_type
+    request.frame.page = page
+    request.frame.parent_frame = parent_frame
+    request.is_navigation_request.return_value = navigation
+    return request
+
+
+@pytest.mark.parametrize("host, expected", [
+    ("doubleclick.net", "doubleclick.net"),
+    ("stats.g.doubleclick.net", "doubleclick.net"),
+    ("WWW.Google-Analytics.com.", "google-analytics.com"),
+    ("notdoubleclick.net", None),
+    ("example.com", None),
+    ("", None),
+])
+def test_blocked_domain_matches_subdomains(blocker, host, expected):
+    assert blocker.blocked_domain(host) == expected
+
+
+def test_block_reason(blocker):
+    assert blocker.block_reason("image", "https://example.com/logo.png") == "type:image"
+    assert blocker.block_reason("script", "https://www.google-analytics.com/ga.js") == "domain:google-analytics.com"
+    assert blocker.block_reason("script", "https://example.com/app.js") is None
+    assert blocker.block_reason("document", "https://ad.doubleclick.net/", is_main_document=True) is None
+
+
+@pytest.mark.asyncio
+async def test_handle_route_aborts_and_counts_per_page(blocker):
+    page, other_page = MagicMock(), MagicMock()
+    requests = [
+        _mock_request("https://example.com/", "document", page, navigation=True),
+        _mock_request("https://example.com/logo.png", "image", page),
+        _mock_request("https://ad.doubleclick.net/pixel", "script", page),
+        _mock_request("https://ad.doubleclick.net/frame", "document", page, navigation=True, parent_frame=MagicMock()),
+        _mock_request("https://example.com/app.js", "script", page),
+        _mock_request("https://example.com/font.woff2", "font", other_page),
+    ]
+    routes = [AsyncMock() for _ in requests]
+    for route, request in zip(routes, requests):
+        await blocker._handle_route(route, request)
+
+    assert [route.continue_.await_count for route in routes] == [1, 0, 0, 0, 1, 0]
+    assert [route.abort.await_count for route in routes] == [0, 1, 1, 1, 0, 1]
+    assert blocker.take_page_stats(page) == {
+        "blocked_requests": 3,
+        "allowed_requests": 2,
+        "blocked_by_type": {"image": 1},
+        "blocked_by_domain": {"doubleclick.net": 2},
+    }
+    assert blocker.take_page_stats(page)["blocked_requests"] == 0
+    assert blocker.take_page_stats(other_page)["blocked_by_type"] == {"font": 1}
+
+
+@pytest.mark.asyncio
+async def test_install_skips_routing_when_nothing_is_blocked(scraper_config):
+    config = copy.copy(scraper_config)
+    config.scraper_block_resource_types = []
+    config.scraper_block_domains = []
+    context = AsyncMock()
+    await ResourceBlocker(config).install(context)
+    context.route.assert_not_awaited()
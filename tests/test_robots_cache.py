@@ -0,0 +1,124 @@
+import asyncio
+import random
+import time
+import pytest
+import httpx
+from urllib.robotparser import RobotFileParser
+
+from base_scraper.src.robots_cache import RobotsCache, RobotsRules, robots_origin
+from base_scraper.src.http_client import get_shared_http_client, close_shared_http_client
+
+ROBOTS_TXT = "User-agent: *\nDisallow: /private\nCrawl-delay: 1\n"
+
+
+@pytest.fixture
+def robots_server():
+    """
+    An httpx client whose requests are answered in-process; counts robots.txt fetches per host.
+    """
+    fetches = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        fetches[request.url.host] = fetches.get(request.url.host, 0) + 1
+        if request.url.host == "no-robots.com":
+            return httpx.Response(404)
+        return httpx.Response(200, text=ROBOTS_TXT)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, fetches
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://Example.com/a/b?c=1", "https://example.com"),
+    ("http://example.com:8080/", "http://example.com:8080"),
+    ("file:///tmp/index.html", None),
+])
+def test_robots_origin(url, expected):
+    assert robots_origin(url) == expected
+
+
+@pytest.mark.asyncio
+async def test_robots_fetched_once_per_origin(robots_server):
+    client, fetches = robots_server
+    cache = RobotsCache()
+    results = await asyncio.gather(*(cache.is_allowed(f"https://example.com/page{i}", client, "*") for i in range(5)))
+    assert results == [True] * 5
+    assert not await cache.is_allowed("https://example.com/private/data", client, "*")
+    assert await cache.is_allowed("https://no-robots.com/private", client, "*")
+    assert fetches == {"example.com": 1, "no-robots.com": 1}
+    assert await cache.is_allowed("file:///tmp/private", client, "*")
+
+
+@pytest.mark.asyncio
+async def test_robots_cache_evicts_least_recently_used_origins(robots_server):
+    client, fetches = robots_server
+    cache = RobotsCache(max_entries=2)
+    await cache.is_allowed("https://a.com/", client, "*")
+    await cache.is_allowed("https://b.com/", client, "*")
+    await cache.is_allowed("https://a.com/other", client, "*")
+    await cache.is_allowed("https://c.com/", client, "*")
+    assert list(cache._entries) == ["https://a.com", "https://c.com"]
+
+    await cache.is_allowed("https://b.com/", client, "*")
+    assert fetches == {"a.com": 1, "b.com": 2, "c.com": 1}
+
+
+@pytest.mark.asyncio
+async def test_robots_cache_persists_between_runs(robots_server, tmp_path):
+    client, fetches = robots_server
+    persist_path = str(tmp_path / "robots.jsonl")
+    first_run = RobotsCache(persist_path=persist_path)
+    assert not await first_run.is_allowed("https://example.com/private", client, "*")
+    assert await first_run.is_allowed("https://no-robots.com/", client, "*")
+
+    second_run = RobotsCache(persist_path=persist_path)
+    assert not await second_run.is_allowed("https://example.com/private", client, "*")
+    assert await second_run.is_allowed("https://no-robots.com/private", client, "*")
+    assert second_run.fetches == 0
+    assert fetches == {"example.com": 1, "no-robots.com": 1}
+
+    expired_run = RobotsCache(ttl_seconds=0, persist_path=persist_path)
+    await expired_run.is_allowed("https://example.com/", client, "*")
+    assert expired_run.fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_crawl_delay_spaces_concurrent_requests(robots_server):
+    client, _ = robots_server
+    cache = RobotsCache(max_crawl_delay_seconds=0.05)
+    start = time.monotonic()
+    waits = await asyncio.gather(*(cache.wait_for_crawl_delay("https://example.com/", client, "*") for _ in range(3)))
+    assert sorted(round(wait, 2) for wait in waits) == [0.0, 0.05, 0.1]
+    assert time.monotonic() - start >= 0.1
+    assert await cache.wait_for_crawl_delay("https://no-robots.com/", client, "*") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client_is_reused_until_closed(scraper_config):
+    client = get_shared_http_client(scraper_config)
+    assert get_shared_http_client(scraper_config) is client
+    await close_shared_http_client()
+    assert client.is_closed
+    new_client = get_shared_http_client(scraper_config)
+    assert new_client is not client
+    await close_shared_http_client()
+
+
+def test_compiled_rules_match_robotfileparser():
+    rng = random.Random(5)
+    paths = ["/", "/private", "/private/", "/priv", "/a b", "/%7Euser", "/~user", "/shop?x=1", "/de/", "/de/kontakt", "*", ""]
+    agents = ["*", "MyBot", "otherbot", "Googlebot-News"]
+    for _ in range(300):
+        lines = []
+        for agent in rng.sample(agents, rng.randint(1, 3)):
+            lines.append(f"User-agent: {agent}")
+            for _ in range(rng.randint(0, 5)):
+                lines.append(f"{rng.choice(['Allow', 'Disallow'])}: {rng.choice(paths)}")
+            lines.append("")
+        parser = RobotFileParser()
+        parser.parse(lines)
+        for user_agent in ("MyBot/1.0", "*", "Googlebot"):
+            rules = RobotsRules(parser, user_agent)
+            for url_path in paths + ["/private/data?id=1", "/de/kontakt#team", "/shop?x=10", "/%70rivate"]:
+                url = f"https://example.com{url_path if url_path.startswith('/') else '/' + url_path}"
+                assert rules.allows(url) == parser.can_fetch(user_agent, url), (lines, user_agent, url)
@@ -1,8 +1,12 @@
+import asyncio
+import copy
+import httpx
 import pytest
 import os
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock, MagicMock
 
-from base_scraper.src.scraper import scrape_website
+from base_scraper.src.scraper import scrape_website, _perform_scrape_for_entry_point
+from base_scraper.src.robots_cache import RobotsCache, RobotsEntry
 
 @pytest.mark.asyncio
 async def test_scrape_website_successful_crawl(scraper_config, test_server, tmp_path):
@@ -49,7 +53,7 @@ async def test_scrape_website_page_limit(scraper_config, test_server, tmp_path):
     assert results[0]['url'] == f"{test_server}/"
 
 @pytest.mark.asyncio
-@patch('base_scraper.src.scraper.process_input_url')
+@patch('base_scraper.src.scraper.process_input_url_async', new_callable=AsyncMock)
 async def test_scrape_website_dns_fallback(mock_process_input_url, scraper_config, test_server, tmp_path):
     """
     Tests the DNS fallback mechanism by mocking the process_input_url function.
@@ -65,4 +69,138 @@ async def test_scrape_website_dns_fallback(mock_process_input_url, scraper_confi
 
     # The mock should allow the scraper to proceed and crawl the test site
     assert len(results) > 0
-    assert results[0]['url'].startswith(test_server)
\ No newline at end of file
+    assert results[0]['url'].startswith(test_server)
+
+def _mock_playwright_context():
+    """
+    Builds a mock BrowserContext whose pages are only handed to the patched fetcher.
+    """
+    def new_page():
+        page = MagicMock()
+        page.is_closed.return_value = False
+        page.close = AsyncMock()
+        return page
+
+    context = MagicMock()
+    context.new_page = AsyncMock(side_effect=new_page)
+    return context
+
+
+@pytest.mark.asyncio
+async def test_perform_scrape_crawls_pages_concurrently(scraper_config, tmp_path, mocker):
+    """
+    Tests that internal pages are fetched concurrently while honouring the page limit.
+    """
+    site = "http://example.com"
+    links = "".join(f'<a href="/about-{i}">About {i}</a>' for i in range(6))
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_fetch(page, url, config, input_row_id, company_name_or_id, extract_in_browser=False):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if url == f"{site}/":
+            return {"url": url, "html": f"<html><body>{links}</body></html>", "extraction": None}, 200
+        return {"url": url, "html": "<html><body>About page</body></html>", "extraction": None}, 200
+
+    mocker.patch('base_scraper.src.page_handler.fetch_page_data', side_effect=fake_fetch)
+    config = copy.copy(scraper_config)
+    config.scraper_pages_concurrency = 3
+    config.scraper_max_pages_per_domain = 4
+    config.scraper_score_threshold_for_limit_bypass = 101
+
+    results, status, canonical_url, _ = await _perform_scrape_for_entry_point(
+        f"{site}/", _mock_playwright_context(), None, config, str(tmp_path),
+        "test_company", set(), "test_id", None, None
+    )
+
+    assert status == "Success"
+    assert canonical_url == f"{site}/"
+    assert results[0]['url'] == f"{site}/"
+    assert len(results) == 4
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_perform_scrape_entry_point_failure(scraper_config, tmp_path, mocker):
+    """
+    Tests that a failed entry point aborts the crawl with a mapped status.
+    """
+    mocker.patch('base_scraper.src.page_handler.fetch_page_data', AsyncMock(return_value=(None, -2)))
+    config = copy.copy(scraper_config)
+    config.scraper_pages_concurrency = 3
+
+    results, status, canonical_url, _ = await _perform_scrape_for_entry_point(
+        "http://example.com/", _mock_playwright_context(), None, config, str(tmp_path),
+        "test_company", set(), "test_id", None, None
+    )
+
+    assert results == []
+    assert status == "DNSError"
+    assert canonical_url is None
+
+
+@pytest.mark.asyncio
+async def test_perform_scrape_skips_links_disallowed_by_robots(scraper_config, tmp_path, mocker):
+    """
+    Tests that links disallowed by robots.txt are never queued or fetched.
+    """
+    site = "http://example.com"
+    robots_cache = RobotsCache()
+    robots_cache._entries[site] = RobotsEntry(site, ["User-agent: *", "Disallow: /about-private"], 200, 0, float("inf"))
+    mocker.patch('base_scraper.src.scraper.get_robots_cache', return_value=robots_cache)
+
+    async def fake_fetch(page, url, config, input_row_id, company_name_or_id, extract_in_browser=False):
+        if url == f"{site}/":
+            links = '<a href="/about-us">About us</a><a href="/about-private">About private</a>'
+            return {"url": url, "html": f"<html><body>{links}</body></html>", "extraction": None}, 200
+        return {"url": url, "html": "<html><body>About page</body></html>", "extraction": None}, 200
+
+    fetch_mock = mocker.patch('base_scraper.src.page_handler.fetch_page_data', side_effect=fake_fetch)
+    config = copy.copy(scraper_config)
+    config.respect_robots_txt = True
+
+    results, status, _, _ = await _perform_scrape_for_entry_point(
+        f"{site}/", _mock_playwright_context(), None, config, str(tmp_path),
+        "test_company", set(), "test_id", None, None
+    )
+
+    fetched_urls = [call.args[1] for call in fetch_mock.call_args_list]
+    assert status == "Success"
+    assert fetched_urls == [f"{site}/", f"{site}/about-us"]
+    assert [result["url"] for result in results] == fetched_urls
+
+
+@pytest.mark.asyncio
+async def test_perform_scrape_http_first_does_not_open_browser_pages(scraper_config, tmp_path):
+    """
+    Tests that server-rendered pages are served over plain HTTP without opening a browser page.
+    """
+    filler = "<p>" + "ACME GmbH builds industrial widgets. " * 20 + "</p>"
+    pages = {
+        "/": f'<html><body>{filler}<a href="/about-us">About us</a></body></html>',
+        "/about-us": f"<html><body>{filler}</body></html>",
+    }
+
+    def handler(request):
+        return httpx.Response(200, text=pages[request.url.path], headers={"content-type": "text/html"})
+
+    config = copy.copy(scraper_config)
+    config.scraper_fetch_mode = 'http_first'
+    config.respect_robots_txt = False
+    context = _mock_playwright_context()
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        results, status, _, _ = await _perform_scrape_for_entry_point(
+            "http://example.com/", context, client, config, str(tmp_path),
+            "test_company", set(), "test_id", None, None
+        )
+
+    assert status == "Success"
+    assert [(result["url"], result["fetch_method"]) for result in results] == [
+        ("http://example.com/", "http"), ("http://example.com/about-us", "http")
+    ]
+    context.new_page.assert_not_awaited()
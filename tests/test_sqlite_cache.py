@@ -0,0 +1,107 @@
+import json
+import os
+import sqlite3
+
+from base_scraper import cache as cache_command
+from base_scraper.src.caching import ScrapeCache, save_to_cache, load_from_cache, migrate_json_cache
+from base_scraper.src.sqlite_cache import SqliteCacheBackend, url_domain
+
+
+def _results(tmp_path, name="about"):
+    content_path = tmp_path / f"{name}.txt"
+    content_path.write_text(f"Text of {name}")
+    return [{"url": f"https://www.example.com/{name}", "status": 200, "content_file_path": str(content_path), "summary_text": None}]
+
+
+def test_url_domain():
+    assert url_domain("https://www.Example.com/about") == "example.com"
+    assert url_domain("example.com") == "example.com"
+    assert url_domain(None) is None
+
+
+def test_entries_are_buffered_then_committed_in_batches(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    backend = SqliteCacheBackend(path, batch_size=2)
+    cache = ScrapeCache(str(tmp_path), backend=backend)
+    reader = SqliteCacheBackend(path)
+
+    cache.put("a", _results(tmp_path, "a"), url="https://www.example.com")
+    # Buffered entries are served by the writer, but not committed yet.
+    assert backend.read("a")[0] == _results(tmp_path, "a")
+    assert reader.read("a")[0] is None
+
+    cache.put("b", _results(tmp_path, "b"), url="https://other.org")
+    assert reader.read("a")[0] == _results(tmp_path, "a")
+    assert reader.page_text("https://www.example.com/b") == "Text of b"
+    assert [entry["key"] for entry in reader.entries_for_domain("example.com")] == ["a"]
+
+    fresh = ScrapeCache(str(tmp_path), backend=reader)
+    assert fresh.get("b") == _results(tmp_path, "b")
+    assert fresh.stats()["disk_hits"] == 1
+    assert reader.stats()["entries"] == 2
+    assert reader.stats()["pages"] == 2
+
+
+def test_prune_by_age_and_last_use(tmp_path, mocker):
+    backend = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"), batch_size=1)
+    for key, saved_at in (("x", 1000), ("b", 4000), ("a", 5000)):
+        backend.write(key, _results(tmp_path, key), saved_at, "https://example.com")
+    mocker.patch('base_scraper.src.sqlite_cache.time.time', return_value=6000)
+    backend.touch(["x"])
+    size = backend.read("a")[2]
+    assert backend.total_bytes() == 3 * size
+
+    pruned = backend.prune(ttl_seconds=3600, max_bytes=size, now=5000)
+    assert (pruned["removed_expired"], pruned["removed_for_size"], pruned["removed_keys"]) == (1, 1, {"x", "b"})
+    assert (pruned["remaining_entries"], pruned["remaining_bytes"]) == (1, size)
+    assert backend.page_text("https://www.example.com/b") is None
+    assert backend.compact()["bytes_after"] > 0
+
+
+def test_disk_cap_applies_to_the_sqlite_store(tmp_path):
+    backend = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"), batch_size=1)
+    size = len(json.dumps(_results(tmp_path, "a")))
+    cache = ScrapeCache(str(tmp_path), max_entries=1, max_disk_bytes=int(2.5 * size), backend=backend)
+    for key in ("a", "b", "c"):
+        cache.put(key, _results(tmp_path, key))
+    assert cache.stats()["disk_evictions"] == 1
+    assert backend.read("a")[0] is None
+    assert backend.read("c")[0] is not None
+
+
+def test_migrate_json_cache(tmp_path, capsys):
+    cache_dir = tmp_path / "cache"
+    save_to_cache("a", _results(tmp_path, "a"), str(cache_dir))
+    (cache_dir / "legacy.json").write_text(json.dumps(_results(tmp_path, "legacy")))
+    os.utime(cache_dir / "legacy.json", (1000, 1000))
+    (cache_dir / "broken.json").write_text("{")
+
+    backend = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    assert migrate_json_cache(str(cache_dir), backend) == {"migrated": 2, "skipped_corrupt": 1}
+    assert backend.read("legacy")[:2] == (_results(tmp_path, "legacy"), 1000)
+    assert backend.entries_for_domain("www.example.com")[0]["url"] == "https://www.example.com/a"
+    assert load_from_cache("a", str(cache_dir)) is not None
+
+    sqlite_path = str(tmp_path / "cli.sqlite3")
+    assert cache_command.main(["migrate", "--cache-dir", str(cache_dir), "--sqlite-path", sqlite_path, "--delete-json"]) == 0
+    assert "Migrated 2 entries" in capsys.readouterr().out
+    assert sorted(path.name for path in cache_dir.iterdir()) == ["broken.json"]
+    assert cache_command.main(["stat", "--backend", "sqlite", "--sqlite-path", sqlite_path, "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["entries"] == 2
+
+
+def test_locked_database_does_not_fail_writes(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    backend = SqliteCacheBackend(path, batch_size=1, timeout_seconds=0.05)
+    cache = ScrapeCache(str(tmp_path), backend=backend, max_disk_bytes=1)
+    cache.put("a", _results(tmp_path, "a"))
+
+    locker = sqlite3.connect(path, isolation_level=None)
+    locker.execute("BEGIN IMMEDIATE")
+    cache.put("b", _results(tmp_path, "b"), url="https://www.example.com")
+    assert cache.get("b") == _results(tmp_path, "b")
+    assert backend.prune(max_bytes=1)["error"] == "database is locked"
+
+    locker.execute("ROLLBACK")
+    cache.flush()
+    assert SqliteCacheBackend(path).read("b")[0] == _results(tmp_path, "b")
@@ -1,5 +1,10 @@
+import asyncio
+import copy
+import random
+import socket
 import pytest
 from unittest.mock import MagicMock, patch
+from urllib.parse import urldefrag, urlparse
 import httpx
 
 from base_scraper.src.utils import (
@@ -7,9 +12,14 @@ from base_scraper.src.utils import (
     get_safe_filename,
     extract_text_from_html,
     find_internal_links,
+    parse_page,
+    parse_extracted_page,
+    score_internal_links,
+    get_link_scorer,
     _classify_page_type,
     validate_link_status,
     process_input_url,
+    process_input_url_async,
 )
 
 # --- Tests for normalize_url ---
@@ -26,6 +36,55 @@ from base_scraper.src.utils import (
 def test_normalize_url(url, expected):
     assert normalize_url(url) == expected
 
+def _reference_normalize_url(url):
+    """normalize_url before it was memoised, kept to check the fast path produces identical output."""
+    try:
+        url_no_frag, _ = urldefrag(url)
+        parsed = urlparse(url_no_frag)
+        scheme = parsed.scheme.lower()
+        netloc = parsed.netloc.lower()
+        if netloc.startswith("www."):
+            netloc = netloc[4:]
+        path = parsed.path
+        for index_file in ['index.html', 'index.htm', 'index.php', 'default.html', 'default.htm', 'index.asp', 'default.asp']:
+            if path.endswith(f'/{index_file}'):
+                path = path[:-len(index_file)]
+                break
+        if netloc and path and not path.startswith('/'):
+            path = '/' + path
+        if path != '/' and path.endswith('/'):
+            path = path[:-1]
+        if not path and netloc:
+            path = '/'
+        query = ''
+        if parsed.query:
+            params = parsed.query.split('&')
+            filtered_params = [p for p in params if (p.split('=')[0].lower() if '=' in p else p.lower()) not in {'fallback'}]
+            if filtered_params:
+                query = '&'.join(sorted(filtered_params))
+        return urlparse('')._replace(scheme=scheme, netloc=netloc, path=path, params=parsed.params, query=query, fragment='').geturl()
+    except Exception:
+        return url
+
+URL_PIECES = ['http', 'https', 'HTTPS', 'mailto', 'tel:', ':', '//', '/', 'www.', 'WWW.', 'Example.com', 'sub.example.de',
+              '[::1]', '[bad', ':8080', '@', 'user:pw', '?', '&', '=', '#', 'top', 'fallback', 'FALLBACK=1', 'a=1', 'b=2',
+              'about', 'index.html', 'index.htm', 'Index.HTML', 'default.asp', ';', 'jsessionid=1', '%20', ' ', '..', 'ü', '']
+
+@pytest.mark.parametrize("seed", range(5))
+def test_normalize_url_matches_reference_on_random_urls(seed):
+    rng = random.Random(seed)
+    for _ in range(4000):
+        url = ''.join(rng.choice(URL_PIECES) for _ in range(rng.randint(0, 10)))
+        assert normalize_url(url) == _reference_normalize_url(url), url
+
+def test_normalize_url_is_memoised():
+    normalize_url.cache_clear()
+    assert normalize_url("https://www.Example.com/a/?b=2&a=1#x") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("https://www.Example.com/a/?b=2&a=1#x") == "https://example.com/a?a=1&b=2"
+    info = normalize_url.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert info.maxsize > 0
+
 # --- Tests for get_safe_filename ---
 
 def test_get_safe_filename_for_url(scraper_config):
@@ -54,6 +113,87 @@ def test_find_internal_links(scraper_config, test_server):
     assert len(links) == 1
     assert links[0][0] == f"{test_server}/about.html"
 
+# --- Tests for parse_page ---
+
+def test_parse_page_matches_separate_helpers(scraper_config):
+    html = """<html lang="de"><head><title> ACME  GmbH </title>
+    <meta name="Description" content="Industrial widgets">
+    <link rel="canonical" href="/ueber-uns/"><style>p {}</style></head>
+    <body><a href="/impressum">Impressum</a><a href="/produkte/widget">Widgets</a>
+    <a href="https://other.com/about">About</a><script>var x;</script><p>Hello</p></body></html>"""
+    base_url = "http://www.example.com/"
+    parsed = parse_page(html, base_url, scraper_config, "test_id", "test_company")
+
+    assert parsed["text"] == extract_text_from_html(html)
+    assert parsed["links"] == find_internal_links(html, base_url, scraper_config, "test_id", "test_company")
+    assert parsed["title"] == "ACME GmbH"
+    assert parsed["meta_description"] == "Industrial widgets"
+    assert parsed["canonical_url"] == "http://example.com/ueber-uns"
+    assert parsed["language"] == "de"
+
+def test_parse_page_without_links(scraper_config):
+    html = '<html><body><a href="/about">About</a></body></html>'
+    parsed = parse_page(html, "http://example.com/", scraper_config, include_links=False)
+    assert parsed["links"] == []
+    assert parsed["text"] == "About"
+
+def test_parse_extracted_page_scores_like_parse_page(scraper_config):
+    html = '<html><head><title>ACME</title></head><body><a href="/impressum">Impressum</a><a href="/kontakt/"> Kontakt </a></body></html>'
+    extraction = {
+        "text": "Impressum\n  Kontakt",
+        "anchors": [["/impressum", "Impressum"], ["/kontakt/", " Kontakt "]],
+        "title": "ACME",
+        "meta_description": None,
+        "canonical_href": None,
+        "language": None,
+    }
+    base_url = "http://example.com/"
+    parsed = parse_extracted_page(extraction, base_url, scraper_config)
+
+    assert parsed["links"] == parse_page(html, base_url, scraper_config)["links"]
+    assert parsed["text"] == "Impressum Kontakt"
+    assert parsed["title"] == "ACME"
+
+def _reference_path_score(path, link_text, config):
+    segments = [seg for seg in path.lower().strip('/').split('/') if seg]
+    excess = len(segments) - config.scraper_max_keyword_path_segments
+    score = 0
+    if any(kw in segments for kw in config.scraper_critical_priority_keywords):
+        score = 100 - (min(20, excess * 5) if excess > 0 else 0)
+    if score < 90 and any(kw in segments for kw in config.scraper_high_priority_keywords):
+        score = 90 - (min(20, excess * 5) if excess > 0 else 0)
+    other = set(config.target_link_keywords) - set(config.scraper_critical_priority_keywords) - set(config.scraper_high_priority_keywords)
+    if score < 70 and any(kw in segments for kw in other):
+        score = 70 - (min(10, excess * 3) if excess > 0 else 0)
+    if score < 50 and any(kw in seg for kw in config.target_link_keywords for seg in segments):
+        score = 50
+    if score < 40 and any(kw in link_text for kw in config.target_link_keywords):
+        score = 40
+    return score
+
+def test_link_scorer_matches_reference_tiers(scraper_config):
+    rng = random.Random(3)
+    words = list(scraper_config.target_link_keywords[:15]) + ["widgets", "news", "a", "ueber", "x-about-y", "kontakte"]
+    scorer = get_link_scorer(scraper_config)
+    for _ in range(2000):
+        path = "/" + "/".join(rng.choice(words) for _ in range(rng.randint(0, 7)))
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 3)))
+        assert scorer.score_path(path, text) == _reference_path_score(path, text, scraper_config), (path, text)
+
+def test_link_scorer_recompiles_when_config_changes(scraper_config):
+    anchors = [("/impressum", "Impressum"), ("/widgets", "Widgets"), ("/privacy/impressum", "Impressum")]
+    config = copy.copy(scraper_config)
+    config.target_link_keywords = list(scraper_config.target_link_keywords)
+    base_links = score_internal_links(anchors, "http://example.com/", config, "N/A", "N/A")
+    assert "http://example.com/widgets" not in dict(base_links)
+
+    config.target_link_keywords = config.target_link_keywords + ["widgets"]
+    config.scraper_exclude_link_path_patterns = ["/privacy"]
+    links = dict(score_internal_links(anchors, "http://example.com/", config, "N/A", "N/A"))
+    assert links["http://example.com/widgets"] == 70
+    assert "http://example.com/privacy/impressum" not in links
+    assert get_link_scorer(config) is not get_link_scorer(scraper_config)
+
 # --- Tests for _classify_page_type ---
 
 @pytest.mark.parametrize("url, expected_type", [
@@ -100,4 +240,100 @@ def test_process_input_url_no_probing():
 def test_process_input_url_invalid():
     url, status = process_input_url("", [], "test_id")
     assert url is None
-    assert status == "InvalidURL"
\ No newline at end of file
+    assert status == "InvalidURL"
+
+@pytest.fixture
+def fake_resolver(mocker):
+    """
+    Patches the async resolver: hosts in `delays` resolve after the given delay, all others fail.
+    """
+    from base_scraper.src import utils
+    state = {"delays": {}, "lookups": [], "running": 0, "max_running": 0}
+
+    async def fake_resolve_host(hostname):
+        state["lookups"].append(hostname)
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        try:
+            await asyncio.sleep(state["delays"].get(hostname, 0.01))
+            if hostname not in state["delays"]:
+                raise socket.gaierror(socket.EAI_NONAME, f"unknown host {hostname}")
+        finally:
+            state["running"] -= 1
+
+    mocker.patch.object(utils, '_resolve_host', side_effect=fake_resolve_host)
+    mocker.patch.dict(utils._tld_probe_cache, clear=True)
+    return state
+
+@pytest.mark.asyncio
+async def test_process_input_url_async_probes_in_parallel_and_keeps_tld_priority(fake_resolver):
+    fake_resolver["delays"] = {"example.com": 0.05, "example.at": 0.001}
+    url, status = await process_input_url_async("example", ["de", "com", "at"], "test_id")
+    assert (url, status) == ("http://example.com/", "Valid")
+    assert fake_resolver["max_running"] == 3
+
+@pytest.mark.asyncio
+async def test_process_input_url_async_caches_per_base_domain(fake_resolver):
+    fake_resolver["delays"] = {"acme.de": 0.01}
+    results = await asyncio.gather(*(process_input_url_async(f"acme/page{i}", ["de", "com"], "test_id") for i in range(3)))
+    assert [url for url, _ in results] == ["http://acme.de/page0", "http://acme.de/page1", "http://acme.de/page2"]
+    assert sorted(fake_resolver["lookups"]) == ["acme.com", "acme.de"]
+
+    await process_input_url_async("https://acme", ["de", "com"], "test_id")
+    assert len(fake_resolver["lookups"]) == 2
+
+@pytest.mark.asyncio
+async def test_process_input_url_async_does_not_cache_timeouts(fake_resolver):
+    fake_resolver["delays"] = {"slow.de": 1.0, "slow.com": 0.001}
+    assert (await process_input_url_async("slow", ["de", "com"], "test_id", dns_timeout_seconds=0.02))[0] == "http://slow.com/"
+    assert (await process_input_url_async("slow", ["de", "com"], "test_id", dns_timeout_seconds=0.02))[0] == "http://slow.com/"
+    assert fake_resolver["lookups"].count("slow.de") == 2
+
+@pytest.mark.asyncio
+async def test_process_input_url_async_does_not_cache_timeouts_of_the_dns_cache(mocker):
+    from base_scraper.src import dns_cache, utils
+    mocker.patch.dict(utils._tld_probe_cache, clear=True)
+    mocker.patch.object(dns_cache, '_dns_cache', dns_cache.AsyncDNSCache(lookup_timeout_seconds=0.02))
+    resolver = {"hanging": True}
+
+    async def getaddrinfo(host, *args, **kwargs):
+        await asyncio.sleep(1 if resolver["hanging"] else 0.001)
+        if host != "acme.de":
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ("10.0.0.5", 0))]
+    mocker.patch('asyncio.base_events.BaseEventLoop.getaddrinfo', side_effect=getaddrinfo)
+
+    assert await process_input_url_async("acme", ["de"], "test_id", dns_timeout_seconds=1) == ("http://acme/", "Valid")
+    assert utils._tld_probe_cache == {}
+
+    resolver["hanging"] = False
+    assert await process_input_url_async("acme", ["de"], "test_id", dns_timeout_seconds=1) == ("http://acme.de/", "Valid")
+
+@pytest.mark.asyncio
+async def test_process_input_url_async_does_not_cache_transient_dns_errors(fake_resolver, mocker):
+    from base_scraper.src import utils
+    mocker.patch.object(utils, '_resolve_host', side_effect=socket.gaierror(socket.EAI_AGAIN, "Temporary failure in name resolution"))
+    await process_input_url_async("flaky", ["de"], "test_id")
+    assert utils._tld_probe_cache == {}
+
+@pytest.mark.asyncio
+async def test_process_input_url_async_failed_probes_expire(fake_resolver, mocker):
+    from base_scraper.src import utils
+    mock_time = mocker.patch.object(utils, 'time')
+    mock_time.monotonic.return_value = 1000
+    mocker.patch.object(utils, 'get_dns_cache', return_value=mocker.Mock(ttl_seconds=300, negative_ttl_seconds=60))
+    await process_input_url_async("later", ["de"], "test_id")
+    await process_input_url_async("later", ["de"], "test_id")
+    assert fake_resolver["lookups"] == ["later.de"]
+
+    fake_resolver["delays"] = {"later.de": 0.001}
+    mock_time.monotonic.return_value = 1061
+    assert (await process_input_url_async("later", ["de"], "test_id"))[0] == "http://later.de/"
+    assert fake_resolver["lookups"] == ["later.de", "later.de"]
+
+@pytest.mark.asyncio
+async def test_process_input_url_async_without_resolvable_tld(fake_resolver):
+    url, status = await process_input_url_async("nowhere", ["de", "com"], "test_id")
+    assert (url, status) == ("http://nowhere/", "Valid")
+    assert await process_input_url_async("", ["de"], "test_id") == (None, "InvalidURL")
+    assert await process_input_url_async("https://example.org/a b", ["de"], "test_id") == ("https://example.org/a%20b", "Valid")